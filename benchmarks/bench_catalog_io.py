@@ -0,0 +1,72 @@
+"""Throughput benchmark for the streaming NDJSON/CSV catalog export and import.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_catalog_io --records 1000000
+
+Records are generated lazily and read back one at a time, so peak memory
+should stay flat regardless of --records.
+"""
+
+import argparse
+import resource
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Iterator
+
+from src.models.feed import Feed
+from src.utils.catalog_io import (
+    export_records,
+    feed_record,
+    import_records,
+    record_to_feed,
+)
+
+
+def synthetic_records(count: int) -> Iterator[dict]:
+    """Generate export records for ``count`` made-up feeds."""
+    for i in range(count):
+        feed = Feed(
+            title=f"Synthetic feed {i}",
+            url=f"https://host{i % 5000}.example.com/feeds/{i}.xml",
+            genre=("News", "Technology", "Science", "Other")[i % 4],
+            description=f"Feed number {i}, generated for benchmarking",
+        )
+        health = (True, None) if i % 10 else (False, "HTTP 404")
+        yield feed_record(feed, health)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--formats", nargs="+", default=["ndjson", "csv"])
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as tmp:
+        for fmt in args.formats:
+            path = Path(tmp) / f"catalog.{fmt}"
+
+            start = time.perf_counter()
+            written = export_records(path, synthetic_records(args.records))
+            export_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            read = sum(1 for record in import_records(path) if record_to_feed(record))
+            import_seconds = time.perf_counter() - start
+
+            size_mb = path.stat().st_size / 1024 / 1024
+            print(
+                f"{fmt:>6}: export {written / export_seconds:,.0f} records/s, "
+                f"import {read / import_seconds:,.0f} records/s, "
+                f"{size_mb:,.1f} MB, peak RSS {peak_rss_mb():,.0f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Build and query benchmark for the trigram feed search index.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_search_index --feeds 100000
+"""
+
+import argparse
+import random
+import resource
+import string
+import time
+
+from src.models.feed import Feed
+from src.services.search_index import SearchIndex
+
+COMMON = "daily tech science notes open source python space music film world".split()
+QUERIES = ["techcrunch", "python weekly", "host4242", "sience notes", "example.com"]
+
+
+def synthetic_feeds(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    # Made-up names plus a few very common words, as in a real catalog
+    names = [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10)))
+        for _ in range(5000)
+    ]
+    for i in range(count):
+        words = " ".join(rng.sample(names, 2) + rng.sample(COMMON, 1))
+        yield Feed(
+            title=f"{words.title()} {i}",
+            url=f"https://host{i}.example.com/{rng.choice(names)}/feed.xml",
+            genre=("News", "Technology", "Science", "Other")[i % 4],
+            description=f"Feed number {i} about {words}",
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--feeds", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    index = SearchIndex()
+    start = time.perf_counter()
+    for feed in synthetic_feeds(args.feeds):
+        index.add(feed.hash, feed)
+    build_seconds = time.perf_counter() - start
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(
+        f"built {len(index):,} feeds in {build_seconds:.1f}s, peak RSS {rss_mb:,.0f} MB"
+    )
+
+    for query in QUERIES:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            results = index.search(query)
+        elapsed_ms = (time.perf_counter() - start) / args.repeat * 1000
+        print(f"{query!r:>16}: {elapsed_ms:6.1f} ms, {len(results)} results")
+
+
+if __name__ == "__main__":
+    main()
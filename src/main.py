@@ -1,119 +1,698 @@
-import asyncio
-from rich.console import Console
-from rich.prompt import Prompt, Confirm
-from rich.progress import Progress
-from rich.table import Table
+import argparse
 import logging
+import signal
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
+from src.models.feed import Feed
 from src.utils.logger import setup_logging
 from src.services.feed_manager import FeedManager
-from src.ui.display import display_feeds, display_latest_articles
+from src.utils.lazy_import import lazy_import
 
+asyncio = lazy_import("asyncio")
+genre_rules = lazy_import("src.services.genre_rules")
 
-console = Console()
 
+async def _in_daemon_thread(func, *args, **kwargs):
+    """Run a blocking call in a daemon thread and wait for its result.
 
-async def main():
+    Unlike ``asyncio.to_thread``, a prompt still waiting for input when the
+    session is stopped doesn't keep the process from exiting.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def settle(result, error) -> None:
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def target() -> None:
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            loop.call_soon_threadsafe(settle, None, e)
+        else:
+            loop.call_soon_threadsafe(settle, result, None)
+
+    threading.Thread(target=target, daemon=True).start()
+    return await future
+
+
+def _stop_on_signals() -> None:
+    """Cancel the running task when the terminal goes away or the process is
+    told to stop, so it exits through its cleanup and saves what is pending."""
+    task = asyncio.current_task()
+    loop = asyncio.get_running_loop()
+    for name in ("SIGTERM", "SIGHUP"):
+        if hasattr(signal, name):
+            try:
+                loop.add_signal_handler(getattr(signal, name), task.cancel)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+
+async def main(options: Optional[argparse.Namespace] = None):
     """Main function to run the OPML manager."""
+    # Rich is only needed by the interactive session, so it is imported here
+    # to keep one-shot commands from paying for it.
+    from rich.markup import escape
+    from rich.prompt import Prompt, Confirm
+    from rich.table import Table
+    from src.ui.display import (
+        console,
+        display_feeds,
+        display_latest_articles,
+        display_run_summary,
+    )
+
+    options = options or build_parser().parse_args([])
+    manager = None
+    loading = None
     try:
         console.print("[bold blue]OPML Feed Manager[/bold blue]")
 
         # Initialize
-        setup_logging()
+        rules = (
+            genre_rules.GenreRules.from_file(Path(options.rules))
+            if options.rules
+            else None
+        )
         opml_file = Prompt.ask("Enter OPML file path", default="feeds.opml")
-        manager = FeedManager(opml_file)
-
-        # Load and validate feeds
-        with console.status("[bold green]Loading and validating OPML file..."):
-            valid_count, invalid_feeds = await manager.load_opml()
-
-        # Report validation results
-        if invalid_feeds:
-            console.print("\n[yellow]Invalid feeds found:[/yellow]")
-            table = Table(show_header=True, header_style="bold yellow")
-            table.add_column("URL")
-            table.add_column("Error")
-            for url, error in invalid_feeds.items():
-                table.add_row(url, error)
-            console.print(table)
-            console.print(
-                f"\nInvalid feeds have been saved to '{manager.invalid_file}'"
-            )
-            Prompt.ask("\nPress Enter to continue")
+        manager = FeedManager(
+            opml_file,
+            db_file=options.db,
+            shards=options.shards,
+            parse_workers=options.parse_workers,
+            timeout_bounds=tuple(options.timeout_bounds),
+            archive_dir=options.archive,
+            replay=options.replay,
+        )
+        if options.monitor_loop:
+            manager.monitor_loop(options.monitor_loop / 1000)
+        if options.autosave is not None:
+            manager.enable_autosave(options.autosave)
+        _stop_on_signals()
 
-        # Dedupe feeds
-        dupes = manager.dedupe_feeds()
-        if dupes:
-            console.print(f"[yellow]Removed {dupes} duplicate feeds[/yellow]")
+        async def ask(*args, **kwargs) -> str:
+            # Prompts wait in a thread so that background work keeps running
+            return await _in_daemon_thread(Prompt.ask, *args, **kwargs)
 
-        # Process feeds
-        with Progress() as progress:
-            task = progress.add_task(
-                "[cyan]Analyzing feeds...", total=len(manager.feeds)
-            )
+        async def confirm(question: str) -> bool:
+            return await _in_daemon_thread(Confirm.ask, question)
 
-            for feed_hash, feed in manager.feeds.items():
-                if feed.genre == "Other":
-                    feed.genre = manager.genre_detector.guess_genre(feed.url)
-                progress.advance(task)
+        # Checking feeds takes minutes, so it runs in the background while the
+        # catalog can already be browsed and edited
+        if options.db and len(manager.feeds):
+            # The database already holds the catalog; no need to re-import it
+            console.print(f"Opened {len(manager.feeds)} feeds from '{options.db}'")
+            if rules:
+                changed = manager.apply_genre_rules(rules)
+                console.print(f"Genre rules updated {changed} feeds")
+        else:
+            loading = manager.start_loading(rules)
 
-        while True:
+        async def review_loaded_catalog(invalid_feeds: Dict[str, str]) -> None:
+            """Report the finished background load and offer its cleanups."""
+            console.clear()
+            console.print("[bold green]All feeds have been checked[/bold green]")
+            if invalid_feeds:
+                console.print("\n[yellow]Invalid feeds found:[/yellow]")
+                table = Table(show_header=True, header_style="bold yellow")
+                table.add_column("URL")
+                table.add_column("Error")
+                for url, error in invalid_feeds.items():
+                    table.add_row(url, error)
+                console.print(table)
+                console.print(
+                    f"\nInvalid feeds have been saved to '{manager.invalid_file}'"
+                )
+
+            # Offer to merge mirrors of the same feed found by content
+            clusters = manager.find_near_duplicates()
+            if clusters:
+                console.print(
+                    f"\n[yellow]Found {len(clusters)} groups of feeds with the same content:[/yellow]"
+                )
+                for cluster in clusters:
+                    console.print(
+                        "  "
+                        + " = ".join(
+                            manager.feeds[feed_hash].url for feed_hash in cluster
+                        )
+                    )
+                if await confirm("Keep only the first feed of each group?"):
+                    merged = manager.merge_near_duplicates(clusters)
+                    console.print(f"[yellow]Removed {merged} mirrored feeds[/yellow]")
+
+            # Offer to follow permanent redirects so later runs skip the extra hops
+            moved = manager.pending_redirects()
+            if moved and await confirm(
+                f"{len(moved)} feeds have permanently moved. Update them to their new URLs?"
+            ):
+                manager.apply_redirects()
+
+            display_run_summary(manager.run_summary())
+            await ask("\nPress Enter to continue")
+
+        async def pick_feed(rows: List[str]) -> Optional[int]:
+            """Ask for a row of the table as shown, if that feed is still there."""
+            feed_num = int(await ask("Enter feed number")) - 1
+            if not 0 <= feed_num < len(rows):
+                return None
+            if rows[feed_num] not in manager.feeds:
+                # Set aside as invalid, or merged away, since the table was drawn
+                console.print("[yellow]That feed has been removed meanwhile[/yellow]")
+                await ask("\nPress Enter to continue")
+                return None
+            return feed_num
+
+        def draw() -> List[str]:
+            """Draw the table and the menu; return the feeds of the table's rows."""
             console.clear()
-            display_feeds(manager.feeds)
+            if search_query:
+                # A page of matches, so looking each one up stays cheap
+                shown = {
+                    feed_hash: manager.feeds[feed_hash]
+                    for feed_hash in manager.search(search_query)
+                }
+                console.print(
+                    f"[bold]{len(shown)} feeds matching '{escape(search_query)}'[/bold] "
+                    "(search for nothing to list every feed)"
+                )
+            else:
+                # One scan of the catalog; a lookup per feed would cost a
+                # query each with --db
+                shown = dict(manager.feeds.items())
+            rows = list(shown)
+
+            statuses = None
+            if loading is not None:
+                statuses = {}
+                for feed_hash, feed in shown.items():
+                    if feed.url in manager.pending:
+                        statuses[feed_hash] = "[dim]checking[/dim]"
+                    elif manager.validation_results.get(feed.url, (True,))[0]:
+                        statuses[feed_hash] = "[green]valid[/green]"
+                    else:
+                        statuses[feed_hash] = "[red]invalid[/red]"
+                console.print(
+                    f"[dim]Checking feeds in the background: {len(manager.pending)} "
+                    "left.[/dim]"
+                )
+            if manager.autosave_delay is not None:
+                console.print(
+                    "[dim]Autosave: edits pending[/dim]"
+                    if manager.dirty
+                    else "[dim]Autosave: all changes saved[/dim]"
+                )
+            display_feeds(shown, statuses)
 
             console.print("\n[bold cyan]Actions:[/bold cyan]")
             console.print("1. View latest articles")
             console.print("2. Change feed genre")
             console.print("3. Delete feed")
             console.print("4. Save changes")
-            console.print("5. Exit")
+            console.print("5. Search feeds")
+            console.print("6. Exit")
+            return rows
 
-            choice = Prompt.ask("Choose an action", choices=["1", "2", "3", "4", "5"])
+        # Feeds the table currently shows: the whole catalog or search matches
+        search_query = ""
+        while True:
+            if loading is not None and loading.done():
+                _, invalid_feeds = loading.result()
+                loading = None
+                await review_loaded_catalog(invalid_feeds)
+
+            rows = draw()
+            # Choosing nothing just redraws the table with the latest results
+            choice_prompt = asyncio.ensure_future(
+                ask(
+                    "Choose an action",
+                    choices=["1", "2", "3", "4", "5", "6"],
+                    default="",
+                    show_default=False,
+                )
+            )
+            # While feeds are checked, the table is redrawn as their results
+            # come in (at most once a second) and the prompt keeps waiting
+            progress = len(manager.pending)
+            while loading is not None and not choice_prompt.done():
+                await asyncio.wait({choice_prompt}, timeout=1.0)
+                if not choice_prompt.done() and len(manager.pending) != progress:
+                    progress = len(manager.pending)
+                    rows = draw()
+                    console.print(
+                        "Choose an action [magenta][1/2/3/4/5/6][/magenta]: ", end=""
+                    )
+            choice = await choice_prompt
 
             if choice == "1":
-                feed_num = int(Prompt.ask("Enter feed number")) - 1
-                if 0 <= feed_num < len(manager.feeds):
-                    feed_hash = list(manager.feeds.keys())[feed_num]
-                    display_latest_articles(manager.feeds[feed_hash].url)
-                    Prompt.ask("\nPress Enter to continue")
+                feed_num = await pick_feed(rows)
+                if feed_num is not None:
+                    feed_url = manager.feeds[rows[feed_num]].url
+                    with console.status("[bold green]Fetching latest articles..."):
+                        entries = await manager.article_cache.get(feed_url)
+
+                    # Warm up the neighbouring rows while this feed is being read
+                    neighbours = rows[max(feed_num - 1, 0) : feed_num + 3]
+                    manager.article_cache.prefetch(
+                        manager.feeds[feed_hash].url
+                        for feed_hash in neighbours
+                        if feed_hash in manager.feeds
+                    )
+
+                    display_latest_articles(feed_url, entries)
+                    await ask("\nPress Enter to continue")
 
             elif choice == "2":
-                feed_num = int(Prompt.ask("Enter feed number")) - 1
-                if 0 <= feed_num < len(manager.feeds):
-                    feed_hash = list(manager.feeds.keys())[feed_num]
+                feed_num = await pick_feed(rows)
+                if feed_num is not None:
+                    feed_hash = rows[feed_num]
                     console.print(
                         "\nAvailable genres:",
                         ", ".join(sorted(manager.genre_detector.genres)),
                     )
-                    new_genre = Prompt.ask("Enter new genre")
+                    new_genre = await ask("Enter new genre")
                     if new_genre in manager.genre_detector.genres:
-                        manager.feeds[feed_hash].genre = new_genre
-                        console.print("[green]Genre updated successfully[/green]")
+                        if feed_hash in manager.feeds:
+                            manager.set_genre(feed_hash, new_genre)
+                            console.print("[green]Genre updated successfully[/green]")
 
             elif choice == "3":
-                feed_num = int(Prompt.ask("Enter feed number")) - 1
-                if 0 <= feed_num < len(manager.feeds):
-                    feed_hash = list(manager.feeds.keys())[feed_num]
-                    if Confirm.ask(f"Delete {manager.feeds[feed_hash].title}?"):
-                        manager.move_to_deleted(feed_hash)
-                        console.print("[green]Feed deleted successfully[/green]")
+                feed_num = await pick_feed(rows)
+                if feed_num is not None:
+                    feed_hash = rows[feed_num]
+                    if await confirm(f"Delete {manager.feeds[feed_hash].title}?"):
+                        if feed_hash in manager.feeds:
+                            manager.move_to_deleted(feed_hash)
+                            console.print("[green]Feed deleted successfully[/green]")
 
             elif choice == "4":
                 with console.status("[bold green]Saving changes..."):
-                    manager.save_opml(manager.opml_file)
+                    if manager.autosave_delay is not None:
+                        await manager.flush()
+                    else:
+                        manager.save_opml(manager.opml_file)
                 console.print("[green]Changes saved successfully[/green]")
-                Prompt.ask("\nPress Enter to continue")
+                await ask("\nPress Enter to continue")
 
             elif choice == "5":
-                if Confirm.ask("Save changes before exiting?"):
+                search_query = (await ask("Search for", default="")).strip()
+                if search_query:
+                    with console.status("[bold green]Indexing feeds..."):
+                        await manager.prepare_search()
+
+            elif choice == "6":
+                # With autosave, closing the manager saves what is pending
+                if (
+                    manager.autosave_delay is None
+                    and manager.dirty
+                    and await confirm("Save changes before exiting?")
+                ):
                     manager.save_opml(manager.opml_file)
                 break
 
+    except asyncio.CancelledError:
+        console.print("\n[yellow]Stopping...[/yellow]")
+
     except Exception as e:
         console.print(f"[bold red]Error:[/bold red] {str(e)}")
         logging.error(f"Application error: {str(e)}")
         raise
 
+    finally:
+        if loading is not None:
+            loading.cancel()
+            await asyncio.gather(loading, return_exceptions=True)
+        if manager is not None:
+            await manager.close()
+
+
+def list_genres(opml_file: Optional[str], db_file: Optional[str] = None) -> None:
+    """Print each genre of the catalog with its number of feeds.
+
+    Reads the SQLite catalog when one is given, otherwise the OPML file.
+    """
+    manager = FeedManager(opml_file or "feeds.opml", db_file=db_file)
+    try:
+        if db_file:
+            counts = manager.genre_counts()
+        else:
+            counts = Counter(
+                feed.genre for feed in manager.read_opml(save_snapshot=False)
+            )
+    finally:
+        manager.close_catalog()
+    for genre, count in sorted(counts.items()):
+        print(f"{genre}\t{count}")
+
+
+def export_catalog(
+    output: str, opml_file: Optional[str], db_file: Optional[str]
+) -> None:
+    """Export the catalog from the database or an OPML file to NDJSON or CSV."""
+    manager = FeedManager(opml_file or "feeds.opml", db_file=db_file)
+    try:
+        if not db_file:
+            manager.feeds.update(
+                (feed.hash, feed) for feed in manager.read_opml(save_snapshot=False)
+            )
+        count = manager.export_catalog(Path(output))
+    finally:
+        manager.close_catalog()
+    print(f"Exported {count} feeds to {output}")
+
+
+def import_catalog(
+    source: str, opml_file: Optional[str], db_file: Optional[str]
+) -> None:
+    """Import an NDJSON or CSV export into the database and/or an OPML file."""
+    manager = FeedManager(opml_file or "feeds.opml", db_file=db_file)
+    try:
+        count = manager.import_catalog(Path(source))
+        if opml_file:
+            manager.save_opml(Path(opml_file))
+    finally:
+        manager.close_catalog()
+    print(f"Imported {count} feeds from {source}")
+
+
+def validate_shard(opml_file: str, shard: int, shards: int, output: str) -> None:
+    """Validate one host shard of an OPML file and write its partial results."""
+    from src.services.sharding import split_shards, validate_urls
+
+    manager = FeedManager(opml_file)
+    try:
+        urls = list(dict.fromkeys(feed.url for feed in manager.read_opml()))
+    finally:
+        manager.close_catalog()
+    part = split_shards(urls, shards)[shard]
+    result = asyncio.run(validate_urls(part))
+    result.save(Path(output))
+    print(f"Validated {len(part)} of {len(urls)} feeds (shard {shard}/{shards})")
+
+
+def merge_shards(
+    opml_file: str, parts: List[str], output: Optional[str], db_file: Optional[str]
+) -> None:
+    """Fold partial shard results back into the catalog."""
+    manager = FeedManager(opml_file, db_file=db_file)
+
+    async def merge() -> Tuple[int, Dict[str, str]]:
+        try:
+            merged = await manager.merge_shard_results([Path(part) for part in parts])
+            if output:
+                manager.save_opml(Path(output))
+            return merged
+        finally:
+            await manager.close()
+
+    valid_count, invalid_feeds = asyncio.run(merge())
+    print(f"{valid_count} valid feeds, {len(invalid_feeds)} invalid")
+
+
+async def serve_catalog(
+    opml_file: str, options: argparse.Namespace, host: str, port: int, interval: float
+) -> None:
+    """Load the catalog once and serve its health over a local JSON API."""
+    from src.services.daemon import serve
+
+    manager = FeedManager(
+        opml_file,
+        db_file=options.db,
+        shards=options.shards,
+        parse_workers=options.parse_workers,
+        timeout_bounds=tuple(options.timeout_bounds),
+        archive_dir=options.archive,
+        replay=options.replay,
+    )
+    if options.monitor_loop:
+        manager.monitor_loop(options.monitor_loop / 1000)
+    # Genre changes made through the API and the latency history are saved
+    # on the way out, so a SIGTERM must stop the daemon through it
+    _stop_on_signals()
+    try:
+        if not (options.db and len(manager.feeds)):
+            # Feeds are checked once the API is up, and invalid ones are kept
+            # in the catalog so that the API reports them
+            manager.stage_opml()
+        if options.autosave is not None:
+            # Also saves genre changes made through the API as they come in
+            manager.enable_autosave(options.autosave)
+        print(f"Serving {len(manager.feeds)} feeds on http://{host}:{port}")
+        await serve(manager, host, port, interval)
+    finally:
+        await manager.close()
+
+
+def _read_catalog(opml_file: str) -> Dict[str, Feed]:
+    """Read an OPML file into feeds keyed by hash, without validating them.
+
+    Every attribute we save is read back, so diff and merge see descriptions
+    and original URLs too.
+    """
+    manager = FeedManager(opml_file)
+    return {feed.hash: feed for feed in manager.read_opml(save_snapshot=False)}
+
+
+def diff_opml(old_file: str, new_file: str) -> None:
+    """Print how the feeds of one OPML file differ from another's."""
+    from src.services.opml_diff import diff_catalogs
+
+    diff = diff_catalogs(_read_catalog(old_file), _read_catalog(new_file))
+    for feed in diff.added:
+        print(f"+ [{feed.genre}] {feed.title} <{feed.url}>")
+    for feed in diff.removed:
+        print(f"- [{feed.genre}] {feed.title} <{feed.url}>")
+    for before, after in diff.regenred:
+        print(f"~ {after.url} genre: {before.genre} -> {after.genre}")
+    for before, after in diff.retitled:
+        print(f"~ {after.url} title: {before.title!r} -> {after.title!r}")
+    for before, after in diff.redescribed:
+        print(f"~ {after.url} description changed")
+    print(
+        f"{len(diff.added)} added, {len(diff.removed)} removed, "
+        f"{len(diff.regenred)} re-genred, {len(diff.retitled)} retitled, "
+        f"{len(diff.redescribed)} redescribed"
+    )
+
+
+def merge_opml(base_file: str, ours_file: str, theirs_file: str, output: str) -> None:
+    """Three-way merge two OPML files that started from a common base.
+
+    Exits with status 1 if there were conflicts; ours is kept for those.
+    """
+    from src.services.opml_diff import merge_catalogs
+
+    merged, conflicts = merge_catalogs(
+        _read_catalog(base_file), _read_catalog(ours_file), _read_catalog(theirs_file)
+    )
+    manager = FeedManager(output)
+    manager.feeds.update(merged)
+    manager.save_opml(Path(output))
+
+    for conflict in conflicts:
+        print(
+            f"! {conflict.url} {conflict.field}: "
+            f"ours {conflict.ours!r}, theirs {conflict.theirs!r}"
+        )
+    print(f"Merged {len(merged)} feeds into {output}, {len(conflicts)} conflicts")
+    if conflicts:
+        raise SystemExit(1)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser."""
+    parser = argparse.ArgumentParser(
+        prog="ohpeehmel", description="A simple OPML parser and manager."
+    )
+    parser.add_argument(
+        "--log-json",
+        action="store_true",
+        help="write the log file as JSON lines",
+    )
+    parser.add_argument(
+        "--db",
+        metavar="PATH",
+        help="keep the catalog in this SQLite database instead of memory",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        metavar="N",
+        help="split validation by host into N shards (worker processes)",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        metavar="N",
+        help="parse feeds in N worker processes (default: one per CPU, 0: inline)",
+    )
+    parser.add_argument(
+        "--rules",
+        metavar="PATH",
+        help="assign genres from this TOML rules file before guessing them",
+    )
+    parser.add_argument(
+        "--timeout-bounds",
+        type=float,
+        nargs=2,
+        default=[1.0, 30.0],
+        metavar=("MIN", "MAX"),
+        help="clamp the timeouts learned for each host between MIN and MAX seconds",
+    )
+    parser.add_argument(
+        "--monitor-loop",
+        type=float,
+        nargs="?",
+        const=100.0,
+        metavar="MS",
+        help="measure event loop lag and report stalls longer than MS (default 100)",
+    )
+    parser.add_argument(
+        "--autosave",
+        type=float,
+        nargs="?",
+        const=2.0,
+        metavar="SECONDS",
+        help="save edits to the OPML file once they pause for SECONDS (default 2)",
+    )
+    parser.add_argument(
+        "--archive",
+        metavar="DIR",
+        help="keep a compressed copy of every fetched feed in DIR",
+    )
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="fetch nothing and answer from the --archive directory instead",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    genres_parser = subparsers.add_parser(
+        "genres", help="list the genres of an OPML file without checking feeds"
+    )
+    genres_parser.add_argument("opml_file", nargs="?")
+
+    export_parser = subparsers.add_parser(
+        "export", help="stream the catalog to an .ndjson/.jsonl or .csv file"
+    )
+    export_parser.add_argument("output")
+    export_parser.add_argument("opml_file", nargs="?", help="read from this OPML file")
+
+    import_parser = subparsers.add_parser(
+        "import", help="load an .ndjson/.jsonl or .csv export into the catalog"
+    )
+    import_parser.add_argument("source")
+    import_parser.add_argument("opml_file", nargs="?", help="write this OPML file")
+
+    shard_parser = subparsers.add_parser(
+        "validate-shard",
+        help="validate one of --shards host shards and write partial results",
+    )
+    shard_parser.add_argument("opml_file")
+    shard_parser.add_argument("--shard", type=int, required=True)
+    shard_parser.add_argument("--output", required=True)
+
+    merge_parser = subparsers.add_parser(
+        "merge-shards", help="fold partial shard results back into the catalog"
+    )
+    merge_parser.add_argument("opml_file")
+    merge_parser.add_argument("parts", nargs="+")
+    merge_parser.add_argument("--output", help="write the valid feeds to this OPML")
+
+    diff_parser = subparsers.add_parser(
+        "diff", help="show feeds added, removed, re-genred or retitled between OPMLs"
+    )
+    diff_parser.add_argument("old_file")
+    diff_parser.add_argument("new_file")
+
+    merge_opml_parser = subparsers.add_parser(
+        "merge", help="three-way merge two OPML files that share a base version"
+    )
+    merge_opml_parser.add_argument("base_file")
+    merge_opml_parser.add_argument("ours_file")
+    merge_opml_parser.add_argument("theirs_file")
+    merge_opml_parser.add_argument("--output", required=True)
+
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help="keep the catalog loaded and serve its health over a local JSON API",
+    )
+    serve_parser.add_argument("opml_file")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument(
+        "--interval",
+        type=float,
+        default=3600.0,
+        metavar="SECONDS",
+        help="revalidate the catalog this often (default: hourly)",
+    )
+    return parser
+
+
+def run(argv: Optional[List[str]] = None) -> None:
+    """Parse the command line and run the requested command."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.shards < 1:
+        parser.error("--shards must be at least 1")
+    if args.parse_workers is not None and args.parse_workers < 0:
+        parser.error("--parse-workers cannot be negative")
+    low, high = args.timeout_bounds
+    if not 0 < low <= high:
+        parser.error("--timeout-bounds needs 0 < MIN <= MAX")
+    if args.replay and not args.archive:
+        parser.error("--replay needs --archive")
+    if args.monitor_loop is not None and args.monitor_loop <= 0:
+        parser.error("--monitor-loop needs a positive threshold")
+    if args.autosave is not None and args.autosave < 0:
+        parser.error("--autosave cannot be negative")
+    if args.archive and args.shards > 1:
+        # Shard workers fetch with validators of their own
+        parser.error("--archive cannot be combined with --shards")
+    setup_logging(json_lines=args.log_json)
+
+    if args.command == "genres":
+        if not (args.opml_file or args.db):
+            parser.error("genres needs an OPML file or --db")
+        list_genres(args.opml_file, args.db)
+    elif args.command in ("export", "import"):
+        if not (args.opml_file or args.db):
+            parser.error(f"{args.command} needs an OPML file or --db")
+        if args.command == "export":
+            export_catalog(args.output, args.opml_file, args.db)
+        else:
+            import_catalog(args.source, args.opml_file, args.db)
+    elif args.command == "validate-shard":
+        if not 0 <= args.shard < args.shards:
+            parser.error("--shard must be between 0 and --shards - 1")
+        validate_shard(args.opml_file, args.shard, args.shards, args.output)
+    elif args.command == "merge-shards":
+        merge_shards(args.opml_file, args.parts, args.output, args.db)
+    elif args.command == "serve":
+        try:
+            asyncio.run(
+                serve_catalog(args.opml_file, args, args.host, args.port, args.interval)
+            )
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            # Stopped by Ctrl+C or a signal; the catalog has been saved
+            pass
+    elif args.command == "diff":
+        diff_opml(args.old_file, args.new_file)
+    elif args.command == "merge":
+        merge_opml(args.base_file, args.ours_file, args.theirs_file, args.output)
+    else:
+        asyncio.run(main(args))
+
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run()
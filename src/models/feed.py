@@ -10,6 +10,7 @@ class Feed:
     genre: str
     description: str = ""
     deleted_at: Optional[datetime] = None
+    original_url: Optional[str] = None
 
     @property
     def hash(self) -> str:
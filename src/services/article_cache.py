@@ -0,0 +1,101 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.services.feed_validator import FeedValidator
+from src.utils.lazy_import import lazy_import
+
+asyncio = lazy_import("asyncio")
+
+# Only the fields the article view renders are kept in the cache
+ARTICLE_FIELDS = ("title", "link", "published_parsed", "updated_parsed")
+
+
+class ArticleCache:
+    def __init__(
+        self,
+        fetcher: FeedValidator,
+        ttl: float = 300.0,
+        max_feeds: int = 64,
+        max_articles: int = 5,
+    ):
+        """Initialize the article cache.
+
+        Args:
+            fetcher (FeedValidator): Validator whose HTTP session and parse
+                pool are reused
+            ttl (float): Seconds a fetched feed stays fresh
+            max_feeds (int): Number of feeds kept before evicting the least
+                recently viewed one
+            max_articles (int): Number of latest articles kept per feed
+        """
+        self.fetcher = fetcher
+        self.ttl = ttl
+        self.max_feeds = max_feeds
+        self.max_articles = max_articles
+        self._articles: "OrderedDict[str, Tuple[float, List[dict]]]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Task] = {}
+
+    def _lookup(self, url: str) -> Optional[List[dict]]:
+        """Return fresh cached articles for a URL, or None."""
+        cached = self._articles.get(url)
+        if cached is None:
+            return None
+        fetched_at, articles = cached
+        if time.monotonic() - fetched_at > self.ttl:
+            del self._articles[url]
+            return None
+        self._articles.move_to_end(url)
+        return articles
+
+    def _store(self, url: str, articles: List[dict]) -> None:
+        self._articles[url] = (time.monotonic(), articles)
+        self._articles.move_to_end(url)
+        while len(self._articles) > self.max_feeds:
+            self._articles.popitem(last=False)
+
+    async def _fetch(self, url: str) -> List[dict]:
+        try:
+            content = await self.fetcher.fetch_text(url)
+            feed = await self.fetcher.parse_pool.parse(content)
+            articles = [
+                {field: entry.get(field) for field in ARTICLE_FIELDS}
+                for entry in feed.entries[: self.max_articles]
+            ]
+        except Exception as e:
+            logging.warning(f"Error fetching articles for {url}: {str(e)}")
+            return []
+        self._store(url, articles)
+        return articles
+
+    def _start(self, url: str) -> "asyncio.Task":
+        task = asyncio.create_task(self._fetch(url))
+        self._pending[url] = task
+        task.add_done_callback(lambda _: self._pending.pop(url, None))
+        return task
+
+    async def get(self, url: str) -> List[dict]:
+        """Return the latest articles of a feed, fetching them if needed.
+
+        A prefetch already in flight for the URL is awaited instead of
+        starting a second request.
+        """
+        articles = self._lookup(url)
+        if articles is not None:
+            return articles
+        task = self._pending.get(url) or self._start(url)
+        return await asyncio.shield(task)
+
+    def prefetch(self, urls: Iterable[str]) -> None:
+        """Start fetching feeds in the background if they are not cached."""
+        for url in urls:
+            if url not in self._pending and self._lookup(url) is None:
+                self._start(url)
+
+    async def close(self) -> None:
+        """Cancel any prefetches still in flight."""
+        tasks = list(self._pending.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
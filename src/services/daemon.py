@@ -0,0 +1,200 @@
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from src.services.feed_manager import FeedManager
+from src.utils.catalog_io import feed_record
+from src.utils.lazy_import import lazy_import
+
+asyncio = lazy_import("asyncio")
+web = lazy_import("aiohttp.web")
+
+
+class FeedDaemon:
+    """Keeps a catalog loaded and serves its health over a local JSON API.
+
+    The manager's HTTP session, parse workers and caches stay warm between
+    requests, and the catalog is revalidated every ``interval`` seconds.
+
+    Endpoints:
+        GET  /status                 Catalog and last validation summary
+        GET  /feeds?genre=&invalid=  Feeds with their health, optionally filtered
+        GET  /feeds/{hash}           One feed with its health
+        GET  /search?q=&limit=       Fuzzy search, best matches first
+        POST /feeds/{hash}/genre     Change a feed's genre: {"genre": "..."}
+        POST /revalidate             Start revalidating now
+    """
+
+    def __init__(self, manager: FeedManager, interval: float = 3600.0):
+        """Initialize the daemon.
+
+        Args:
+            manager (FeedManager): Manager holding the loaded catalog
+            interval (float): Seconds between scheduled revalidations
+        """
+        self.manager = manager
+        self.interval = interval
+        self.last_validated: Optional[datetime] = None
+        # Set when the catalog changed through the API and should be saved
+        self.changed = False
+        self._revalidation: Optional[asyncio.Task] = None
+        self._schedule: Optional[asyncio.Task] = None
+
+    def create_app(self) -> "web.Application":
+        """Build the web application serving the API."""
+        app = web.Application()
+        app.add_routes(
+            [
+                web.get("/status", self.handle_status),
+                web.get("/feeds", self.handle_feeds),
+                web.get("/feeds/{feed_hash}", self.handle_feed),
+                web.get("/search", self.handle_search),
+                web.post("/feeds/{feed_hash}/genre", self.handle_set_genre),
+                web.post("/revalidate", self.handle_revalidate),
+            ]
+        )
+        app.on_startup.append(self._start_schedule)
+        app.on_cleanup.append(self._stop_tasks)
+        return app
+
+    @property
+    def revalidating(self) -> bool:
+        return self._revalidation is not None and not self._revalidation.done()
+
+    def trigger_revalidation(self) -> bool:
+        """Start revalidating in the background unless a pass is running.
+
+        Returns:
+            bool: Whether a new pass was started
+        """
+        if self.revalidating:
+            return False
+        self._revalidation = asyncio.create_task(self._revalidate())
+        return True
+
+    async def _revalidate(self) -> None:
+        try:
+            await self.manager.revalidate()
+            self.last_validated = datetime.now()
+            # Keep what was learned about each host even if the daemon is killed
+            self.manager.feed_validator.latency_tracker.save()
+        except Exception as e:
+            logging.error(f"Scheduled revalidation failed: {str(e)}")
+
+    async def _run_schedule(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            if self.trigger_revalidation():
+                await self._revalidation
+
+    async def _start_schedule(self, app: "web.Application") -> None:
+        self._schedule = asyncio.create_task(self._run_schedule())
+
+    async def _stop_tasks(self, app: "web.Application") -> None:
+        tasks = [task for task in (self._schedule, self._revalidation) if task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _feed_json(self, feed_hash: str) -> Dict[str, Any]:
+        feed = self.manager.feeds[feed_hash]
+        return feed_record(
+            feed,
+            self.manager.validation_results.get(feed.url),
+            self.manager.feed_validator.permanent_location(feed.url),
+        )
+
+    async def handle_status(self, request: "web.Request") -> "web.Response":
+        return web.json_response(
+            {
+                "feeds": len(self.manager.feeds),
+                "genres": self.manager.genre_counts(),
+                "revalidating": self.revalidating,
+                "last_validated": (
+                    self.last_validated.isoformat() if self.last_validated else None
+                ),
+                "summary": self.manager.run_summary(),
+            }
+        )
+
+    async def handle_feeds(self, request: "web.Request") -> "web.Response":
+        genre = request.query.get("genre")
+        invalid_only = request.query.get("invalid") in ("1", "true")
+        records = []
+        for feed_hash, feed in self.manager.feeds.items():
+            if genre and feed.genre != genre:
+                continue
+            record = self._feed_json(feed_hash)
+            if invalid_only and record["valid"] is not False:
+                continue
+            records.append(record)
+        return web.json_response(records)
+
+    async def handle_feed(self, request: "web.Request") -> "web.Response":
+        feed_hash = request.match_info["feed_hash"]
+        if feed_hash not in self.manager.feeds:
+            raise web.HTTPNotFound(text="Unknown feed")
+        return web.json_response(self._feed_json(feed_hash))
+
+    async def handle_search(self, request: "web.Request") -> "web.Response":
+        query = request.query.get("q", "")
+        try:
+            limit = int(request.query.get("limit", "20"))
+        except ValueError:
+            raise web.HTTPBadRequest(text="limit must be a number")
+        await self.manager.prepare_search()
+        started = time.perf_counter()
+        matches = self.manager.search(query, limit=limit)
+        return web.json_response(
+            {
+                "query": query,
+                "milliseconds": round((time.perf_counter() - started) * 1000, 3),
+                "results": [self._feed_json(feed_hash) for feed_hash in matches],
+            }
+        )
+
+    async def handle_set_genre(self, request: "web.Request") -> "web.Response":
+        feed_hash = request.match_info["feed_hash"]
+        if feed_hash not in self.manager.feeds:
+            raise web.HTTPNotFound(text="Unknown feed")
+        try:
+            genre = (await request.json())["genre"]
+        except (ValueError, KeyError, TypeError):
+            raise web.HTTPBadRequest(text='Expected a JSON body like {"genre": "News"}')
+        if genre not in self.manager.genre_detector.genres:
+            raise web.HTTPBadRequest(text=f"Unknown genre: {genre}")
+        self.manager.set_genre(feed_hash, genre)
+        self.changed = True
+        return web.json_response(self._feed_json(feed_hash))
+
+    async def handle_revalidate(self, request: "web.Request") -> "web.Response":
+        started = self.trigger_revalidation()
+        return web.json_response({"started": started}, status=202 if started else 409)
+
+
+async def serve(
+    manager: FeedManager,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    interval: float = 3600.0,
+) -> None:
+    """Serve the daemon API until cancelled (e.g. by Ctrl+C).
+
+    The catalog is validated in the background as soon as the API is up,
+    then every ``interval`` seconds.
+    """
+    daemon = FeedDaemon(manager, interval=interval)
+    if manager.validation_results:
+        daemon.last_validated = datetime.now()
+    runner = web.AppRunner(daemon.create_app())
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, host, port).start()
+        logging.info(f"Serving {len(manager.feeds)} feeds on http://{host}:{port}")
+        daemon.trigger_revalidation()
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+        if daemon.changed:
+            manager.save_opml(manager.opml_file)
@@ -0,0 +1,142 @@
+import hashlib
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Keys hash to 64 bits: the top bits pick a bin, the low 48 bits are its value
+_BIN_RANGE = 2**48
+
+
+def entry_keys(entries: Iterable[dict], limit: int = 20) -> List[str]:
+    """Extract the identifying strings of a feed's most recent entries.
+
+    Links are stripped of scheme, ``www.`` and trailing slashes so that an
+    http mirror and an https original still produce the same keys.
+    """
+    keys = []
+    for entry in list(entries)[:limit]:
+        guid = entry.get("id")
+        if guid:
+            keys.append(f"id:{guid.strip()}")
+        link = entry.get("link")
+        if link:
+            link = link.strip().split("://", 1)[-1].removeprefix("www.").rstrip("/")
+            keys.append(f"link:{link}")
+        title = entry.get("title")
+        if title:
+            keys.append(f"title:{' '.join(title.lower().split())}")
+    return keys
+
+
+class DuplicateDetector:
+    def __init__(self, num_perm: int = 64, bands: int = 16):
+        """Initialize the MinHash/LSH near-duplicate detector.
+
+        Args:
+            num_perm (int): Number of MinHash values in each signature
+            bands (int): Number of LSH bands; must divide num_perm. More bands
+                catch less similar pairs at the cost of more candidates.
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+
+    def signature(self, keys: Iterable[str]) -> Optional[Tuple[int, ...]]:
+        """Compute the MinHash signature of a set of entry keys.
+
+        Uses one-permutation hashing: each key is hashed once and only
+        competes for the minimum of its own bin, so the cost is linear in the
+        number of keys instead of keys times ``num_perm``. Empty bins borrow
+        the next filled bin's value (rotation densification).
+
+        Returns:
+            Optional[Tuple[int, ...]]: The signature, or None for an empty set
+        """
+        bins: List[Optional[int]] = [None] * self.num_perm
+        for key in set(keys):
+            digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+            bin_index, value = divmod(int.from_bytes(digest, "little"), _BIN_RANGE)
+            bin_index %= self.num_perm
+            if bins[bin_index] is None or value < bins[bin_index]:
+                bins[bin_index] = value
+
+        filled = [i for i, value in enumerate(bins) if value is not None]
+        if not filled:
+            return None
+
+        signature = list(bins)
+        for i, value in enumerate(bins):
+            if value is None:
+                # Next filled bin clockwise, offset by distance so that
+                # borrowed values cannot collide with genuine ones
+                j = next((j for j in filled if j > i), filled[0])
+                distance = (j - i) % self.num_perm
+                signature[i] = bins[j] + distance * _BIN_RANGE
+        return tuple(signature)
+
+    def similarity(self, sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+        """Estimate the Jaccard similarity of two sets from their signatures."""
+        return sum(a == b for a, b in zip(sig_a, sig_b)) / self.num_perm
+
+    def find_clusters(
+        self, keys_by_id: Dict[str, Iterable[str]], threshold: float = 0.5
+    ) -> List[List[str]]:
+        """Group items whose key sets are near-duplicates of each other.
+
+        Candidates come from LSH buckets, so only items sharing a bucket are
+        compared rather than every pair of items.
+
+        Args:
+            keys_by_id (Dict[str, Iterable[str]]): Entry keys for each item id
+            threshold (float): Minimum estimated Jaccard similarity to merge
+
+        Returns:
+            List[List[str]]: Clusters of two or more ids, each in input order
+        """
+        signatures = {}
+        for item_id, keys in keys_by_id.items():
+            sig = self.signature(keys)
+            if sig is not None:
+                signatures[item_id] = sig
+
+        buckets: Dict[Tuple[int, Tuple[int, ...]], List[str]] = defaultdict(list)
+        for item_id, sig in signatures.items():
+            for band in range(self.bands):
+                start = band * self.rows
+                buckets[(band, sig[start : start + self.rows])].append(item_id)
+
+        parent = {item_id: item_id for item_id in signatures}
+
+        def find(item_id: str) -> str:
+            while parent[item_id] != item_id:
+                parent[item_id] = parent[parent[item_id]]
+                item_id = parent[item_id]
+            return item_id
+
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            # Every pair in the bucket is a candidate: members may be alike
+            # without being alike the first. Pairs already in one cluster
+            # are skipped without comparing their signatures.
+            for i, member in enumerate(members):
+                for earlier in members[:i]:
+                    if find(earlier) == find(member):
+                        continue
+                    if (
+                        self.similarity(signatures[earlier], signatures[member])
+                        >= threshold
+                    ):
+                        parent[find(member)] = find(earlier)
+
+        clusters: Dict[str, List[str]] = defaultdict(list)
+        for item_id in signatures:
+            clusters[find(item_id)].append(item_id)
+
+        result = [members for members in clusters.values() if len(members) > 1]
+        logging.info(
+            f"Found {len(result)} near-duplicate clusters among {len(signatures)} feeds"
+        )
+        return result
@@ -0,0 +1,220 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from importlib.util import find_spec
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+from src.utils.lazy_import import lazy_import
+
+aiohttp = lazy_import("aiohttp")
+# zstandard is optional; without it fetches are archived with gzip
+zstandard = lazy_import("zstandard") if find_spec("zstandard") else None
+
+EXTENSIONS = {"zstd": ".zst", "gzip": ".gz"}
+
+
+@dataclass
+class ArchivedResponse:
+    """One fetch of a feed as it was answered."""
+
+    url: str
+    fetched_at: float
+    status: int
+    headers: Dict[str, str] = field(default_factory=dict)
+    # Decoded body, as the application read it
+    text: str = ""
+    # URL finally answered, and the (status, url) of each redirect hop
+    final_url: str = ""
+    history: List[Tuple[int, str]] = field(default_factory=list)
+
+
+def _compress(data: bytes, compression: str) -> bytes:
+    if compression == "zstd":
+        return zstandard.ZstdCompressor().compress(data)
+    return gzip.compress(data)
+
+
+def _decompress(data: bytes, compression: str) -> bytes:
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError("Reading .zst archives needs the zstandard package")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class FeedArchive:
+    """Compressed copies of fetched feeds, keyed by URL and fetch time.
+
+    Each fetch is one file, ``<root>/<url digest>/<fetch time in ns><ext>``,
+    holding a JSON header line (status, headers, redirects) followed by the
+    body. Files are compressed with zstd when the zstandard package is
+    installed and with gzip otherwise; both can be read back.
+    """
+
+    def __init__(self, root: Path, compression: Optional[str] = None):
+        """Initialize the archive.
+
+        Args:
+            root (Path): Directory the archive is kept in
+            compression (Optional[str]): "zstd" or "gzip"; defaults to zstd
+                when available
+        """
+        if compression is None:
+            compression = "zstd" if zstandard is not None else "gzip"
+        if compression not in EXTENSIONS:
+            raise ValueError(f"Unknown compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            raise ValueError("zstd compression needs the zstandard package")
+        self.root = root
+        self.compression = compression
+
+    def _feed_dir(self, url: str) -> Path:
+        return self.root / hashlib.sha256(url.encode()).hexdigest()[:32]
+
+    def store(self, response: ArchivedResponse) -> Path:
+        """Write one fetch to the archive and return its file."""
+        header = {
+            "url": response.url,
+            "fetched_at": response.fetched_at,
+            "status": response.status,
+            "headers": response.headers,
+            "final_url": response.final_url,
+            "history": response.history,
+        }
+        data = (
+            json.dumps(header, ensure_ascii=False).encode("utf-8")
+            + b"\n"
+            + response.text.encode("utf-8")
+        )
+        feed_dir = self._feed_dir(response.url)
+        feed_dir.mkdir(parents=True, exist_ok=True)
+        stamp = int(response.fetched_at * 1_000_000_000)
+        path = feed_dir / f"{stamp}{EXTENSIONS[self.compression]}"
+        # Write beside the file and swap it in, so a crash never leaves it torn
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(_compress(data, self.compression))
+        os.replace(tmp_path, path)
+        return path
+
+    def fetches(self, url: str) -> List[Path]:
+        """Return the archived fetches of a URL, oldest first."""
+        feed_dir = self._feed_dir(url)
+        if not feed_dir.is_dir():
+            return []
+        paths = [
+            path
+            for path in feed_dir.iterdir()
+            if path.suffix in (".zst", ".gz") and path.stem.isdigit()
+        ]
+        return sorted(paths, key=lambda path: int(path.stem))
+
+    def load(self, path: Path) -> ArchivedResponse:
+        """Read one archived fetch."""
+        compression = "zstd" if path.suffix == ".zst" else "gzip"
+        with open(path, "rb") as f:
+            data = _decompress(f.read(), compression)
+        header, _, body = data.partition(b"\n")
+        fields = json.loads(header)
+        return ArchivedResponse(
+            url=fields["url"],
+            fetched_at=fields["fetched_at"],
+            status=fields["status"],
+            headers=fields.get("headers", {}),
+            text=body.decode("utf-8"),
+            final_url=fields.get("final_url") or fields["url"],
+            history=[tuple(hop) for hop in fields.get("history", [])],
+        )
+
+    def latest(
+        self, url: str, as_of: Optional[float] = None
+    ) -> Optional[ArchivedResponse]:
+        """Return the last fetch of a URL, or the last one made by ``as_of``.
+
+        Args:
+            url (str): URL as it was requested
+            as_of (Optional[float]): Unix time to replay the archive as of
+        """
+        for path in reversed(self.fetches(url)):
+            if as_of is not None and int(path.stem) > as_of * 1_000_000_000:
+                continue
+            try:
+                return self.load(path)
+            except (OSError, ValueError, KeyError) as e:
+                logging.warning(f"Skipping unreadable archived fetch {path}: {e}")
+        return None
+
+
+class _ReplayResponse:
+    """Just enough of an aiohttp response for the validator and article view."""
+
+    def __init__(self, archived: ArchivedResponse):
+        self.status = archived.status
+        self.headers = archived.headers
+        self.url = archived.final_url
+        self.history = tuple(
+            SimpleNamespace(status=status, url=url) for status, url in archived.history
+        )
+        self._text = archived.text
+
+    async def text(self) -> str:
+        return self._text
+
+    def raise_for_status(self) -> None:
+        if self.status >= 400:
+            raise aiohttp.ClientError(f"HTTP {self.status} (archived)")
+
+
+class _ReplayRequest:
+    def __init__(self, session: "ReplaySession", url: str):
+        self.session = session
+        self.url = url
+
+    async def __aenter__(self) -> _ReplayResponse:
+        archived = self.session.archive.latest(self.url, self.session.as_of)
+        if archived is None:
+            raise aiohttp.ClientConnectionError(f"{self.url} is not in the archive")
+        return _ReplayResponse(archived)
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+
+class ReplaySession:
+    """Stands in for the shared HTTP session, answering only from an archive.
+
+    Feeds never archived fail as if the connection had been refused.
+    """
+
+    def __init__(self, archive: FeedArchive, as_of: Optional[float] = None):
+        self.archive = archive
+        self.as_of = as_of
+        self.closed = False
+
+    def get(self, url: str, **kwargs) -> _ReplayRequest:
+        return _ReplayRequest(self, url)
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def archived_response(url: str, response, text: str) -> ArchivedResponse:
+    """Describe an aiohttp response, and the body read from it, for the archive."""
+    history = getattr(response, "history", ())
+    if not isinstance(history, (tuple, list)):
+        history = ()
+    return ArchivedResponse(
+        url=url,
+        fetched_at=time.time(),
+        status=response.status,
+        headers={str(key): str(value) for key, value in response.headers.items()},
+        text=text,
+        final_url=str(response.url),
+        history=[(hop.status, str(hop.url)) for hop in history],
+    )
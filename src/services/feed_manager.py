@@ -1,27 +1,302 @@
-import listparser
+import copy
+from dataclasses import replace
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Set,
+    Tuple,
+)
 import logging
-from xml.dom import minidom
-import xml.etree.ElementTree as ET
+import os
+import time
 
 from src.models.feed import Feed
-from src.utils.xml_helpers import create_opml_tree
+from src.utils.lazy_import import lazy_import
+from src.utils.xml_helpers import create_opml_tree, outline_attributes
+from src.utils.compressed_io import compression_of, open_text
 from src.services.genre_detector import GenreDetector
 from src.services.feed_validator import FeedValidator
-
-
+from src.services.duplicate_detector import DuplicateDetector
+from src.services.article_cache import ArticleCache
+from src.services.latency_tracker import LatencyTracker, percentile
+from src.services.opml_snapshot import OPMLSnapshot, content_digest
+from src.services.parse_pool import ParsePool
+
+asyncio = lazy_import("asyncio")
+listparser = lazy_import("listparser")
+minidom = lazy_import("xml.dom.minidom")
+ET = lazy_import("xml.etree.ElementTree")
+# Modules behind options and commands that most runs don't use
+catalog_io = lazy_import("src.utils.catalog_io")
+feed_archive = lazy_import("src.services.feed_archive")
+feed_store = lazy_import("src.services.feed_store")
+genre_rules = lazy_import("src.services.genre_rules")
+loop_monitor = lazy_import("src.services.loop_monitor")
+search_index = lazy_import("src.services.search_index")
+sharding = lazy_import("src.services.sharding")
+validation_checkpoint = lazy_import("src.services.validation_checkpoint")
 
 
 class FeedManager:
-    def __init__(self, opml_file: str):
+    def __init__(
+        self,
+        opml_file: str,
+        db_file: Optional[str] = None,
+        shards: int = 1,
+        parse_workers: Optional[int] = 0,
+        timeout_bounds: Tuple[float, float] = (1.0, 30.0),
+        archive_dir: Optional[str] = None,
+        replay: bool = False,
+    ):
+        """Initialize the feed manager.
+
+        Args:
+            opml_file (str): OPML file feeds are imported from and saved to
+            db_file (Optional[str]): SQLite catalog to keep feeds in instead
+                of memory; it persists between runs
+            shards (int): Number of worker processes to validate feeds in,
+                split by host; 1 validates in this process's event loop
+            parse_workers (Optional[int]): Number of processes feeds are
+                parsed in; None uses one per CPU and 0 parses in this thread
+            timeout_bounds (Tuple[float, float]): Shortest and longest timeout,
+                in seconds, a host can be given from its past response times
+            archive_dir (Optional[str]): Directory every fetched feed is kept
+                in, compressed
+            replay (bool): Fetch nothing from the network and answer from the
+                archive instead, e.g. to re-evaluate genre rules offline
+        """
         self.opml_file = Path(opml_file)
         self.deleted_file = Path("deleted_feeds.opml")
         self.invalid_file = Path("invalid_feeds.opml")
-        self.feeds: Dict[str, Feed] = {}
-        self.genre_detector = GenreDetector()
-        self.feed_validator = FeedValidator(timeout=10)
+        self.genre_memo_file = Path("genre_memo.json")
+        self.latency_file = Path("feed_latency.json")
+        # Parsed copy of the OPML file, so unchanged files aren't parsed again
+        self.snapshot = OPMLSnapshot(self.opml_file)
+        # Results of the validation run in progress, to resume it if interrupted
+        self.checkpoint = validation_checkpoint.ValidationCheckpoint(
+            Path("validation_checkpoint.ndjson")
+        )
+        self.shards = shards
+        self.feeds: MutableMapping[str, Feed] = (
+            feed_store.SQLiteFeedStore(db_file) if db_file else {}
+        )
+        # Latest validation result of every feed checked, keyed by URL
+        self.validation_results: Dict[str, Tuple[bool, Optional[str]]] = {}
+        # URLs of feeds added to the catalog but not checked yet
+        self.pending: Set[str] = set()
+        # Counters of the last load, shown in the run summary
+        self.run_stats: Dict[str, Any] = {}
+        self.genre_detector = GenreDetector(memo_file=self.genre_memo_file)
+        self.parse_pool = ParsePool(workers=parse_workers)
+        self.feed_validator = FeedValidator(
+            timeout=10,
+            # Archived answers come back the same on a retry
+            retry_delay=0.0 if replay else 1.0,
+            parse_pool=self.parse_pool,
+            # Replayed response times say nothing about the hosts
+            latency_tracker=LatencyTracker(None if replay else self.latency_file),
+            timeout_bounds=timeout_bounds,
+            archive=(
+                feed_archive.FeedArchive(Path(archive_dir)) if archive_dir else None
+            ),
+            replay=replay,
+        )
+        self.duplicate_detector = DuplicateDetector()
+        self.article_cache = ArticleCache(self.feed_validator)
+        # Set by monitor_loop when event loop lag is being measured
+        self.loop_monitor: Optional["loop_monitor.LoopLagMonitor"] = None
+        # Built on the first search, then kept up to date by the methods below
+        self._search_index: Optional["search_index.SearchIndex"] = None
+        # Background build of the index, and the edits made while it runs,
+        # by feed hash (None for feeds removed)
+        self._index_build: Optional["asyncio.Task"] = None
+        self._index_backlog: Optional[Dict[str, Optional[Feed]]] = None
+        # Whether the catalog has edits the OPML file doesn't have yet, and a
+        # count of edits, to tell whether more came in while saving
+        self.dirty = False
+        self.edits = 0
+        # Set by enable_autosave: quiet period before saving, pending timer
+        # and the save in progress
+        self.autosave_delay: Optional[float] = None
+        self.autosaves = 0
+        self._autosave_loop: Optional["asyncio.AbstractEventLoop"] = None
+        self._autosave_timer: Optional["asyncio.TimerHandle"] = None
+        self._autosave_task: Optional["asyncio.Task"] = None
+
+    def monitor_loop(self, threshold: float = 0.1) -> None:
+        """Measure the running event loop's lag until the manager is closed.
+
+        Stalls longer than ``threshold`` seconds are logged with the code
+        that caused them, and the lag is added to the run summary.
+        """
+        self.loop_monitor = loop_monitor.LoopLagMonitor(threshold=threshold)
+        self.loop_monitor.start()
+
+    def enable_autosave(self, delay: float = 2.0) -> None:
+        """Save the OPML file in the background once edits pause.
+
+        Every edit pushes the save back by ``delay`` seconds, so a burst of
+        edits is written once. The file is built and written in a worker
+        thread, leaving the event loop free.
+        """
+        self.autosave_delay = delay
+        self._autosave_loop = asyncio.get_running_loop()
+        if self.dirty:
+            self._schedule_autosave()
+
+    def _mark_dirty(self) -> None:
+        """Record an edit to the catalog and push the next autosave back."""
+        self.dirty = True
+        self.edits += 1
+        if self.autosave_delay is not None:
+            self._schedule_autosave()
+
+    def _schedule_autosave(self) -> None:
+        if self._autosave_timer is not None:
+            self._autosave_timer.cancel()
+        self._autosave_timer = self._autosave_loop.call_later(
+            self.autosave_delay, self._start_autosave
+        )
+
+    def _start_autosave(self) -> None:
+        self._autosave_timer = None
+        if self._autosave_task is not None and not self._autosave_task.done():
+            # One save at a time; try again once the current one is done
+            self._schedule_autosave()
+            return
+        self._autosave_task = self._autosave_loop.create_task(self._autosave())
+
+    async def _autosave(self) -> None:
+        """Write the catalog as it is now to the OPML file, off the event loop."""
+        edits = self.edits
+        # Copies, so edits made while the file is written can't tear it
+        feeds = [copy.copy(feed) for feed in self.feeds.values()]
+        try:
+            await asyncio.to_thread(self._write_opml, self.opml_file, feeds, True)
+        except OSError as e:
+            logging.error(f"Autosave of {self.opml_file} failed: {e}")
+            return
+        self.autosaves += 1
+        # Edits made while saving are left for the next save
+        if self.edits == edits:
+            self.dirty = False
+
+    async def flush(self) -> None:
+        """Save pending edits now rather than after the quiet period."""
+        if self._autosave_timer is not None:
+            self._autosave_timer.cancel()
+            self._autosave_timer = None
+        if self._autosave_task is not None:
+            await asyncio.gather(self._autosave_task, return_exceptions=True)
+            self._autosave_task = None
+        if self.dirty:
+            await self._autosave()
+
+    async def close(self) -> None:
+        """Stop background work, save the genre memo and release resources.
+
+        With autosave enabled, edits not saved yet are written first.
+        """
+        if self.autosave_delay is not None:
+            await self.flush()
+        if self.loop_monitor is not None:
+            self.loop_monitor.stop()
+        self.genre_detector.save_memo()
+        if self.feed_validator.completion:
+            # Only a run that validated feeds here has new latencies to keep
+            self.feed_validator.latency_tracker.save()
+        await self.article_cache.close()
+        await self.feed_validator.close()
+        self.parse_pool.close()
+        self.close_catalog()
+
+    def close_catalog(self) -> None:
+        """Close the database the catalog is kept in, if any.
+
+        All that commands which only read or write the catalog need, without
+        an event loop; close does this too.
+        """
+        if isinstance(self.feeds, feed_store.SQLiteFeedStore):
+            self.feeds.close()
+
+    @staticmethod
+    def _feed_from_outline(
+        feed_data, attributes: Optional[Dict[str, str]] = None
+    ) -> Feed:
+        """Build a Feed from a listparser feed entry.
+
+        Args:
+            feed_data: listparser feed entry
+            attributes (Optional[Dict[str, str]]): All attributes of the
+                feed's outline, which listparser only partly keeps
+        """
+        attributes = attributes or {}
+        # The genre is the enclosing outline; other tools use the ``category``
+        # attribute for slash-delimited paths, so it isn't read
+        categories = feed_data.get("categories") or [[]]
+        genre = categories[0][-1] if categories[0] else "Other"
+        deleted_at = None
+        if attributes.get("deletedAt"):
+            try:
+                deleted_at = datetime.fromisoformat(attributes["deletedAt"])
+            except ValueError:
+                pass
+        return Feed(
+            title=feed_data.title or "",
+            url=feed_data.url,
+            genre=genre,
+            description=attributes.get("description", ""),
+            deleted_at=deleted_at,
+            original_url=attributes.get("originalUrl") or None,
+        )
+
+    @classmethod
+    def _feeds_from_text(cls, text: str) -> List[Feed]:
+        """Parse the feeds of an OPML document, keeping every attribute we write."""
+        attributes = outline_attributes(text)
+        return [
+            cls._feed_from_outline(feed_data, attributes.get(feed_data.url))
+            for feed_data in listparser.parse(text).feeds
+        ]
+
+    def read_opml(self, save_snapshot: bool = True) -> List[Feed]:
+        """Parse the OPML file into feeds without validating them.
+
+        While the file is unchanged, its snapshot is loaded instead of
+        parsing it again, and the validation results saved with it are
+        restored.
+
+        Args:
+            save_snapshot (bool): Write a snapshot of a file that had to be
+                parsed; commands that only read files leave none behind
+        """
+        cached = self.snapshot.load()
+        if cached is not None:
+            feeds, validation_results = cached
+            self.validation_results.update(validation_results)
+            return feeds
+
+        try:
+            stat = os.stat(self.opml_file)
+        except OSError:
+            stat = None
+        # listparser takes the whole document; a compressed file is
+        # decompressed as it is read, straight into memory
+        with open_text(self.opml_file) as f:
+            text = f.read()
+        feeds = self._feeds_from_text(text)
+        if stat is not None:
+            self.snapshot.stamp(stat, text, feeds)
+            if save_snapshot:
+                self.snapshot.save(self.validation_results)
+        return feeds
 
     async def load_opml(self) -> Tuple[int, Dict[str, str]]:
         """Load and parse the OPML file using listparser.
@@ -30,65 +305,296 @@ class FeedManager:
             Tuple[int, Dict[str, str]]: Number of feeds loaded and dict of invalid feeds with errors
         """
         try:
-            with open(self.opml_file) as f:
-                result = listparser.parse(f.read())
-
-            # First pass: Create Feed objects
-            feeds_to_validate = []
-            feed_map = {}  # Map URLs to Feed objects
-
-            for feed_data in result.feeds:
-                feed = Feed(
-                    title=feed_data.title or "",
-                    url=feed_data.url,
-                    genre=getattr(feed_data, "category", "Other"),
-                    description=getattr(feed_data, "description", ""),
-                )
-                feeds_to_validate.append(feed_data.url)
-                feed_map[feed_data.url] = feed
-
-            # Validate all feeds concurrently
-            validation_results = await self.feed_validator.validate_feeds(
-                feeds_to_validate
+            started = time.perf_counter()
+            # First pass: Create Feed objects, keyed by URL
+            feed_map = {feed.url: feed for feed in self.read_opml()}
+            validation_results = await self._validate(feed_map)
+            loaded = await self._process_validation_results(
+                feed_map, validation_results
             )
-
-            # Process results
-            invalid_feeds = {}
-            for url, (is_valid, error_msg) in validation_results.items():
-                if is_valid:
-                    feed = feed_map[url]
-                    self.feeds[feed.hash] = feed
-                else:
-                    invalid_feeds[url] = error_msg or "Unknown error"
-
-            # Save invalid feeds to separate file
-            if invalid_feeds:
-                # Group invalid feeds by their original category
-                invalid_feeds_by_genre: Dict[str, List[Feed]] = {}
-                for url, error in invalid_feeds.items():
-                    feed = feed_map[url]
-                    if feed.genre not in invalid_feeds_by_genre:
-                        invalid_feeds_by_genre[feed.genre] = []
-
-                    # Create a copy of the feed with error in description
-                    invalid_feed = Feed(
-                        title=feed.title,
-                        url=url,
-                        genre=feed.genre,  # Preserve original genre
-                        description=f"{feed.description}\nValidation Error: {error}",
-                    )
-                    invalid_feeds_by_genre[feed.genre].append(invalid_feed)
-                await self._save_invalid_feeds(invalid_feeds_by_genre)
-
-            logging.info(f"Loaded {len(self.feeds)} valid feeds from OPML file")
-            logging.warning(f"Found {len(invalid_feeds)} invalid feeds")
-
-            return len(self.feeds), invalid_feeds
+            self.run_stats["validation_seconds"] = time.perf_counter() - started
+            return loaded
 
         except Exception as e:
             logging.error(f"Error loading OPML file: {str(e)}")
             raise
 
+    def stage_opml(self) -> Dict[str, Feed]:
+        """Add the OPML file's feeds to the catalog without checking them.
+
+        Feeds already in the catalog are kept as they are.
+
+        Returns:
+            Dict[str, Feed]: Every feed of the file, keyed by URL
+        """
+        feed_map = {feed.url: feed for feed in self.read_opml()}
+        staged = {
+            feed.hash: feed for feed in feed_map.values() if feed.hash not in self.feeds
+        }
+        self.feeds.update(staged)
+        self._index(staged)
+        return feed_map
+
+    def start_loading(
+        self, rules: Optional["genre_rules.GenreRules"] = None
+    ) -> "asyncio.Task":
+        """Load the OPML file, checking its feeds in a background task.
+
+        Feeds are added to the catalog straight away, so it can be used
+        while they are checked; ``pending`` holds the URLs not checked yet.
+        Each valid feed still in "Other" is classified as soon as its result
+        arrives, from the entries fetched to validate it. Once every feed is
+        checked, the task sets invalid ones aside as load_opml does, removes
+        duplicates and classifies the feeds that are still in "Other".
+
+        Args:
+            rules (Optional[GenreRules]): Rules applied before anything is fetched
+
+        Returns:
+            asyncio.Task: Resolves to the number of feeds loaded and a dict of invalid feeds with errors
+        """
+        started = time.perf_counter()
+        feed_map = self.stage_opml()
+        if rules:
+            self.apply_genre_rules(rules)
+        self.pending.update(feed_map)
+        return asyncio.create_task(self._check_staged(feed_map, started))
+
+    async def _check_staged(
+        self, feed_map: Dict[str, Feed], started: float
+    ) -> Tuple[int, Dict[str, str]]:
+        def on_result(url: str, result: Any) -> None:
+            self.pending.discard(url)
+            if isinstance(result, BaseException):
+                result = (False, f"Unexpected error: {result}")
+            self.validation_results[url] = result
+            feed_hash = feed_map[url].hash
+            entries = self.feed_validator.entries.get(url)
+            if result[0] and entries and feed_hash in self.feeds:
+                if self.feeds[feed_hash].genre == "Other":
+                    genre = self.genre_detector.classify_entries(entries, url=url)
+                    if genre != "Other":
+                        self.set_genre(feed_hash, genre)
+
+        try:
+            validation_results = await self._validate(feed_map, on_result=on_result)
+            _, invalid_feeds = await self._process_validation_results(
+                feed_map, validation_results, staged=True
+            )
+        finally:
+            self.pending.clear()
+        self.run_stats["validation_seconds"] = time.perf_counter() - started
+
+        self.dedupe_feeds()
+        for feed_hash, feed in list(self.feeds.items()):
+            if feed.genre == "Other":
+                genre = await self.guess_genre(feed.url)
+                # The feed may have been deleted while its genre was guessed
+                if feed_hash in self.feeds:
+                    self.set_genre(feed_hash, genre)
+        return len(self.feeds), invalid_feeds
+
+    async def _validate(
+        self,
+        feed_map: Dict[str, Feed],
+        on_result: Optional[Callable[[str, Any], None]] = None,
+    ) -> Dict[str, Tuple[bool, Optional[str]]]:
+        """Validate feeds concurrently, across worker processes if sharded.
+
+        In this process, results are checkpointed as they arrive. If the run
+        is interrupted, loading the same OPML file again only checks the
+        feeds that were left, and ends with the same results.
+        """
+        if self.shards > 1:
+            shard = await sharding.validate_sharded(
+                list(feed_map),
+                self.shards,
+                timeout=self.feed_validator.timeout,
+                retry_delay=self.feed_validator.retry_delay,
+            )
+            results = self._absorb_shard(shard)
+            if on_result is not None:
+                # Shard workers only report back once they are all done
+                for url, result in results.items():
+                    on_result(url, result)
+            return results
+        if self.snapshot.key is None or self.feed_validator.replay:
+            # Feeds that weren't read from a file have no run to resume, and
+            # replays are quick and must not mix with live runs
+            return await self.feed_validator.validate_feeds(
+                list(feed_map), on_result=on_result
+            )
+        return await self._validate_checkpointed(feed_map, on_result)
+
+    async def revalidate(self) -> Dict[str, Tuple[bool, Optional[str]]]:
+        """Check every feed in the catalog again, keeping the catalog as is.
+
+        Unlike load_opml, invalid feeds are not set aside: their results are
+        recorded so callers such as the daemon can report them.
+
+        Returns:
+            Dict[str, Tuple[bool, Optional[str]]]: Result of each feed, by URL
+        """
+        started = time.perf_counter()
+        urls = [feed.url for feed in self.feeds.values()]
+        results = await self.feed_validator.validate_feeds(urls)
+        for url, result in results.items():
+            if isinstance(result, BaseException):
+                result = (False, f"Unexpected error: {result}")
+            self.validation_results[url] = results[url] = result
+
+        valid = sum(1 for is_valid, _ in results.values() if is_valid)
+        self.run_stats.update(
+            checked=len(results),
+            valid=valid,
+            invalid=len(results) - valid,
+            validation_seconds=time.perf_counter() - started,
+        )
+        self.snapshot.save(self.validation_results)
+        logging.info(f"Revalidated {len(results)} feeds, {valid} valid")
+        return results
+
+    async def _validate_checkpointed(
+        self,
+        feed_map: Dict[str, Feed],
+        on_result: Optional[Callable[[str, Any], None]] = None,
+    ) -> Dict[str, Tuple[bool, Optional[str]]]:
+        # The checkpoint belongs to this file and this set of feeds. It isn't
+        # keyed on the file's content, since autosave rewrites the file while
+        # feeds are checked (e.g. with the genres guessed) but keeps every URL
+        run_key = content_digest(
+            "\n".join([str(self.opml_file.resolve()), *sorted(feed_map)])
+        )
+        # Entries recorded with the results come back with them
+        done = self.checkpoint.resume(run_key)
+        self._absorb_shard(done)
+        results: Dict[str, Any] = {
+            url: result for url, result in done.results.items() if url in feed_map
+        }
+        if on_result is not None:
+            for url, result in results.items():
+                on_result(url, result)
+
+        def checkpointed(url: str, result: Any) -> None:
+            self.checkpoint.append(url, result, self.feed_validator)
+            if on_result is not None:
+                on_result(url, result)
+
+        try:
+            results.update(
+                await self.feed_validator.validate_feeds(
+                    [url for url in feed_map if url not in results],
+                    on_result=checkpointed,
+                )
+            )
+        finally:
+            self.checkpoint.close()
+        self.checkpoint.discard()
+        return {url: results[url] for url in feed_map}
+
+    async def merge_shard_results(
+        self, paths: List[Path]
+    ) -> Tuple[int, Dict[str, str]]:
+        """Load the OPML file using results written by separate shard runs.
+
+        Returns:
+            Tuple[int, Dict[str, str]]: Number of feeds loaded and dict of invalid feeds with errors
+
+        Raises:
+            ValueError: If some feeds are missing from every result file
+        """
+        feed_map = {feed.url: feed for feed in self.read_opml()}
+        shard = sharding.load_shard_files(paths)
+        missing = [url for url in feed_map if url not in shard.results]
+        if missing:
+            raise ValueError(
+                f"{len(missing)} feeds have no shard results; run the missing shards first"
+            )
+        return await self._process_validation_results(
+            feed_map, self._absorb_shard(shard)
+        )
+
+    def _absorb_shard(
+        self, shard: "sharding.ShardResult"
+    ) -> Dict[str, Tuple[bool, Optional[str]]]:
+        """Adopt what shard workers learned as if this validator had run."""
+        self.feed_validator.redirects.update(shard.redirects)
+        self.feed_validator.entry_keys.update(shard.entry_keys)
+        self.feed_validator.entries.update(shard.entries)
+        return shard.results
+
+    async def _process_validation_results(
+        self,
+        feed_map: Dict[str, Feed],
+        validation_results: Dict[str, Tuple[bool, Optional[str]]],
+        staged: bool = False,
+    ) -> Tuple[int, Dict[str, str]]:
+        """Add valid feeds to the catalog and set invalid ones aside.
+
+        With ``staged``, the feeds were added to the catalog before being
+        checked, so none is added here: any that is missing was deleted or
+        merged away while the check ran, and stays out.
+        """
+        # Process results in OPML order
+        valid_feeds = {}
+        invalid_feeds = {}
+        for url, feed in feed_map.items():
+            result = validation_results[url]
+            if isinstance(result, BaseException):
+                result = (False, f"Unexpected error: {result}")
+            is_valid, error_msg = result
+            self.validation_results[url] = (is_valid, error_msg)
+            if is_valid:
+                valid_feeds[feed.hash] = feed
+            else:
+                invalid_feeds[url] = error_msg or "Unknown error"
+        # Feeds already in the catalog were added before being checked and
+        # may have been edited since, so only new ones are added
+        existing = set(self.feeds.keys())
+        added = {
+            feed_hash: feed
+            for feed_hash, feed in valid_feeds.items()
+            if not staged and feed_hash not in existing
+        }
+        # A single update lets a database-backed catalog write in one batch
+        self.feeds.update(added)
+        self._index(added)
+        for url in invalid_feeds:
+            feed_hash = feed_map[url].hash
+            if feed_hash in existing:
+                del self.feeds[feed_hash]
+                self._unindex(feed_hash)
+
+        # Save invalid feeds to separate file
+        if invalid_feeds:
+            # Group invalid feeds by their original category
+            invalid_feeds_by_genre: Dict[str, List[Feed]] = {}
+            for url, error in invalid_feeds.items():
+                feed = feed_map[url]
+                if feed.genre not in invalid_feeds_by_genre:
+                    invalid_feeds_by_genre[feed.genre] = []
+
+                # Create a copy of the feed with error in description
+                invalid_feed = Feed(
+                    title=feed.title,
+                    url=url,
+                    genre=feed.genre,  # Preserve original genre
+                    description=f"{feed.description}\nValidation Error: {error}",
+                )
+                invalid_feeds_by_genre[feed.genre].append(invalid_feed)
+            await self._save_invalid_feeds(invalid_feeds_by_genre)
+            # The catalog no longer matches the OPML file it was read from
+            self._mark_dirty()
+
+        self.run_stats.update(
+            checked=len(feed_map), valid=len(valid_feeds), invalid=len(invalid_feeds)
+        )
+        self.snapshot.save(self.validation_results)
+        logging.info(f"Loaded {len(self.feeds)} valid feeds from OPML file")
+        logging.warning(f"Found {len(invalid_feeds)} invalid feeds")
+
+        return len(self.feeds), invalid_feeds
+
     async def _save_invalid_feeds(self, invalid_feeds_by_genre: List[Feed]) -> None:
         """Save invalid feeds to a separate OPML file."""
         root = create_opml_tree(
@@ -117,23 +623,307 @@ class FeedManager:
 
         for hash_to_remove in duplicate_hashes:
             del self.feeds[hash_to_remove]
+            self._unindex(hash_to_remove)
+        if duplicate_hashes:
+            self._mark_dirty()
 
         logging.info(f"Removed {len(duplicate_hashes)} duplicate feeds")
         return len(duplicate_hashes)
 
+    def set_genre(self, feed_hash: str, genre: str) -> None:
+        """Change the genre of a feed."""
+        feed = self.feeds[feed_hash]
+        feed.genre = genre
+        # Write back, since a database-backed catalog hands out copies
+        self.feeds[feed_hash] = feed
+        self._index({feed_hash: feed})
+        self._mark_dirty()
+
+    def apply_genre_rules(self, rules: "genre_rules.GenreRules") -> int:
+        """Assign genres from declarative rules in one pass over the catalog.
+
+        Run before guessing genres from feed content, so that feeds the rules
+        cover never need to be fetched for it.
+
+        Returns:
+            int: Number of feeds whose genre changed
+        """
+        changed: Dict[str, Feed] = {}
+        for feed_hash, feed in self.feeds.items():
+            genre = rules.match(feed)
+            if genre and genre != feed.genre:
+                changed[feed_hash] = replace(feed, genre=genre)
+        self.feeds.update(changed)
+        self._index(changed)
+        if changed:
+            self._mark_dirty()
+        self.genre_detector.genres.update(rule.genre for rule in rules.rules)
+
+        logging.info(f"Genre rules changed the genre of {len(changed)} feeds")
+        return len(changed)
+
+    async def guess_genre(self, url: str) -> str:
+        """Guess a feed's genre, reusing the entries fetched during validation.
+
+        Feeds that were not validated in this session are fetched through
+        the shared session and parsed in the parse pool.
+        """
+        entries = self.feed_validator.entries.get(url)
+        if entries is None:
+            try:
+                content = await self.feed_validator.fetch_text(url)
+                entries = (await self.parse_pool.parse(content)).entries
+            except Exception as e:
+                logging.warning(f"Error guessing genre for {url}: {str(e)}")
+                return "Other"
+        return self.genre_detector.classify_entries(entries, url=url)
+
+    def run_summary(self) -> Dict[str, Any]:
+        """Return the counters of the last load along with parse pool usage,
+        and event loop lag if it is being measured."""
+        pool = self.parse_pool.stats()
+        # How long it took for a share of the checks to finish, against what
+        # earlier runs' durations predicted
+        curves = self.feed_validator.completion
+        completion = {
+            f"completion_{label}_seconds": (
+                f"{percentile(curves['expected'], pct):.2f} expected, "
+                f"{percentile(curves['actual'], pct):.2f} actual"
+            )
+            for label, pct in (("p50", 50), ("p90", 90), ("p99", 99), ("max", 100))
+            if curves
+        }
+        return dict(
+            self.run_stats,
+            **completion,
+            parse_workers=pool["workers"],
+            feeds_parsed=pool["parsed"],
+            peak_parse_queue_depth=pool["peak_queue_depth"],
+            hosts_with_learned_timeouts=(
+                self.feed_validator.latency_tracker.learned_hosts()
+            ),
+            genres_memoized=self.genre_detector.memo_hits,
+            genres_scored=self.genre_detector.memo_misses,
+            **(self.loop_monitor.summary() if self.loop_monitor else {}),
+        )
+
+    def search(self, query: str, limit: int = 20) -> List[str]:
+        """Find feeds by fuzzy match on title, URL, host, genre or description.
+
+        The index is built on the first search. That takes seconds for a
+        large catalog, so code running on the event loop should await
+        prepare_search first.
+
+        Returns:
+            List[str]: Hashes of the best matching feeds, best first
+        """
+        if self._search_index is None:
+            self._search_index = search_index.SearchIndex.build(self.feeds)
+        return [
+            feed_hash
+            for feed_hash, _ in self._search_index.search(query, limit)
+            if feed_hash in self.feeds
+        ]
+
+    async def prepare_search(self) -> None:
+        """Build the search index in a worker thread, unless it is built.
+
+        The event loop keeps running meanwhile; edits made to the catalog
+        during the build are applied to the index once it is ready.
+        """
+        if self._search_index is not None:
+            return
+        if self._index_build is None or self._index_build.done():
+            self._index_build = asyncio.create_task(self._build_search_index())
+        # A caller giving up doesn't stop the build others may be waiting on
+        await asyncio.shield(self._index_build)
+
+    async def _build_search_index(self) -> None:
+        feeds = dict(self.feeds.items())
+        self._index_backlog = {}
+        try:
+            index = await asyncio.to_thread(search_index.SearchIndex.build, feeds)
+        finally:
+            backlog, self._index_backlog = self._index_backlog, None
+        if self._search_index is not None:
+            return  # A search built one meanwhile, and kept it up to date
+        for feed_hash, feed in backlog.items():
+            if feed is None:
+                index.remove(feed_hash)
+            else:
+                index.add(feed_hash, feed)
+        self._search_index = index
+
+    def _index(self, feeds: Mapping[str, Feed]) -> None:
+        if self._search_index is not None:
+            for feed_hash, feed in feeds.items():
+                self._search_index.add(feed_hash, feed)
+        elif self._index_backlog is not None:
+            self._index_backlog.update(feeds)
+
+    def _unindex(self, feed_hash: str) -> None:
+        if self._search_index is not None:
+            self._search_index.remove(feed_hash)
+        elif self._index_backlog is not None:
+            self._index_backlog[feed_hash] = None
+
+    def genre_counts(self) -> Dict[str, int]:
+        """Return the number of feeds in each genre."""
+        if isinstance(self.feeds, feed_store.SQLiteFeedStore):
+            return self.feeds.genre_counts()
+        counts: Dict[str, int] = {}
+        for feed in self.feeds.values():
+            counts[feed.genre] = counts.get(feed.genre, 0) + 1
+        return counts
+
+    def find_near_duplicates(self, threshold: float = 0.5) -> List[List[str]]:
+        """Find feeds that mirror each other under different URLs.
+
+        Works from the entries the validator already fetched, so feeds that
+        were not validated in this session are not considered.
+
+        Returns:
+            List[List[str]]: Clusters of feed hashes, each in catalog order
+        """
+        keys_by_hash = {}
+        for feed_hash, feed in self.feeds.items():
+            keys = self.feed_validator.entry_keys.get(feed.url)
+            if keys:
+                keys_by_hash[feed_hash] = keys
+        return self.duplicate_detector.find_clusters(keys_by_hash, threshold)
+
+    def merge_near_duplicates(self, clusters: List[List[str]]) -> int:
+        """Keep the first feed of each cluster and drop the other mirrors."""
+        removed = 0
+        for cluster in clusters:
+            kept = self.feeds.get(cluster[0])
+            for feed_hash in cluster[1:]:
+                mirror = self.feeds.pop(feed_hash, None)
+                self._unindex(feed_hash)
+                if mirror and kept:
+                    removed += 1
+                    logging.info(f"Merged {mirror.url} into {kept.url}")
+        if removed:
+            self._mark_dirty()
+
+        logging.info(f"Removed {removed} near-duplicate feeds")
+        return removed
+
+    def pending_redirects(self) -> Dict[str, str]:
+        """Return feeds that permanently moved, as a mapping of feed hash to new URL."""
+        moved = {}
+        for feed_hash, feed in self.feeds.items():
+            new_url = self.feed_validator.permanent_location(feed.url)
+            if new_url:
+                moved[feed_hash] = new_url
+        return moved
+
+    def apply_redirects(self) -> int:
+        """Rewrite permanently redirected feeds to their final URL.
+
+        The URL the feed was first subscribed under is kept in ``original_url``
+        so it survives any number of later moves.
+        """
+        moved = self.pending_redirects()
+        for feed_hash, new_url in moved.items():
+            feed = self.feeds.pop(feed_hash)
+            self._unindex(feed_hash)
+            moved_feed = replace(
+                feed, url=new_url, original_url=feed.original_url or feed.url
+            )
+            # If the new location is already subscribed, the old entry was a duplicate
+            if moved_feed.hash not in self.feeds:
+                self.feeds[moved_feed.hash] = moved_feed
+                self._index({moved_feed.hash: moved_feed})
+        if moved:
+            self._mark_dirty()
+
+        logging.info(f"Rewrote {len(moved)} permanently redirected feeds")
+        return len(moved)
+
+    def export_catalog(self, filename: Path) -> int:
+        """Stream the catalog with its health and redirect data to NDJSON or CSV.
+
+        Returns:
+            int: Number of feeds written
+        """
+        records = (
+            catalog_io.feed_record(
+                feed,
+                self.validation_results.get(feed.url),
+                self.feed_validator.permanent_location(feed.url),
+            )
+            for feed in self.feeds.values()
+        )
+        count = catalog_io.export_records(filename, records)
+        logging.info(f"Exported {count} feeds to {filename}")
+        return count
+
+    def import_catalog(self, filename: Path, batch_size: int = 1000) -> int:
+        """Stream feeds from an NDJSON or CSV export into the catalog.
+
+        Feeds are written in batches, so a database-backed catalog never
+        holds more than one batch in memory.
+
+        Returns:
+            int: Number of feeds read
+        """
+        count = 0
+        batch: Dict[str, Feed] = {}
+        for record in catalog_io.import_records(filename):
+            feed = catalog_io.record_to_feed(record)
+            batch[feed.hash] = feed
+            health = catalog_io.record_health(record)
+            if health is not None:
+                self.validation_results[feed.url] = health
+            count += 1
+            if len(batch) >= batch_size:
+                self.feeds.update(batch)
+                self._index(batch)
+                batch = {}
+        self.feeds.update(batch)
+        self._index(batch)
+        if count:
+            self._mark_dirty()
+
+        logging.info(f"Imported {count} feeds from {filename}")
+        return count
+
     def save_opml(self, filename: Path) -> None:
         """Save feeds to an OPML file."""
+        edits = self.edits
+        self._write_opml(filename, self.feeds.values())
+        if Path(filename) == self.opml_file and self.edits == edits:
+            self.dirty = False
+
+    @staticmethod
+    def _write_opml(filename: Path, feeds, atomic: bool = False) -> None:
+        """Write feeds to an OPML file, grouped by genre.
+
+        Args:
+            filename (Path): File to write
+            feeds: Feeds to write
+            atomic (bool): Write beside the file and swap it in, so a crash
+                mid-write never leaves it torn
+
+        Files named ``.gz`` or ``.zst`` are compressed as they are written.
+        """
         genre_feeds: Dict[str, List[Feed]] = {}
-        for feed in self.feeds.values():
+        for feed in feeds:
             if feed.genre not in genre_feeds:
                 genre_feeds[feed.genre] = []
             genre_feeds[feed.genre].append(feed)
 
         root = create_opml_tree(genre_feeds)
-        xmlstr = minidom.parseString(ET.tostring(root)).toprettyxml(indent="  ")
+        document = minidom.parseString(ET.tostring(root))
 
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(xmlstr)
+        path = Path(filename)
+        target = path.with_name(path.name + ".tmp") if atomic else filename
+        with open_text(target, "w", compression_of(path)) as f:
+            # Streamed out as it is serialized, as toprettyxml would format it
+            document.writexml(f, "", "  ", "\n")
+        if atomic:
+            os.replace(target, path)
 
         logging.info(f"Saved OPML file to {filename}")
 
@@ -144,18 +934,9 @@ class FeedManager:
             deleted_feeds: List[Feed] = []
             if self.deleted_file.exists():
                 with open(self.deleted_file) as f:
-                    result = listparser.parse(f.read())
-                for feed_data in result.feeds:
-                    feed = Feed(
-                        title=feed_data.title,
-                        url=feed_data.url,
-                        genre=getattr(feed_data, "category", "Other"),
-                        description=getattr(feed_data, "description", ""),
-                        deleted_at=datetime.fromisoformat(
-                            getattr(feed_data, "deletedAt", datetime.now().isoformat())
-                        ),
-                    )
-                    deleted_feeds.append(feed)
+                    for feed in self._feeds_from_text(f.read()):
+                        feed.deleted_at = feed.deleted_at or datetime.now()
+                        deleted_feeds.append(feed)
 
             # Add the feed to deleted feeds
             feed = self.feeds[feed_hash]
@@ -177,6 +958,8 @@ class FeedManager:
 
             # Remove from active feeds
             del self.feeds[feed_hash]
+            self._unindex(feed_hash)
+            self._mark_dirty()
             logging.info(f"Moved feed {feed.title} to deleted feeds")
 
         except Exception as e:
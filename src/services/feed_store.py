@@ -0,0 +1,176 @@
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, Mapping, MutableMapping, Tuple
+
+from src.models.feed import Feed
+from src.utils.lazy_import import lazy_import
+from src.utils.url_helpers import host_of
+
+sqlite3 = lazy_import("sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS feeds (
+    hash TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    host TEXT NOT NULL,
+    title TEXT NOT NULL,
+    genre TEXT NOT NULL,
+    description TEXT NOT NULL,
+    deleted_at TEXT,
+    original_url TEXT
+);
+CREATE INDEX IF NOT EXISTS feeds_url ON feeds (url);
+CREATE INDEX IF NOT EXISTS feeds_genre ON feeds (genre);
+CREATE INDEX IF NOT EXISTS feeds_host ON feeds (host);
+"""
+
+COLUMNS = "hash, url, host, title, genre, description, deleted_at, original_url"
+
+UPSERT = f"""
+INSERT INTO feeds ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (hash) DO UPDATE SET
+    url = excluded.url,
+    host = excluded.host,
+    title = excluded.title,
+    genre = excluded.genre,
+    description = excluded.description,
+    deleted_at = excluded.deleted_at,
+    original_url = excluded.original_url
+"""
+
+
+def _to_row(feed_hash: str, feed: Feed) -> Tuple:
+    return (
+        feed_hash,
+        feed.url,
+        host_of(feed.url),
+        feed.title,
+        feed.genre,
+        feed.description,
+        feed.deleted_at.isoformat() if feed.deleted_at else None,
+        feed.original_url,
+    )
+
+
+def _from_row(row: Tuple) -> Feed:
+    _, url, _, title, genre, description, deleted_at, original_url = row
+    return Feed(
+        title=title,
+        url=url,
+        genre=genre,
+        description=description,
+        deleted_at=datetime.fromisoformat(deleted_at) if deleted_at else None,
+        original_url=original_url,
+    )
+
+
+class SQLiteFeedStore(MutableMapping[str, Feed]):
+    """Feed catalog persisted in SQLite.
+
+    Behaves like the ``Dict[str, Feed]`` that FeedManager keeps in memory,
+    keyed by feed hash and iterated in insertion order, so it can be used in
+    its place. Feeds returned are copies: assign a modified feed back to
+    persist the change.
+    """
+
+    def __init__(self, path: str):
+        """Open (or create) a feed catalog database.
+
+        Args:
+            path (str): Database file; WAL and SHM files are kept beside it
+        """
+        self.path = Path(path)
+        # Autocommit mode; multi-row writes are grouped explicitly in batch()
+        self.conn = sqlite3.connect(self.path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._batch_depth = 0
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Group every write made inside the block into one transaction."""
+        if self._batch_depth == 0:
+            self.conn.execute("BEGIN")
+        self._batch_depth += 1
+        try:
+            yield
+        except BaseException:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.conn.execute("ROLLBACK")
+            raise
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            self.conn.execute("COMMIT")
+
+    def __getitem__(self, feed_hash: str) -> Feed:
+        row = self.conn.execute(
+            f"SELECT {COLUMNS} FROM feeds WHERE hash = ?", (feed_hash,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(feed_hash)
+        return _from_row(row)
+
+    def __setitem__(self, feed_hash: str, feed: Feed) -> None:
+        self.conn.execute(UPSERT, _to_row(feed_hash, feed))
+
+    def __delitem__(self, feed_hash: str) -> None:
+        cursor = self.conn.execute("DELETE FROM feeds WHERE hash = ?", (feed_hash,))
+        if cursor.rowcount == 0:
+            raise KeyError(feed_hash)
+
+    def __contains__(self, feed_hash: object) -> bool:
+        return (
+            self.conn.execute(
+                "SELECT 1 FROM feeds WHERE hash = ?", (feed_hash,)
+            ).fetchone()
+            is not None
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        for (feed_hash,) in self.conn.execute("SELECT hash FROM feeds ORDER BY rowid"):
+            yield feed_hash
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM feeds").fetchone()[0]
+
+    def items(self) -> Iterator[Tuple[str, Feed]]:
+        # One streaming query instead of a lookup per key
+        for row in self.conn.execute(f"SELECT {COLUMNS} FROM feeds ORDER BY rowid"):
+            yield row[0], _from_row(row)
+
+    def values(self) -> Iterator[Feed]:
+        for _, feed in self.items():
+            yield feed
+
+    def update(self, feeds: Mapping[str, Feed] = (), **kwargs: Feed) -> None:
+        """Insert or replace many feeds in a single transaction."""
+        rows = dict(feeds, **kwargs)
+        with self.batch():
+            self.conn.executemany(
+                UPSERT, (_to_row(feed_hash, feed) for feed_hash, feed in rows.items())
+            )
+
+    def clear(self) -> None:
+        self.conn.execute("DELETE FROM feeds")
+
+    def genre_counts(self) -> Dict[str, int]:
+        """Return the number of feeds in each genre, using the genre index."""
+        return dict(
+            self.conn.execute("SELECT genre, COUNT(*) FROM feeds GROUP BY genre")
+        )
+
+    def feeds_on_host(self, host: str) -> Dict[str, Feed]:
+        """Return the feeds served from a host, using the host index."""
+        rows = self.conn.execute(
+            f"SELECT {COLUMNS} FROM feeds WHERE host = ? ORDER BY rowid",
+            (host.lower(),),
+        )
+        return {row[0]: _from_row(row) for row in rows}
+
+    def close(self) -> None:
+        self.conn.close()
+        logging.info(f"Closed feed catalog {self.path}")
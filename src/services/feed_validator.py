@@ -1,25 +1,157 @@
-import aiohttp
-import asyncio
-import feedparser
 import logging
-from typing import Tuple, Optional
-from aiohttp import ClientTimeout
+import time
+from typing import Any, Callable, Dict, List, Tuple, Optional
 from urllib.parse import urlparse
 
+from src.services.duplicate_detector import entry_keys
+from src.services.host_resolver import HostResolver
+from src.services.latency_tracker import LatencyTracker, simulate_completion
+from src.services.parse_pool import ParsePool
+from src.utils.lazy_import import lazy_import
+from src.utils.url_helpers import host_of
+
+asyncio = lazy_import("asyncio")
+aiohttp = lazy_import("aiohttp")
+feed_archive = lazy_import("src.services.feed_archive")
+
+# Only these statuses mean "update your bookmarks"; 302/303/307 are temporary.
+PERMANENT_REDIRECT_STATUSES = {301, 308}
+
 
 class FeedValidator:
-    def __init__(self, timeout: int = 10, retry_delay: float = 1.0):
+    def __init__(
+        self,
+        timeout: int = 10,
+        retry_delay: float = 1.0,
+        parse_pool: Optional[ParsePool] = None,
+        concurrency: int = 50,
+        latency_tracker: Optional[LatencyTracker] = None,
+        timeout_factor: float = 3.0,
+        timeout_bounds: Tuple[float, float] = (1.0, 30.0),
+        archive: Optional["feed_archive.FeedArchive"] = None,
+        replay: bool = False,
+        dns_prepass: bool = True,
+    ):
         """Initialize the feed validator.
 
         Args:
-            timeout (int): Maximum time in seconds to wait for a feed response
+            timeout (int): Seconds to wait for a response from a host with no
+                latency history yet
             retry_delay (float): Delay in seconds between validation attempts
+            parse_pool (Optional[ParsePool]): Where feed documents are parsed;
+                by default they are parsed in this thread
+            concurrency (int): Maximum number of feeds checked at once
+            latency_tracker (Optional[LatencyTracker]): Durations of earlier
+                checks and response times of each host, used to start the
+                slowest feeds first and to set per-host timeouts
+            timeout_factor (float): Multiple of a host's p99 response time it
+                is given before timing out
+            timeout_bounds (Tuple[float, float]): Shortest and longest per-host
+                timeout, in seconds
+            archive (Optional[FeedArchive]): Where every fetched feed is kept
+            replay (bool): Answer every fetch from ``archive`` instead of the
+                network
+            dns_prepass (bool): Resolve every host once before checking feeds,
+                failing the feeds of hosts that don't exist straight away
         """
-        self.timeout = ClientTimeout(total=timeout)
+        if replay and archive is None:
+            raise ValueError("Replaying needs an archive")
+        self.timeout = timeout
         self.retry_delay = retry_delay
+        self.parse_pool = parse_pool or ParsePool(workers=0)
+        self.concurrency = concurrency
+        self.latency_tracker = latency_tracker or LatencyTracker()
+        self.timeout_factor = timeout_factor
+        self.timeout_bounds = timeout_bounds
+        self.archive = archive
+        self.replay = replay
+        self.dns_prepass = dns_prepass
+        # Shared with the session's connector, which connects from its cache
+        self.resolver = HostResolver()
+        # Sorted completion times of the last validate_feeds run, in seconds
+        # from its start: "expected" from earlier durations, "actual" as seen
+        self.completion: Dict[str, List[float]] = {}
         self.headers = {
             "User-Agent": "OhPeehMel/1.0 (https://github.com/yourusername/ohpeehmel; feed-validator) Python-Feedparser/6.0.11"
         }
+        # Permanent redirect chains seen for valid feeds: url -> [(status, location)]
+        self.redirects: Dict[str, List[Tuple[int, str]]] = {}
+        # Identifying strings of each valid feed's recent entries, for dedupe
+        self.entry_keys: Dict[str, List[str]] = {}
+        # Latest few entries of each valid feed, so genres can be guessed
+        # without fetching the feed again
+        self.entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def get_session(self) -> "aiohttp.ClientSession":
+        """Return the shared HTTP session, creating it on first use.
+
+        Reusing one session keeps connections and DNS lookups pooled across
+        every feed checked, and lets other services share the same client.
+        When replaying, the session answers from the archive instead.
+        """
+        if self._session is not None and not self._session.closed:
+            return self._session
+        if self.replay:
+            self._session = feed_archive.ReplaySession(self.archive)
+        else:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(resolver=self.resolver),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers=self.headers,
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """Close the shared HTTP session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        await self.resolver.close()
+
+    async def unresolvable_hosts(self, urls: List[str]) -> Dict[str, str]:
+        """Resolve the hosts of some URLs at once, caching their addresses.
+
+        Returns:
+            Dict[str, str]: Error of each of the hosts that don't exist
+        """
+        if not self.dns_prepass or self.replay:
+            return {}
+        return await self.resolver.resolve_all(host_of(url) for url in urls)
+
+    def host_timeout(self, url: str) -> float:
+        """Return the seconds a request to the host of a URL may take."""
+        return self.latency_tracker.host_timeout(
+            url, self.timeout, self.timeout_factor, self.timeout_bounds
+        )
+
+    async def fetch_text(self, url: str) -> str:
+        """Fetch a URL through the shared session and return its body.
+
+        Raises:
+            aiohttp.ClientError: If the request fails or the status is not 2xx
+        """
+        timeout = aiohttp.ClientTimeout(total=self.host_timeout(url))
+        async with self.get_session().get(
+            url, allow_redirects=True, timeout=timeout
+        ) as response:
+            response.raise_for_status()
+            content = await response.text()
+            await self._archive(url, response, content)
+            return content
+
+    async def _archive(self, url: str, response, content: str = "") -> None:
+        """Keep a fetched response in the archive, if recording one."""
+        if self.archive is None or self.replay:
+            return
+        try:
+            # Compressing and writing stay off the event loop
+            await asyncio.to_thread(
+                self.archive.store,
+                feed_archive.archived_response(url, response, content),
+            )
+        except Exception as e:
+            logging.warning(f"Could not archive {url}: {str(e)}")
 
     async def validate_feed(self, url: str) -> Tuple[bool, Optional[str]]:
         """Validate if a URL points to a valid RSS/Atom feed with two attempts.
@@ -42,48 +174,62 @@ class FeedValidator:
 
         # Two validation attempts
         for attempt in range(2):
+            host_timeout = self.host_timeout(url)
             try:
-                async with aiohttp.ClientSession(
-                    timeout=self.timeout, headers=self.headers
-                ) as session:
-                    async with session.get(url, allow_redirects=True) as response:
-                        if response.status != 200:
-                            if attempt == 0:  # Only log first attempt failures
-                                logging.warning(
-                                    f"First attempt failed for {url}: HTTP {response.status}"
-                                )
-                            if attempt < 1:  # Only delay if we're going to retry
-                                await asyncio.sleep(self.retry_delay)
-                            continue  # Try second attempt
-
-                        # Read the content
-                        content = await response.text()
-
-                        # Parse with feedparser
-                        feed = feedparser.parse(content)
-
-                        # Check if it's a valid feed
-                        if feed.bozo:  # feedparser sets bozo on parse errors
-                            if attempt == 0:
-                                logging.warning(
-                                    f"First attempt parse error for {url}: {str(feed.bozo_exception)}"
-                                )
-                            if attempt < 1:
-                                await asyncio.sleep(self.retry_delay)
-                            continue  # Try second attempt
-
-                        # Verify feed has basic required elements
-                        if not hasattr(feed, "entries") or not hasattr(feed, "feed"):
-                            if attempt < 1:
-                                await asyncio.sleep(self.retry_delay)
-                            continue  # Try second attempt
-
-                        # Feed is valid
-                        return True, None
+                session = self.get_session()
+                request_started = time.perf_counter()
+                async with session.get(
+                    url,
+                    allow_redirects=True,
+                    timeout=aiohttp.ClientTimeout(total=host_timeout),
+                ) as response:
+                    if response.status != 200:
+                        self.latency_tracker.record_latency(
+                            url, time.perf_counter() - request_started
+                        )
+                        await self._archive(url, response)
+                        if attempt == 0:  # Only log first attempt failures
+                            logging.warning(
+                                f"First attempt failed for {url}: HTTP {response.status}"
+                            )
+                        if attempt < 1:  # Only delay if we're going to retry
+                            await asyncio.sleep(self.retry_delay)
+                        continue  # Try second attempt
+
+                    # Read the content
+                    content = await response.text()
+                    self.latency_tracker.record_latency(
+                        url, time.perf_counter() - request_started
+                    )
+                    await self._archive(url, response, content)
+
+                    # Parse with feedparser, off the event loop
+                    feed = await self.parse_pool.parse(content)
+
+                    # Check if it's a valid feed
+                    if feed.bozo:  # feedparser sets bozo on parse errors
+                        if attempt == 0:
+                            logging.warning(
+                                f"First attempt parse error for {url}: {feed.error}"
+                            )
+                        if attempt < 1:
+                            await asyncio.sleep(self.retry_delay)
+                        continue  # Try second attempt
+
+                    # Feed is valid
+                    self._record_redirects(url, response)
+                    self.entry_keys[url] = entry_keys(feed.entries)
+                    self.entries[url] = feed.entries[:5]
+                    return True, None
 
             except asyncio.TimeoutError:
+                # The host took at least this long; counting it lets the
+                # timeout of a slow but healthy host grow on later runs
+                self.latency_tracker.record_latency(url, host_timeout)
                 if attempt == 0:
-                    logging.warning(f"First attempt timeout for {url}")
+                    logging.warning(
+                        f"First attempt timeout for {url} after {host_timeout:.1f}s"
+                    )
                 if attempt < 1:
                     await asyncio.sleep(self.retry_delay)
                 continue  # Try second attempt
@@ -106,18 +252,111 @@ class FeedValidator:
         # If we get here, both attempts failed
         return False, "Feed validation failed after 2 attempts"
 
+    def _record_redirects(self, url: str, response) -> None:
+        """Record the leading run of permanent redirects a response went through.
+
+        Args:
+            url (str): The URL originally requested
+            response: The final aiohttp response, whose ``history`` holds the hops
+        """
+        history = getattr(response, "history", ())
+        if not isinstance(history, (tuple, list)):
+            return
+
+        # Each hop's target is the URL requested by the next hop (or the final response)
+        targets = [str(hop.url) for hop in history[1:]] + [str(response.url)]
+        chain: List[Tuple[int, str]] = []
+        for hop, target in zip(history, targets):
+            if hop.status not in PERMANENT_REDIRECT_STATUSES:
+                break  # Anything after a temporary hop may change again
+            chain.append((hop.status, target))
+
+        if chain and chain[-1][1] != url:
+            self.redirects[url] = chain
+            logging.info(
+                f"{url} permanently redirects to {chain[-1][1]} "
+                f"({len(chain)} hop{'s' if len(chain) != 1 else ''})"
+            )
+        else:
+            self.redirects.pop(url, None)
+
+    def permanent_location(self, url: str) -> Optional[str]:
+        """Return the final permanent location of a URL, if it moved."""
+        chain = self.redirects.get(url)
+        return chain[-1][1] if chain else None
+
     async def validate_feeds(
-        self, urls: list[str]
+        self,
+        urls: list[str],
+        on_result: Optional[Callable[[str, Any], None]] = None,
     ) -> dict[str, Tuple[bool, Optional[str]]]:
         """Validate multiple feeds concurrently.
 
+        At most ``concurrency`` feeds are checked at once. Feeds expected to
+        take longest, going by earlier runs, are started first, so stragglers
+        don't start late and stretch the run; fast feeds fill in the gaps.
+        Every host is resolved once beforehand, and feeds on hosts that
+        don't exist fail without being fetched.
+
         Args:
             urls (list[str]): List of URLs to validate
+            on_result (Optional[Callable[[str, Any], None]]): Called with each
+                URL and its result (or exception) as soon as it is checked
 
         Returns:
             dict[str, Tuple[bool, Optional[str]]]: Dictionary mapping URLs to their validation results
         """
-        tasks = [self.validate_feed(url) for url in urls]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        results: Dict[str, Any] = {}
+
+        def report(url: str) -> None:
+            if on_result is None:
+                return
+            try:
+                on_result(url, results[url])
+            except Exception as e:
+                logging.error(f"Result callback failed for {url}: {str(e)}")
+
+        # Feeds on hosts that don't exist fail at once, without a request
+        missing = await self.unresolvable_hosts(urls)
+        pending = []
+        for url in urls:
+            error = missing.get(host_of(url))
+            if error is None:
+                pending.append(url)
+                continue
+            results[url] = (False, error)
+            report(url)
 
-        return dict(zip(urls, results))
+        # Feeds never seen before may be slow, so they are not put last
+        expected = self.latency_tracker.expected_durations(
+            pending, default=self.timeout
+        )
+        queue = iter(sorted(pending, key=expected.__getitem__, reverse=True))
+        finished: List[float] = []
+        started = time.perf_counter()
+
+        async def worker() -> None:
+            # Workers share one iterator, so each feed is taken exactly once
+            for url in queue:
+                check_started = time.perf_counter()
+                try:
+                    results[url] = await self.validate_feed(url)
+                except Exception as e:
+                    results[url] = e
+                now = time.perf_counter()
+                self.latency_tracker.record(url, now - check_started)
+                finished.append(now - started)
+                report(url)
+
+        workers = min(self.concurrency, len(pending))
+        await asyncio.gather(*(worker() for _ in range(workers)))
+
+        self.completion = {
+            "expected": sorted(
+                simulate_completion(
+                    sorted(expected.values(), reverse=True), self.concurrency
+                )
+            ),
+            "actual": finished,
+        }
+        return {url: results[url] for url in urls}
@@ -1,10 +1,59 @@
-import feedparser
+import hashlib
+import json
 import logging
-from typing import Set
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from src.utils.lazy_import import lazy_import
+
+feedparser = lazy_import("feedparser")
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()[:16]
+
+
+def entries_digest(entries: List[Dict[str, Any]]) -> str:
+    """Return a digest of the entries a genre is guessed from."""
+    return _digest(
+        *(
+            (entry.get("title") or "") + "\0" + (entry.get("description") or "")
+            for entry in entries[:5]
+        )
+    )
+
+
+def _check_memo(memo: Any) -> None:
+    """Raise ValueError unless a memo table has the layout written by save_memo."""
+    if not isinstance(memo, dict):
+        raise ValueError("not a JSON object")
+    for url, entry in memo.items():
+        if not (
+            isinstance(entry, dict)
+            and isinstance(entry.get("entries"), str)
+            and isinstance(entry.get("scores"), dict)
+        ):
+            raise ValueError(f"malformed entry for {url}")
+        for score in entry["scores"].values():
+            if not (
+                isinstance(score, list)
+                and len(score) == 2
+                and isinstance(score[0], str)
+                and isinstance(score[1], (int, float))
+            ):
+                raise ValueError(f"malformed score for {url}")
 
 
 class GenreDetector:
-    def __init__(self):
+    def __init__(self, memo_file: Optional[Path] = None):
+        """Initialize the genre detector.
+
+        Args:
+            memo_file (Optional[Path]): JSON file keeping the scores of feeds
+                already classified between runs; without it they are only
+                remembered for the lifetime of the detector
+        """
         self.genres: Set[str] = {
             "News",
             "Technology",
@@ -27,27 +76,103 @@ class GenreDetector:
             "Entertainment": ["movie", "music", "celebrity", "entertainment", "film"],
             "Sports": ["sports", "game", "player", "team", "score", "match"],
         }
+        self.memo_file = memo_file
+        # url -> {"entries": digest, "scores": {genre: [keywords digest, score]}}
+        self.memo: Dict[str, Dict[str, Any]] = self._load_memo()
+        self.memo_hits = 0
+        self.memo_misses = 0
+        self._memo_dirty = False
 
-    def guess_genre(self, feed_url: str) -> str:
-        """Attempt to guess the genre of a feed based on its content."""
+    def _load_memo(self) -> Dict[str, Dict[str, Any]]:
+        if self.memo_file is None or not self.memo_file.exists():
+            return {}
         try:
-            feed = feedparser.parse(feed_url)
+            with open(self.memo_file, encoding="utf-8") as f:
+                memo = json.load(f)
+            # Valid JSON of another shape would only fail later, on lookup
+            _check_memo(memo)
+            return memo
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable genre memo {self.memo_file}: {e}")
+            return {}
 
+    def save_memo(self) -> None:
+        """Write the memo table to its file if anything changed."""
+        if self.memo_file is None or not self._memo_dirty:
+            return
+        # Write beside the memo and swap it in, so a crash never leaves it torn
+        tmp_file = self.memo_file.with_name(self.memo_file.name + ".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(self.memo, f)
+        os.replace(tmp_file, self.memo_file)
+        self._memo_dirty = False
+        logging.info(f"Saved {len(self.memo)} genre scores to {self.memo_file}")
+
+    def _keyword_digests(self) -> Dict[str, str]:
+        """Return a version of each genre's keywords, to spot stale scores."""
+        return {
+            genre: _digest(genre, *keywords)
+            for genre, keywords in self.genre_keywords.items()
+        }
+
+    def classify_entries(
+        self, entries: List[Dict[str, Any]], url: Optional[str] = None
+    ) -> str:
+        """Guess a genre from a feed's entries that were already parsed.
+
+        When the feed's URL is given, scores are memoized under it together
+        with a digest of the entries. A feed whose entries did not change is
+        not scored again, and editing a genre's keywords only rescores that
+        genre.
+        """
+        versions = self._keyword_digests()
+        digest = entries_digest(entries)
+        memo = self.memo.get(url) if url else None
+        if memo is None or memo["entries"] != digest:
+            memo = {"entries": digest, "scores": {}}
+
+        stale = [
+            genre
+            for genre, version in versions.items()
+            if memo["scores"].get(genre, [None])[0] != version
+        ]
+        if stale:
             text = " ".join(
                 [
-                    entry.get("title", "") + " " + entry.get("description", "")
-                    for entry in feed.entries[:5]
+                    (entry.get("title") or "") + " " + (entry.get("description") or "")
+                    for entry in entries[:5]
                 ]
             ).lower()
+            for genre in stale:
+                keywords = self.genre_keywords[genre]
+                score = sum(1 for keyword in keywords if keyword in text)
+                memo["scores"][genre] = [versions[genre], score]
 
-            genre_scores = {genre: 0 for genre in self.genre_keywords}
-            for genre, keywords in self.genre_keywords.items():
-                genre_scores[genre] = sum(1 for keyword in keywords if keyword in text)
+        if url:
+            if stale:
+                self.memo_misses += 1
+                # Drop genres that are no longer configured
+                memo["scores"] = {
+                    genre: memo["scores"][genre] for genre in self.genre_keywords
+                }
+                self.memo[url] = memo
+                self._memo_dirty = True
+            else:
+                self.memo_hits += 1
 
-            max_score = max(genre_scores.values())
-            if max_score > 0:
-                return max(genre_scores.items(), key=lambda x: x[1])[0]
-            return "Other"
+        genre_scores = {
+            genre: memo["scores"][genre][1] for genre in self.genre_keywords
+        }
+        max_score = max(genre_scores.values())
+        if max_score > 0:
+            return max(genre_scores.items(), key=lambda x: x[1])[0]
+        return "Other"
+
+    def guess_genre(self, feed_url: str) -> str:
+        """Attempt to guess the genre of a feed based on its content."""
+        try:
+            feed = feedparser.parse(feed_url)
+            return self.classify_entries(feed.entries, url=feed_url)
 
         except Exception as e:
             logging.warning(f"Error guessing genre for {feed_url}: {str(e)}")
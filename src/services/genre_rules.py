@@ -0,0 +1,140 @@
+import re
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Pattern, Set
+
+from src.models.feed import Feed
+from src.utils.lazy_import import lazy_import
+from src.utils.url_helpers import host_of
+
+tomllib = lazy_import("tomllib")
+
+RULE_KEYS = {"genre", "hosts", "url", "title", "description", "category"}
+
+
+@dataclass
+class GenreRule:
+    """Assign ``genre`` to feeds matching every condition given.
+
+    Host globs and categories match if any one of them does; patterns are
+    case-insensitive regular expressions searched anywhere in the field.
+    """
+
+    genre: str
+    hosts: List[str] = field(default_factory=list)
+    url: Optional[Pattern[str]] = None
+    title: Optional[Pattern[str]] = None
+    description: Optional[Pattern[str]] = None
+    category: Set[str] = field(default_factory=set)
+
+    def matches(self, feed: Feed) -> bool:
+        """Check every condition except the host, which the index handles."""
+        if self.category and feed.genre.lower() not in self.category:
+            return False
+        if self.url and not self.url.search(feed.url):
+            return False
+        if self.title and not self.title.search(feed.title):
+            return False
+        if self.description and not self.description.search(feed.description):
+            return False
+        return True
+
+
+def _compile(rule: dict, number: int) -> GenreRule:
+    unknown = set(rule) - RULE_KEYS
+    if unknown:
+        raise ValueError(f"Rule {number}: unknown keys {', '.join(sorted(unknown))}")
+    if not isinstance(rule.get("genre"), str) or not rule["genre"]:
+        raise ValueError(f"Rule {number}: a genre is required")
+
+    patterns = {}
+    for key in ("url", "title", "description"):
+        if key in rule:
+            try:
+                patterns[key] = re.compile(rule[key], re.IGNORECASE)
+            except re.error as e:
+                raise ValueError(f"Rule {number}: bad {key} pattern: {e}") from e
+
+    return GenreRule(
+        genre=rule["genre"],
+        hosts=[host.lower() for host in _as_list(rule.get("hosts", []))],
+        category={category.lower() for category in _as_list(rule.get("category", []))},
+        **patterns,
+    )
+
+
+def _as_list(value) -> List[str]:
+    # A single host or category may be given without a list
+    return [value] if isinstance(value, str) else list(value)
+
+
+class GenreRules:
+    """Rules compiled into one matcher; the first rule that matches wins.
+
+    Rules are indexed by host so that each feed is only checked against
+    rules that can apply to it: exact hosts and ``*.domain`` globs are
+    looked up directly, and only other globs are tried one by one.
+    """
+
+    def __init__(self, rules: Iterable[GenreRule]):
+        self.rules = list(rules)
+        self._exact: Dict[str, List[int]] = {}
+        self._suffix: Dict[str, List[int]] = {}
+        self._globs: List[int] = []
+        self._any_host: List[int] = []
+        for number, rule in enumerate(self.rules):
+            if not rule.hosts:
+                self._any_host.append(number)
+            for pattern in rule.hosts:
+                if not any(c in pattern for c in "*?["):
+                    self._exact.setdefault(pattern, []).append(number)
+                elif pattern.startswith("*.") and not any(
+                    c in pattern[2:] for c in "*?["
+                ):
+                    self._suffix.setdefault(pattern[2:], []).append(number)
+                else:
+                    self._globs.append(number)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    @classmethod
+    def from_file(cls, path: Path) -> "GenreRules":
+        """Load rules from a TOML file of ``[[rule]]`` tables.
+
+        Raises:
+            ValueError: If the file is not valid TOML or a rule is malformed
+        """
+        with open(path, "rb") as f:
+            try:
+                data = tomllib.load(f)
+            except tomllib.TOMLDecodeError as e:
+                raise ValueError(f"Invalid rules file {path}: {e}") from e
+        return cls(
+            _compile(rule, number)
+            for number, rule in enumerate(data.get("rule", []), 1)
+        )
+
+    def _candidates(self, host: str) -> List[int]:
+        numbers = list(self._any_host)
+        numbers += self._exact.get(host, [])
+        # Walk up the domain: a.b.example.com, b.example.com, example.com...
+        labels = host.split(".")
+        for i in range(1, len(labels)):
+            numbers += self._suffix.get(".".join(labels[i:]), [])
+        numbers += [
+            number
+            for number in self._globs
+            if any(fnmatchcase(host, pattern) for pattern in self.rules[number].hosts)
+        ]
+        return sorted(set(numbers))
+
+    def match(self, feed: Feed) -> Optional[str]:
+        """Return the genre of the first rule matching a feed, if any."""
+        host = host_of(feed.url)
+        for number in self._candidates(host):
+            rule = self.rules[number]
+            if rule.matches(feed):
+                return rule.genre
+        return None
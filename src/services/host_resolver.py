@@ -0,0 +1,151 @@
+import ipaddress
+import logging
+import socket
+import time
+from typing import Any, Dict, Iterable, List, Tuple
+
+from src.utils.lazy_import import lazy_import
+
+asyncio = lazy_import("asyncio")
+aiohttp = lazy_import("aiohttp")
+
+# getaddrinfo errors meaning the name does not exist, as opposed to the
+# lookup failing (EAI_AGAIN and the like), which a fetch may still get past
+NXDOMAIN_ERRORS = {
+    code
+    for code in (
+        getattr(socket, "EAI_NONAME", None),
+        getattr(socket, "EAI_NODATA", None),
+    )
+    if code is not None
+}
+
+_NUMERIC_FLAGS = socket.AI_NUMERICHOST | socket.AI_NUMERICSERV
+
+
+def _is_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
+
+
+class HostResolver:
+    """Resolves many hosts at once and answers aiohttp's lookups from them.
+
+    ``resolve_all`` looks every host up once, a bounded number at a time,
+    and caches the addresses found and the hosts that don't exist. Passed
+    as the resolver of the session's connector, it then serves connections
+    from that cache; hosts it doesn't know are looked up as aiohttp would.
+    """
+
+    def __init__(self, concurrency: int = 64, ttl: float = 3600.0):
+        """Initialize the resolver.
+
+        Args:
+            concurrency (int): Maximum number of lookups in flight at once
+            ttl (float): Seconds a lookup's result is kept
+        """
+        self.concurrency = concurrency
+        self.ttl = ttl
+        # host -> (expiry, getaddrinfo results)
+        self._addresses: Dict[str, Tuple[float, List[tuple]]] = {}
+        # host -> (expiry, error) for hosts that don't exist
+        self._missing: Dict[str, Tuple[float, str]] = {}
+        self._fallback = None
+
+    def _cached(self, cache: Dict[str, Tuple[float, Any]], host: str) -> Any:
+        entry = cache.get(host)
+        if entry is None:
+            return None
+        expiry, value = entry
+        if time.monotonic() > expiry:
+            del cache[host]
+            return None
+        return value
+
+    async def resolve_all(self, hosts: Iterable[str]) -> Dict[str, str]:
+        """Look up hosts not resolved recently, all at once.
+
+        Returns:
+            Dict[str, str]: Error of each of the hosts that don't exist
+        """
+        hosts = set(hosts)
+        todo = [
+            host
+            for host in hosts
+            if host
+            and not _is_ip(host)
+            and self._cached(self._addresses, host) is None
+            and self._cached(self._missing, host) is None
+        ]
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def lookup(host: str) -> None:
+            async with semaphore:
+                try:
+                    infos = await loop.getaddrinfo(
+                        host, None, type=socket.SOCK_STREAM, flags=socket.AI_ADDRCONFIG
+                    )
+                except socket.gaierror as e:
+                    if e.errno in NXDOMAIN_ERRORS:
+                        self._missing[host] = (
+                            time.monotonic() + self.ttl,
+                            f"Host does not resolve: {host} ({e.strerror})",
+                        )
+                    # Other failures are left to the fetch, which retries
+                    return
+                except (OSError, UnicodeError):
+                    return
+                self._addresses[host] = (time.monotonic() + self.ttl, infos)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(lookup(host) for host in todo))
+        missing = {
+            host: error
+            for host in hosts
+            if (error := self._cached(self._missing, host)) is not None
+        }
+        if todo:
+            logging.info(
+                f"Resolved {len(todo)} hosts in {time.perf_counter() - started:.2f}s, "
+                f"{len(missing)} do not exist"
+            )
+        return missing
+
+    async def resolve(
+        self, host: str, port: int = 0, family: int = socket.AF_INET
+    ) -> List[Dict[str, Any]]:
+        """Return the addresses of a host, as aiohttp's resolvers do."""
+        infos = self._cached(self._addresses, host) or []
+        results = []
+        for info_family, _, proto, _, address in infos:
+            if family and info_family != family:
+                continue
+            if info_family == socket.AF_INET6:
+                _, _, _, scope_id = address
+                if scope_id:
+                    # Link-local addresses need a scope; leave those to aiohttp
+                    continue
+            results.append(
+                {
+                    "hostname": host,
+                    "host": address[0],
+                    "port": port,
+                    "family": info_family,
+                    "proto": proto,
+                    "flags": _NUMERIC_FLAGS,
+                }
+            )
+        if results:
+            return results
+        if self._fallback is None:
+            self._fallback = aiohttp.ThreadedResolver()
+        return await self._fallback.resolve(host, port, family)
+
+    async def close(self) -> None:
+        if self._fallback is not None:
+            await self._fallback.close()
+            self._fallback = None
@@ -0,0 +1,142 @@
+import heapq
+import json
+import logging
+import math
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.utils.lazy_import import lazy_import
+from src.utils.url_helpers import host_of
+
+statistics = lazy_import("statistics")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Return the nearest-rank percentile of some values (0 if there are none)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def simulate_completion(durations: Iterable[float], workers: int) -> List[float]:
+    """Return when each job finishes if started in order on ``workers`` slots.
+
+    Each job starts as soon as a slot frees up, as validate_feeds does.
+    """
+    slots = [0.0] * max(workers, 1)
+    finished = []
+    for duration in durations:
+        start = heapq.heappop(slots)
+        finished.append(start + duration)
+        heapq.heappush(slots, start + duration)
+    return finished
+
+
+class LatencyTracker:
+    def __init__(
+        self, path: Optional[Path] = None, window: int = 100, min_samples: int = 5
+    ):
+        """Initialize the latency tracker.
+
+        Args:
+            path (Optional[Path]): JSON file the latencies are kept in between
+                runs; without it they only last as long as the tracker
+            window (int): Number of recent response times kept per host
+            min_samples (int): Response times needed before a host gets a
+                timeout of its own
+        """
+        self.path = path
+        self.window = window
+        self.min_samples = min_samples
+        # Seconds the last check of each URL took, retries and timeouts included
+        self.durations: Dict[str, float] = {}
+        # Recent response times of each host, oldest first
+        self.host_latencies: Dict[str, List[float]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.durations = {
+                url: float(seconds) for url, seconds in data["durations"].items()
+            }
+            self.host_latencies = {
+                host: [float(seconds) for seconds in samples]
+                for host, samples in data.get("hosts", {}).items()
+            }
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            logging.warning(f"Ignoring unreadable latency file {self.path}: {e}")
+
+    def save(self) -> None:
+        """Write the recorded latencies to the tracker's file."""
+        if self.path is None:
+            return
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"durations": self.durations, "hosts": self.host_latencies}, f)
+        os.replace(tmp_path, self.path)
+        logging.info(f"Saved latencies of {len(self.durations)} feeds to {self.path}")
+
+    def record(self, url: str, seconds: float) -> None:
+        """Record how long checking a URL took."""
+        self.durations[url] = seconds
+
+    def record_latency(self, url: str, seconds: float) -> None:
+        """Record how long the host of a URL took to answer one request."""
+        samples = self.host_latencies.setdefault(host_of(url), [])
+        samples.append(seconds)
+        del samples[: -self.window]
+
+    def host_timeout(
+        self,
+        url: str,
+        default: float,
+        factor: float = 3.0,
+        bounds: Tuple[float, float] = (1.0, 30.0),
+    ) -> float:
+        """Return the timeout for a request to the host of a URL.
+
+        Hosts with enough history get ``factor`` times their p99 response
+        time, clamped to ``bounds``: a usually fast host that stalls fails
+        quickly, and a slow but healthy one gets the time it needs. Other
+        hosts get ``default``.
+        """
+        samples = self.host_latencies.get(host_of(url), [])
+        if len(samples) < self.min_samples:
+            return default
+        low, high = bounds
+        return min(max(percentile(samples, 99) * factor, low), high)
+
+    def learned_hosts(self) -> int:
+        """Return the number of hosts that have a timeout of their own."""
+        return sum(
+            1
+            for samples in self.host_latencies.values()
+            if len(samples) >= self.min_samples
+        )
+
+    def expected_durations(self, urls: List[str], default: float) -> Dict[str, float]:
+        """Estimate how long checking each URL will take.
+
+        A URL checked before is expected to take as long as last time. A new
+        URL on a known host gets the host's median, and anything else gets
+        ``default``.
+        """
+        by_host: Dict[str, List[float]] = {}
+        for url, seconds in self.durations.items():
+            by_host.setdefault(host_of(url), []).append(seconds)
+        host_medians = {host: statistics.median(s) for host, s in by_host.items()}
+
+        expected = {}
+        for url in urls:
+            if url in self.durations:
+                expected[url] = self.durations[url]
+            else:
+                expected[url] = host_medians.get(host_of(url), default)
+        return expected
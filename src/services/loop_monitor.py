@@ -0,0 +1,182 @@
+import logging
+import sys
+import threading
+import traceback
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.services.latency_tracker import percentile
+from src.utils.lazy_import import lazy_import
+
+asyncio = lazy_import("asyncio")
+
+# Upper bounds, in milliseconds, of the lag histogram's buckets
+LAG_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000)
+
+# Frames of these modules are skipped when naming the code behind a stall
+_PLUMBING = ("asyncio", "selectors", "threading", "concurrent")
+
+
+@dataclass
+class Stall:
+    """A time the event loop ran late by more than the threshold."""
+
+    lag: float
+    # Innermost application frame running when the stall was caught, and the
+    # full stack, if the watchdog caught it while it was happening
+    culprit: Optional[str] = None
+    stack: Optional[str] = None
+
+
+class _SlowCallbackHandler(logging.Handler):
+    """Collect asyncio debug mode's reports of slow callbacks."""
+
+    def __init__(self, monitor: "LoopLagMonitor"):
+        super().__init__(level=logging.WARNING)
+        self.monitor = monitor
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # asyncio logs "Executing <handle> took 0.123 seconds"
+        message = record.msg
+        if (
+            isinstance(message, str)
+            and message.startswith("Executing")
+            and len(record.args or ()) == 2
+        ):
+            handle, seconds = record.args
+            self.monitor.slow_callbacks.append((str(handle), float(seconds)))
+
+
+def _culprit(frame) -> Optional[str]:
+    """Name the innermost frame that isn't event loop machinery."""
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.split(".")[0] not in _PLUMBING:
+            code = frame.f_code
+            return f"{code.co_name} ({code.co_filename}:{frame.f_lineno})"
+        frame = frame.f_back
+    return None
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop runs its callbacks.
+
+    A callback is scheduled every ``interval`` seconds and the delay before
+    it actually runs is recorded. Any delay means something held the loop;
+    when one exceeds ``threshold``, a watchdog thread captures the loop
+    thread's stack while the stall is still going on, so it can be
+    attributed. asyncio's debug mode is also turned on, so callbacks
+    slower than the threshold are reported by name.
+    """
+
+    def __init__(self, threshold: float = 0.1, interval: float = 0.05):
+        """Initialize the monitor.
+
+        Args:
+            threshold (float): Seconds of lag that count as a stall
+            interval (float): Seconds between lag samples
+        """
+        self.threshold = threshold
+        self.interval = interval
+        # Lag of the latest samples, in seconds, and of every sample by bucket
+        self.lags: "deque[float]" = deque(maxlen=100_000)
+        self.lag_counts = [0] * (len(LAG_BUCKETS_MS) + 1)
+        self.max_lag = 0.0
+        self.stalls: List[Stall] = []
+        # (callback, seconds) reported by asyncio's debug mode
+        self.slow_callbacks: List[Tuple[str, float]] = []
+        self._loop: Optional["asyncio.AbstractEventLoop"] = None
+        self._handle: Optional["asyncio.TimerHandle"] = None
+        self._expected = 0.0
+        self._caught: Optional[Stall] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+        self._loop_thread = 0
+        self._debug_was = (False, 0.1)
+        self._log_handler = _SlowCallbackHandler(self)
+
+    def start(self) -> None:
+        """Start monitoring the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._debug_was = (self._loop.get_debug(), self._loop.slow_callback_duration)
+        self._loop.set_debug(True)
+        self._loop.slow_callback_duration = self.threshold
+        logging.getLogger("asyncio").addHandler(self._log_handler)
+        self._schedule()
+        self._stop.clear()
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    def stop(self) -> None:
+        """Stop monitoring; the measurements are kept."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._stop.set()
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+        logging.getLogger("asyncio").removeHandler(self._log_handler)
+        if self._loop is not None and not self._loop.is_closed():
+            debug, self._loop.slow_callback_duration = self._debug_was
+            self._loop.set_debug(debug)
+
+    def _schedule(self) -> None:
+        self._expected = self._loop.time() + self.interval
+        self._handle = self._loop.call_at(self._expected, self._sample)
+
+    def _sample(self) -> None:
+        lag = max(self._loop.time() - self._expected, 0.0)
+        self.lags.append(lag)
+        self.lag_counts[bisect_left(LAG_BUCKETS_MS, lag * 1000)] += 1
+        self.max_lag = max(self.max_lag, lag)
+        if lag > self.threshold:
+            stall = self._caught or Stall(lag)
+            stall.lag = lag
+            self.stalls.append(stall)
+            logging.warning(
+                f"Event loop stalled for {lag * 1000:.0f} ms"
+                + (f" in {stall.culprit}:\n{stall.stack}" if stall.culprit else "")
+            )
+        self._caught = None
+        self._schedule()
+
+    def _watch(self) -> None:
+        # Checks several times per threshold, so a stall is caught mid-way
+        while not self._stop.wait(self.threshold / 4):
+            behind = self._loop.time() - self._expected
+            if behind <= self.threshold or self._caught is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            self._caught = Stall(
+                behind, _culprit(frame), "".join(traceback.format_stack(frame))
+            )
+
+    def histogram(self) -> Dict[str, int]:
+        """Return the number of samples in each lag bucket."""
+        labels = [f"<={bound}ms" for bound in LAG_BUCKETS_MS]
+        labels.append(f">{LAG_BUCKETS_MS[-1]}ms")
+        return dict(zip(labels, self.lag_counts))
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the lag statistics shown in the run summary."""
+        histogram = ", ".join(
+            f"{label}: {count}" for label, count in self.histogram().items() if count
+        )
+        culprits = sorted({stall.culprit for stall in self.stalls if stall.culprit})
+        return {
+            "loop_lag_p50_ms": percentile(list(self.lags), 50) * 1000,
+            "loop_lag_p99_ms": percentile(list(self.lags), 99) * 1000,
+            "loop_lag_max_ms": self.max_lag * 1000,
+            "loop_lag_histogram": histogram or "no samples",
+            "loop_stalls": len(self.stalls),
+            "loop_stall_sources": "; ".join(culprits) or "none caught",
+            "slow_callbacks": len(self.slow_callbacks),
+        }
@@ -0,0 +1,122 @@
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Tuple
+
+from src.models.feed import Feed
+
+# Fields merged one by one; a feed's URL is its identity (Feed.hash)
+MERGED_FIELDS = ("title", "genre", "description", "original_url")
+
+
+@dataclass
+class CatalogDiff:
+    """Differences between two versions of a catalog, matched by feed hash."""
+
+    added: List[Feed] = field(default_factory=list)
+    removed: List[Feed] = field(default_factory=list)
+    # (old, new) pairs of feeds present in both versions
+    regenred: List[Tuple[Feed, Feed]] = field(default_factory=list)
+    retitled: List[Tuple[Feed, Feed]] = field(default_factory=list)
+    redescribed: List[Tuple[Feed, Feed]] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.added
+            or self.removed
+            or self.regenred
+            or self.retitled
+            or self.redescribed
+        )
+
+
+@dataclass
+class MergeConflict:
+    """A field both sides changed differently, or a feed one side deleted
+    while the other changed it (``field`` is then ``"deleted"``)."""
+
+    url: str
+    field: str
+    ours: Optional[str]
+    theirs: Optional[str]
+
+
+def diff_catalogs(old: Dict[str, Feed], new: Dict[str, Feed]) -> CatalogDiff:
+    """Compare two catalogs keyed by feed hash in one pass over each.
+
+    Returns:
+        CatalogDiff: Feeds added, removed, moved to another genre, renamed
+            or described differently
+    """
+    diff = CatalogDiff()
+    for feed_hash, feed in new.items():
+        before = old.get(feed_hash)
+        if before is None:
+            diff.added.append(feed)
+            continue
+        if before.genre != feed.genre:
+            diff.regenred.append((before, feed))
+        if before.title != feed.title:
+            diff.retitled.append((before, feed))
+        if before.description != feed.description:
+            diff.redescribed.append((before, feed))
+    diff.removed = [feed for feed_hash, feed in old.items() if feed_hash not in new]
+    return diff
+
+
+def _merge_feed(
+    base: Optional[Feed], ours: Feed, theirs: Feed, conflicts: List[MergeConflict]
+) -> Feed:
+    changes = {}
+    for name in MERGED_FIELDS:
+        mine, other = getattr(ours, name), getattr(theirs, name)
+        if mine == other:
+            continue
+        original = getattr(base, name) if base else None
+        if mine == original:
+            changes[name] = other
+        elif other != original:
+            conflicts.append(MergeConflict(ours.url, name, mine, other))
+    return replace(ours, **changes) if changes else ours
+
+
+def merge_catalogs(
+    base: Dict[str, Feed], ours: Dict[str, Feed], theirs: Dict[str, Feed]
+) -> Tuple[Dict[str, Feed], List[MergeConflict]]:
+    """Three-way merge of two catalogs that both started from ``base``.
+
+    Changes made on one side only are taken. When both sides changed a
+    field differently, or one side deleted a feed the other changed, the
+    conflict is reported and our version is kept (a changed feed is kept
+    over a deletion).
+
+    Returns:
+        Tuple[Dict[str, Feed], List[MergeConflict]]: The merged catalog, in
+            our order followed by feeds only they added, and the conflicts
+    """
+    merged: Dict[str, Feed] = {}
+    conflicts: List[MergeConflict] = []
+
+    for feed_hash, feed in ours.items():
+        original = base.get(feed_hash)
+        other = theirs.get(feed_hash)
+        if other is not None:
+            merged[feed_hash] = _merge_feed(original, feed, other, conflicts)
+        elif original is None:
+            merged[feed_hash] = feed  # We added it
+        elif feed != original:
+            # They deleted a feed we changed
+            conflicts.append(MergeConflict(feed.url, "deleted", "changed", None))
+            merged[feed_hash] = feed
+        # Otherwise they deleted it and we left it alone
+
+    for feed_hash, feed in theirs.items():
+        if feed_hash in ours:
+            continue
+        original = base.get(feed_hash)
+        if original is None:
+            merged[feed_hash] = feed  # They added it
+        elif feed != original:
+            # We deleted a feed they changed
+            conflicts.append(MergeConflict(feed.url, "deleted", None, "changed"))
+            merged[feed_hash] = feed
+
+    return merged, conflicts
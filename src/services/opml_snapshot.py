@@ -0,0 +1,163 @@
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.models.feed import Feed
+from src.utils.compressed_io import open_text
+
+# Bump whenever the layout of the snapshot or of Feed changes; snapshots
+# written by another version are discarded
+SNAPSHOT_VERSION = 3
+
+# (size, mtime in nanoseconds, SHA-256 of the text) of an OPML file
+SnapshotKey = Tuple[int, int, str]
+
+
+def content_digest(text: str) -> str:
+    """Return the digest an OPML file's text is keyed by."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _row(feed: Feed) -> tuple:
+    return (
+        feed.title,
+        feed.url,
+        feed.genre,
+        feed.description,
+        feed.deleted_at.isoformat() if feed.deleted_at else None,
+        feed.original_url,
+    )
+
+
+def _feed(row: list) -> Feed:
+    title, url, genre, description, deleted_at, original_url = row
+    return Feed(
+        title,
+        url,
+        genre,
+        description,
+        datetime.fromisoformat(deleted_at) if deleted_at else None,
+        original_url,
+    )
+
+
+class OPMLSnapshot:
+    """JSON snapshot of an OPML file's parsed feeds and validation state.
+
+    The snapshot is kept next to the OPML file and only used while the file
+    is unchanged: its size and mtime must match, or failing that (e.g. after
+    a copy or a touch) the digest of its content. It holds plain data only,
+    so a snapshot found next to someone else's OPML file can't run code.
+    """
+
+    def __init__(self, opml_file: Path, path: Optional[Path] = None):
+        """Initialize the snapshot.
+
+        Args:
+            opml_file (Path): OPML file the snapshot stands in for
+            path (Optional[Path]): Snapshot file; defaults to the OPML file's
+                name with ``.snapshot`` appended
+        """
+        self.opml_file = opml_file
+        self.path = path or opml_file.with_name(opml_file.name + ".snapshot")
+        # Key and feeds of the OPML file as last read, which saves are tied
+        # to; feeds are kept as tuples of plain fields, as the catalog edits
+        # its Feeds
+        self.key: Optional[SnapshotKey] = None
+        self.rows: List[tuple] = []
+
+    def load(
+        self,
+    ) -> Optional[Tuple[List[Feed], Dict[str, Tuple[bool, Optional[str]]]]]:
+        """Return the feeds and validation results if the snapshot is current.
+
+        Outdated, unreadable and other-version snapshots are deleted.
+        """
+        try:
+            stat = os.stat(self.opml_file)
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logging.warning(f"Discarding unreadable snapshot {self.path}: {e}")
+            self.discard()
+            return None
+
+        if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+            logging.info(f"Discarding snapshot {self.path} from another version")
+            self.discard()
+            return None
+
+        try:
+            size, mtime_ns, digest = data["key"]
+            feeds = [_feed(row) for row in data["feeds"]]
+            validation = {
+                url: (bool(is_valid), error)
+                for url, (is_valid, error) in data["validation"].items()
+            }
+        except (KeyError, TypeError, ValueError) as e:
+            logging.warning(f"Discarding malformed snapshot {self.path}: {e}")
+            self.discard()
+            return None
+        if stat.st_size != size:
+            self.discard()
+            return None
+        if stat.st_mtime_ns != mtime_ns:
+            # Same size but touched: only the content can tell
+            with open_text(self.opml_file) as f:
+                if content_digest(f.read()) != digest:
+                    self.discard()
+                    return None
+
+        self.key = (stat.st_size, stat.st_mtime_ns, digest)
+        self.rows = [tuple(row) for row in data["feeds"]]
+        logging.info(f"Loaded {len(self.rows)} feeds from snapshot {self.path}")
+        return feeds, validation
+
+    def stamp(self, stat: os.stat_result, text: str, feeds: List[Feed]) -> None:
+        """Remember the OPML file as just read: its key and its parsed feeds.
+
+        ``stat`` must be taken before reading, so that a file changed while
+        being read is never mistaken for the version parsed.
+        """
+        self.key = (stat.st_size, stat.st_mtime_ns, content_digest(text))
+        self.rows = [_row(feed) for feed in feeds]
+
+    def save(self, validation_results: Dict[str, Tuple[bool, Optional[str]]]) -> None:
+        """Write the snapshot of the OPML file as it was last read.
+
+        Args:
+            validation_results (Dict[str, Tuple[bool, Optional[str]]]): Latest
+                result of each feed by URL; those of other feeds are left out
+        """
+        if self.key is None:
+            return
+        urls = {row[1] for row in self.rows}
+        data = {
+            "version": SNAPSHOT_VERSION,
+            "key": self.key,
+            "feeds": self.rows,
+            "validation": {
+                url: result for url, result in validation_results.items() if url in urls
+            },
+        }
+        # Write beside the snapshot and swap it in, so a crash never leaves it torn
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.warning(f"Could not write snapshot {self.path}: {e}")
+
+    def discard(self) -> None:
+        """Delete the snapshot file if there is one."""
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
@@ -0,0 +1,120 @@
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from src.utils.lazy_import import lazy_import
+
+asyncio = lazy_import("asyncio")
+multiprocessing = lazy_import("multiprocessing")
+futures = lazy_import("concurrent.futures")
+feedparser = lazy_import("feedparser")
+
+# Entry fields sent back from a parse; everything else stays in the worker
+ENTRY_FIELDS = (
+    "id",
+    "link",
+    "title",
+    "description",
+    "published_parsed",
+    "updated_parsed",
+)
+
+
+@dataclass
+class ParsedFeed:
+    """The parts of a parsed feed the rest of the application uses."""
+
+    bozo: bool = False
+    error: Optional[str] = None
+    entries: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def parse_feed_content(content: str, max_entries: int = 20) -> ParsedFeed:
+    """Parse a feed document and keep only a small, picklable summary.
+
+    Args:
+        content (str): The feed document
+        max_entries (int): Number of leading entries to keep
+
+    Returns:
+        ParsedFeed: Whether feedparser flagged the document, and its entries
+    """
+    feed = feedparser.parse(content)
+    error = str(feed.get("bozo_exception", "")) if feed.bozo else ""
+    return ParsedFeed(
+        bozo=bool(feed.bozo),
+        error=error or None,
+        entries=[
+            {name: entry.get(name) for name in ENTRY_FIELDS}
+            for entry in feed.entries[:max_entries]
+        ],
+    )
+
+
+class ParsePool:
+    def __init__(self, workers: Optional[int] = None):
+        """Initialize the parse pool.
+
+        Args:
+            workers (Optional[int]): Number of worker processes; None uses
+                one per CPU and 0 parses in the calling thread
+        """
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.parsed = 0
+        self.peak_queue_depth = 0
+        self._in_flight = 0
+        self._executor: Optional["futures.ProcessPoolExecutor"] = None
+
+    def _get_executor(self) -> "futures.ProcessPoolExecutor":
+        # Started on first use, so commands that never parse don't spawn workers
+        if self._executor is None:
+            self._executor = futures.ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logging.info(f"Started {self.workers} feed parser processes")
+        return self._executor
+
+    async def parse(self, content: str) -> ParsedFeed:
+        """Parse a feed document without blocking the event loop.
+
+        Args:
+            content (str): The feed document
+
+        Returns:
+            ParsedFeed: Summary of the parsed feed
+        """
+        if self.workers == 0:
+            result = parse_feed_content(content)
+            self.parsed += 1
+            return result
+
+        self._in_flight += 1
+        # Documents waiting for a free worker
+        self.peak_queue_depth = max(
+            self.peak_queue_depth, self._in_flight - self.workers
+        )
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                self._get_executor(), parse_feed_content, content
+            )
+        finally:
+            self._in_flight -= 1
+        self.parsed += 1
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        """Return the pool size and how much work went through it."""
+        return {
+            "workers": self.workers,
+            "parsed": self.parsed,
+            "peak_queue_depth": self.peak_queue_depth,
+        }
+
+    def close(self) -> None:
+        """Stop the worker processes, dropping parses not yet started."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
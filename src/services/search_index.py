@@ -0,0 +1,154 @@
+import heapq
+from array import array
+from collections import Counter
+from typing import Dict, List, Mapping, Set, Tuple
+from urllib.parse import urlparse
+
+from src.models.feed import Feed
+from src.utils.url_helpers import host_of
+
+# Only the start of a description is indexed; it is where the subject is
+DESCRIPTION_CHARS = 200
+
+
+def trigrams(text: str) -> Set[str]:
+    """Return the three-character substrings of normalized text.
+
+    Words are padded so that short queries and word starts still match.
+    """
+    text = " ".join(text.lower().split())
+    if not text:
+        return set()
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def feed_text(feed: Feed) -> str:
+    """Return the searchable text of a feed."""
+    try:
+        parsed = urlparse(feed.url)
+        location = parsed.netloc + parsed.path
+    except ValueError:
+        location = feed.url
+    return " ".join(
+        [
+            feed.title,
+            host_of(feed.url),
+            location,
+            feed.genre,
+            feed.description[:DESCRIPTION_CHARS],
+        ]
+    )
+
+
+class SearchIndex:
+    """Fuzzy trigram index of feeds, keyed by feed hash.
+
+    Postings are append-only arrays of document numbers: removing a feed
+    only forgets its number, and the arrays are compacted once forgotten
+    numbers pile up. This keeps updates cheap and the index small enough
+    for 100k feeds.
+    """
+
+    def __init__(self, common_share: float = 0.1):
+        """Initialize an empty index.
+
+        Args:
+            common_share (float): Trigrams found in more than this share of
+                feeds are skipped when a query has rarer ones to go on
+        """
+        self.common_share = common_share
+        self._postings: Dict[str, array] = {}
+        self._doc_ids: Dict[str, int] = {}
+        self._docs: Dict[int, Tuple[str, str]] = {}  # doc -> (key, lowered title)
+        self._next_id = 0
+        self._forgotten = 0
+
+    @classmethod
+    def build(cls, feeds: Mapping[str, Feed]) -> "SearchIndex":
+        """Return a new index of feeds keyed by hash."""
+        index = cls()
+        for key, feed in feeds.items():
+            index.add(key, feed)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._doc_ids
+
+    def add(self, key: str, feed: Feed) -> None:
+        """Index a feed, replacing what was indexed under the same key."""
+        self.remove(key)
+        doc = self._next_id
+        self._next_id += 1
+        self._doc_ids[key] = doc
+        self._docs[doc] = (key, feed.title.lower())
+        for gram in trigrams(feed_text(feed)):
+            postings = self._postings.get(gram)
+            if postings is None:
+                postings = self._postings[gram] = array("I")
+            postings.append(doc)
+
+    def remove(self, key: str) -> None:
+        """Drop a feed from the index; unknown keys are ignored."""
+        doc = self._doc_ids.pop(key, None)
+        if doc is None:
+            return
+        del self._docs[doc]
+        self._forgotten += 1
+        if self._forgotten > max(len(self._docs), 1000):
+            self._compact()
+
+    def _compact(self) -> None:
+        live = self._docs
+        for gram, postings in list(self._postings.items()):
+            kept = array("I", (doc for doc in postings if doc in live))
+            if kept:
+                self._postings[gram] = kept
+            else:
+                del self._postings[gram]
+        self._forgotten = 0
+
+    def search(
+        self, query: str, limit: int = 20, min_score: float = 0.4
+    ) -> List[Tuple[str, float]]:
+        """Return the best matching feed keys with their scores, best first.
+
+        A score is the share of the query's trigrams a feed contains, so
+        typos and partial words still match. Feeds whose title contains the
+        query rank first among equal scores.
+        """
+        grams = trigrams(query)
+        postings = sorted(
+            (self._postings[gram] for gram in grams if gram in self._postings),
+            key=len,
+        )
+        if not postings:
+            return []
+
+        # Very common trigrams ("com", "htt"...) barely narrow anything down
+        # but would cost a pass over most of the index
+        common = max(int(len(self._docs) * self.common_share), 1000)
+        counted = [postings[0]] + [p for p in postings[1:] if len(p) <= common]
+        skipped = len(postings) - len(counted)
+
+        matches: Counter = Counter()
+        for docs in counted:
+            matches.update(docs)
+
+        needle = " ".join(query.lower().split())
+        scored = []
+        # Only the feeds sharing the most trigrams are worth ranking further
+        for doc, hits in matches.most_common(max(limit * 10, 200)):
+            entry = self._docs.get(doc)
+            if entry is None:
+                continue  # Removed since it was indexed
+            score = hits / (len(grams) - skipped)
+            if score >= min_score:
+                key, title = entry
+                scored.append((score, needle in title, -doc, key))
+
+        best = heapq.nlargest(limit, scored)
+        return [(key, score) for score, _, _, key in best]
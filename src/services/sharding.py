@@ -0,0 +1,222 @@
+import hashlib
+import json
+import logging
+import logging.handlers
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.services.feed_validator import FeedValidator
+from src.utils.lazy_import import lazy_import
+from src.utils.url_helpers import host_of
+
+asyncio = lazy_import("asyncio")
+multiprocessing = lazy_import("multiprocessing")
+futures = lazy_import("concurrent.futures")
+
+
+def shard_of(url: str, shards: int) -> int:
+    """Return the shard a URL belongs to.
+
+    Feeds are split by host so that every request to a host comes from the
+    same worker, and the hash is stable across processes and machines.
+    """
+    return int(hashlib.md5(host_of(url).encode()).hexdigest(), 16) % shards
+
+
+def split_shards(urls: Iterable[str], shards: int) -> List[List[str]]:
+    """Split URLs into ``shards`` lists, keeping their relative order."""
+    parts: List[List[str]] = [[] for _ in range(shards)]
+    for url in urls:
+        parts[shard_of(url, shards)].append(url)
+    return parts
+
+
+def entry_summaries(entries: Iterable[Any]) -> List[Dict[str, str]]:
+    """Keep the titles and descriptions of entries, which genres are guessed
+    from, in a form that can be written to JSON."""
+    return [
+        {
+            "title": entry.get("title") or "",
+            "description": entry.get("description") or "",
+        }
+        for entry in entries
+    ]
+
+
+def result_record(
+    url: str,
+    result: Tuple[bool, Optional[str]],
+    redirects: Optional[List[Tuple[int, str]]] = None,
+    entry_keys: Optional[List[str]] = None,
+    entries: Optional[List[Dict[str, str]]] = None,
+) -> Dict[str, Any]:
+    """Return the JSON record of one URL's validation results."""
+    is_valid, error = result
+    record: Dict[str, Any] = {"url": url, "valid": is_valid, "error": error}
+    if redirects:
+        record["redirects"] = redirects
+    if entry_keys:
+        record["entry_keys"] = entry_keys
+    if entries is not None:
+        record["entries"] = entries
+    return record
+
+
+@dataclass
+class ShardResult:
+    """Validation results of one shard, or of several merged together."""
+
+    results: Dict[str, Tuple[bool, Optional[str]]] = field(default_factory=dict)
+    redirects: Dict[str, List[Tuple[int, str]]] = field(default_factory=dict)
+    entry_keys: Dict[str, List[str]] = field(default_factory=dict)
+    # Summaries of the entries of valid feeds, so their genres can be guessed
+    # without fetching them again
+    entries: Dict[str, List[Dict[str, str]]] = field(default_factory=dict)
+
+    def merge(self, other: "ShardResult") -> None:
+        self.results.update(other.results)
+        self.redirects.update(other.redirects)
+        self.entry_keys.update(other.entry_keys)
+        self.entries.update(other.entries)
+
+    def save(self, path: Path) -> None:
+        """Write the results as one JSON line per URL."""
+        with open(path, "w", encoding="utf-8") as f:
+            for url, result in self.results.items():
+                record = result_record(
+                    url,
+                    result,
+                    self.redirects.get(url),
+                    self.entry_keys.get(url),
+                    self.entries.get(url),
+                )
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def add_record(self, record: Dict[str, Any]) -> None:
+        """Add one URL's results from its JSON record."""
+        url = record["url"]
+        self.results[url] = (record["valid"], record.get("error"))
+        if record.get("redirects"):
+            self.redirects[url] = [tuple(hop) for hop in record["redirects"]]
+        if record.get("entry_keys"):
+            self.entry_keys[url] = record["entry_keys"]
+        if record.get("entries") is not None:
+            self.entries[url] = record["entries"]
+
+    @classmethod
+    def load(cls, path: Path) -> "ShardResult":
+        shard = cls()
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    shard.add_record(json.loads(line))
+        return shard
+
+
+async def validate_urls(
+    urls: List[str], timeout: int = 10, retry_delay: float = 1.0
+) -> ShardResult:
+    """Validate URLs with a fresh validator and collect everything it learned."""
+    validator = FeedValidator(timeout=timeout, retry_delay=retry_delay)
+    try:
+        results = await validator.validate_feeds(urls)
+    finally:
+        await validator.close()
+
+    shard = ShardResult(redirects=validator.redirects, entry_keys=validator.entry_keys)
+    for url, result in results.items():
+        # gather() hands back exceptions as values; keep results serializable
+        if isinstance(result, BaseException):
+            result = (False, f"Unexpected error: {result}")
+        shard.results[url] = result
+        if result[0] and url in validator.entries:
+            shard.entries[url] = entry_summaries(validator.entries[url])
+    return shard
+
+
+def _init_worker(log_queue) -> None:
+    """Send a worker's log records to the parent process."""
+    root = logging.getLogger()
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(logging.INFO)
+
+
+def _validate_in_worker(urls: List[str], timeout: int, retry_delay: float):
+    # Each worker process runs its own event loop
+    return asyncio.run(validate_urls(urls, timeout, retry_delay))
+
+
+class _ForwardHandler(logging.Handler):
+    """Re-emit records received from workers through this process's loggers."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        logging.getLogger(record.name).handle(record)
+
+
+def _stop_pool(pool: "futures.ProcessPoolExecutor") -> None:
+    """Shut a worker pool down without waiting for the work it is doing."""
+    # shutdown forgets the processes, so they are taken first
+    processes = list((pool._processes or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join()
+
+
+async def validate_sharded(
+    urls: List[str], shards: int, timeout: int = 10, retry_delay: float = 1.0
+) -> ShardResult:
+    """Validate URLs split by host across ``shards`` worker processes.
+
+    Returns:
+        ShardResult: The merged results of every shard
+    """
+    parts = [part for part in split_shards(urls, shards) if part]
+    if not parts:
+        return ShardResult()
+
+    context = multiprocessing.get_context("spawn")
+    log_queue = context.Queue()
+    listener = logging.handlers.QueueListener(log_queue, _ForwardHandler())
+    listener.start()
+    pool = futures.ProcessPoolExecutor(
+        max_workers=len(parts),
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(log_queue,),
+    )
+    try:
+        loop = asyncio.get_running_loop()
+        shard_results = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    pool, _validate_in_worker, part, timeout, retry_delay
+                )
+                for part in parts
+            )
+        )
+    except BaseException:
+        # Cancelled, or a shard failed: the other shards' results would be
+        # thrown away, and waiting for them could take hours
+        _stop_pool(pool)
+        raise
+    else:
+        pool.shutdown(wait=True)
+    finally:
+        listener.stop()
+
+    merged = ShardResult()
+    for shard in shard_results:
+        merged.merge(shard)
+    logging.info(f"Validated {len(merged.results)} feeds across {len(parts)} shards")
+    return merged
+
+
+def load_shard_files(paths: Iterable[Path]) -> ShardResult:
+    """Merge partial result files written by independent shard runs."""
+    merged = ShardResult()
+    for path in paths:
+        merged.merge(ShardResult.load(Path(path)))
+    return merged
@@ -0,0 +1,115 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional, TextIO
+
+from src.services.feed_validator import FeedValidator
+from src.utils.lazy_import import lazy_import
+
+sharding = lazy_import("src.services.sharding")
+
+# Bump whenever the record layout changes; checkpoints of another version
+# are discarded
+CHECKPOINT_VERSION = 1
+
+
+class ValidationCheckpoint:
+    """Append-only log of a validation run, so an interrupted run can resume.
+
+    The first line identifies the run; each other line holds one checked
+    feed as a shard result record, written as soon as the feed is checked,
+    along with the titles and descriptions of its first entries that its
+    genre is guessed from.
+    """
+
+    def __init__(self, path: Path):
+        """Initialize the checkpoint.
+
+        Args:
+            path (Path): NDJSON file the results are appended to
+        """
+        self.path = path
+        self._file: Optional[TextIO] = None
+
+    def resume(self, run_key: str) -> "sharding.ShardResult":
+        """Open the checkpoint of a run and return what it already holds.
+
+        A checkpoint left by another run (e.g. of an OPML file that has
+        changed since) is discarded and a new one started.
+
+        Args:
+            run_key (str): Identifies the run, such as the OPML file's digest
+
+        Returns:
+            ShardResult: Results checked so far, with the entries of valid feeds
+        """
+        header = {"checkpoint": CHECKPOINT_VERSION, "run": run_key}
+        done = sharding.ShardResult()
+        text = ""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                text = f.read()
+        except FileNotFoundError:
+            pass
+        except (OSError, UnicodeDecodeError) as e:
+            logging.warning(f"Ignoring unreadable checkpoint {self.path}: {e}")
+
+        lines = text.splitlines()
+        if lines and _parse(lines[0]) == header:
+            for line in lines[1:]:
+                # A run killed mid-write leaves a torn last line
+                record = _parse(line)
+                if record:
+                    done.add_record(record)
+
+        if done.results:
+            self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+            if not text.endswith("\n"):
+                self._file.write("\n")
+            logging.info(
+                f"Resuming from {self.path}: {len(done.results)} feeds already checked"
+            )
+        else:
+            self._file = open(self.path, "w", encoding="utf-8", buffering=1)
+            self._file.write(json.dumps(header) + "\n")
+        return done
+
+    def append(self, url: str, result: Any, validator: FeedValidator) -> None:
+        """Record a feed's result, with what the validator learned about it."""
+        if self._file is None:
+            return
+        if isinstance(result, BaseException):
+            result = (False, f"Unexpected error: {result}")
+        entries = validator.entries.get(url) if result[0] else None
+        record = sharding.result_record(
+            url,
+            result,
+            validator.redirects.get(url),
+            validator.entry_keys.get(url),
+            sharding.entry_summaries(entries) if entries is not None else None,
+        )
+        # Line buffered, so every record reaches the file as it is written
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def close(self) -> None:
+        """Stop recording, keeping the checkpoint to resume from."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def discard(self) -> None:
+        """Stop recording and delete the checkpoint of a finished run."""
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def _parse(line: str) -> Optional[Dict[str, Any]]:
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) else None
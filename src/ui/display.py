@@ -3,37 +3,55 @@ from rich.table import Table
 from rich.panel import Panel
 from datetime import datetime
 import feedparser
-from typing import Dict
+from typing import Any, Dict, List, Optional
 import time
 from ..models.feed import Feed
 
 console = Console()
 
 
-def display_feeds(feeds: Dict[str, Feed]) -> None:
-    """Display feeds in a rich table."""
+def display_feeds(
+    feeds: Dict[str, Feed], statuses: Optional[Dict[str, str]] = None
+) -> None:
+    """Display feeds in a rich table.
+
+    While feeds are still being checked, ``statuses`` maps feed hashes to
+    what is known about them, shown in an extra column.
+    """
     table = Table(show_header=True, header_style="bold magenta")
     table.add_column("#", style="dim")
     table.add_column("Title")
     table.add_column("Genre")
     table.add_column("URL", style="dim")
+    if statuses is not None:
+        table.add_column("Status")
 
-    for idx, (_, feed) in enumerate(feeds.items(), 1):
-        table.add_row(str(idx), feed.title, feed.genre, feed.url)
+    for idx, (feed_hash, feed) in enumerate(feeds.items(), 1):
+        row = [str(idx), feed.title, feed.genre, feed.url]
+        if statuses is not None:
+            row.append(statuses.get(feed_hash, ""))
+        table.add_row(*row)
 
     console.print(table)
 
 
-def display_latest_articles(feed_url: str) -> None:
-    """Display the latest articles from a feed."""
-    with console.status("[bold green]Fetching latest articles..."):
-        feed = feedparser.parse(feed_url)
+def display_latest_articles(
+    feed_url: str, entries: Optional[List[dict]] = None
+) -> None:
+    """Display the latest articles from a feed.
+
+    Articles already fetched (e.g. from the article cache) can be passed in
+    as ``entries`` to skip downloading the feed.
+    """
+    if entries is None:
+        with console.status("[bold green]Fetching latest articles..."):
+            entries = feedparser.parse(feed_url).entries
 
     table = Table(show_header=True, header_style="bold green")
     table.add_column("Date")
     table.add_column("Title")
 
-    for entry in feed.entries[:5]:
+    for entry in entries[:5]:
         # Get the time struct from either published or updated date
         time_struct = entry.get("published_parsed") or entry.get("updated_parsed")
 
@@ -47,3 +65,17 @@ def display_latest_articles(feed_url: str) -> None:
         table.add_row(date, entry.get("title", "No title"))
 
     console.print(Panel(table, title="Latest Articles", border_style="green"))
+
+
+def display_run_summary(stats: Dict[str, Any]) -> None:
+    """Display the counters collected while loading feeds."""
+    table = Table(show_header=False, box=None)
+    table.add_column("Metric", style="dim")
+    table.add_column("Value", justify="right")
+
+    for name, value in stats.items():
+        if isinstance(value, float):
+            value = f"{value:.2f}"
+        table.add_row(name.replace("_", " ").capitalize(), str(value))
+
+    console.print(Panel(table, title="Run Summary", border_style="blue"))
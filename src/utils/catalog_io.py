@@ -0,0 +1,138 @@
+import csv
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Iterable, Iterator, Optional, Tuple
+
+from ..models.feed import Feed
+
+# Column order of both formats; health and redirect columns may be empty
+FIELDS = [
+    "hash",
+    "title",
+    "url",
+    "genre",
+    "description",
+    "deleted_at",
+    "original_url",
+    "valid",
+    "error",
+    "redirects_to",
+]
+
+NDJSON_SUFFIXES = {".ndjson", ".jsonl"}
+CSV_SUFFIXES = {".csv"}
+
+
+def feed_record(
+    feed: Feed,
+    health: Optional[Tuple[bool, Optional[str]]] = None,
+    redirects_to: Optional[str] = None,
+) -> dict:
+    """Flatten a feed and its validation metadata into one export record."""
+    return {
+        "hash": feed.hash,
+        "title": feed.title,
+        "url": feed.url,
+        "genre": feed.genre,
+        "description": feed.description,
+        "deleted_at": feed.deleted_at.isoformat() if feed.deleted_at else None,
+        "original_url": feed.original_url,
+        "valid": health[0] if health else None,
+        "error": health[1] if health else None,
+        "redirects_to": redirects_to,
+    }
+
+
+def record_to_feed(record: dict) -> Feed:
+    """Rebuild a feed from an export record (NDJSON or CSV)."""
+    return Feed(
+        title=record.get("title") or "",
+        url=record["url"],
+        genre=record.get("genre") or "Other",
+        description=record.get("description") or "",
+        deleted_at=(
+            datetime.fromisoformat(record["deleted_at"])
+            if record.get("deleted_at")
+            else None
+        ),
+        original_url=record.get("original_url") or None,
+    )
+
+
+def record_health(record: dict) -> Optional[Tuple[bool, Optional[str]]]:
+    """Return the validation result stored in a record, if any."""
+    valid = record.get("valid")
+    if valid in (None, ""):
+        return None
+    if isinstance(valid, str):
+        valid = valid.lower() == "true"
+    return bool(valid), record.get("error") or None
+
+
+def write_ndjson(records: Iterable[dict], fp: IO[str]) -> int:
+    """Write records as newline-delimited JSON, one at a time."""
+    count = 0
+    for record in records:
+        fp.write(json.dumps(record, ensure_ascii=False))
+        fp.write("\n")
+        count += 1
+    return count
+
+
+def read_ndjson(fp: IO[str]) -> Iterator[dict]:
+    """Yield records from newline-delimited JSON, skipping blank lines."""
+    for line in fp:
+        if line.strip():
+            yield json.loads(line)
+
+
+def write_csv(records: Iterable[dict], fp: IO[str]) -> int:
+    """Write records as CSV with a header row, one at a time."""
+    writer = csv.DictWriter(fp, fieldnames=FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    count = 0
+    for record in records:
+        if record.get("valid") is not None:
+            record = dict(record, valid="true" if record["valid"] else "false")
+        writer.writerow(record)
+        count += 1
+    return count
+
+
+def read_csv(fp: IO[str]) -> Iterator[dict]:
+    """Yield records from a CSV file written by write_csv."""
+    yield from csv.DictReader(fp)
+
+
+def _format_for(path: Path) -> str:
+    suffix = path.suffix.lower()
+    if suffix in NDJSON_SUFFIXES:
+        return "ndjson"
+    if suffix in CSV_SUFFIXES:
+        return "csv"
+    raise ValueError(f"Unsupported catalog format: {path.name}")
+
+
+def export_records(path: Path, records: Iterable[dict]) -> int:
+    """Stream records to an NDJSON or CSV file chosen by its extension.
+
+    Returns:
+        int: Number of records written
+    """
+    path = Path(path)
+    writer = write_ndjson if _format_for(path) == "ndjson" else write_csv
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        return writer(records, f)
+
+
+def _read_records(path: Path, reader) -> Iterator[dict]:
+    with open(path, encoding="utf-8", newline="") as f:
+        yield from reader(f)
+
+
+def import_records(path: Path) -> Iterator[dict]:
+    """Stream records from an NDJSON or CSV file chosen by its extension."""
+    path = Path(path)
+    reader = read_ndjson if _format_for(path) == "ndjson" else read_csv
+    return _read_records(path, reader)
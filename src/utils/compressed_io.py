@@ -0,0 +1,41 @@
+import gzip
+from importlib.util import find_spec
+from pathlib import Path
+from typing import IO, Optional, Union
+
+from .lazy_import import lazy_import
+
+# zstandard is optional; without it only .zst files can't be opened
+zstandard = lazy_import("zstandard") if find_spec("zstandard") else None
+
+COMPRESSIONS = {".gz": "gzip", ".zst": "zstd"}
+
+
+def compression_of(path: Union[str, Path]) -> Optional[str]:
+    """Return "gzip" or "zstd" if the file's extension says it is compressed."""
+    return COMPRESSIONS.get(Path(path).suffix.lower())
+
+
+def open_text(
+    path: Union[str, Path], mode: str = "r", compression: Optional[str] = None
+) -> IO[str]:
+    """Open a UTF-8 text file, compressed or not.
+
+    Compressed files are decompressed as they are read and compressed as
+    they are written, so they are never expanded on disk.
+
+    Args:
+        path (Union[str, Path]): File to open
+        mode (str): "r" to read, "w" to write
+        compression (Optional[str]): "gzip" or "zstd"; defaults to what the
+            file's extension says, and no compression for other extensions
+    """
+    compression = compression or compression_of(path)
+    if compression == "gzip":
+        # Level 6, as the gzip tool uses: level 9 is much slower for little gain
+        return gzip.open(path, mode + "t", compresslevel=6, encoding="utf-8")
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError(f"Opening {path} needs the zstandard package")
+        return zstandard.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
@@ -0,0 +1,31 @@
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Import a module whose code only runs on first attribute access.
+
+    Heavy dependencies (feedparser, aiohttp, listparser...) are bound at
+    module level with this so that short commands which never touch them
+    don't pay for importing them.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+
+    # A regular import binds submodules on their package; code elsewhere
+    # doing ``import a.b`` followed by ``a.b.x`` relies on it.
+    parent, _, child = name.rpartition(".")
+    if parent:
+        setattr(sys.modules[parent], child, module)
+    return module
@@ -1,10 +1,141 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
+import re
+import time
+from typing import Dict, Optional
 
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+HOST_PATTERN = re.compile(r"[a-z][a-z0-9+.-]*://([^/\s:?#]+)", re.IGNORECASE)
 
-def setup_logging(filename: str = "opml_manager.log") -> None:
-    """Set up logging configuration."""
-    logging.basicConfig(
-        filename=filename,
-        level=logging.INFO,
-        format="%(asctime)s - %(levelname)s - %(message)s",
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        host = HOST_PATTERN.search(entry["message"])
+        if host:
+            entry["host"] = host.group(1).lower()
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class HostRateLimitFilter(logging.Filter):
+    """Drop repeated warnings and cap the number of warnings per host.
+
+    Within each ``interval`` a host gets at most ``per_host`` warnings, and a
+    message identical to one already logged is dropped. The first warning of
+    the next interval reports how many were suppressed. Warnings that name
+    no host are always logged.
+    """
+
+    def __init__(self, interval: float = 60.0, per_host: int = 5):
+        super().__init__()
+        self.interval = interval
+        self.per_host = per_host
+        # host -> [window start, messages logged, suppressed count]
+        self._windows: Dict[str, list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno != logging.WARNING:
+            return True
+
+        message = record.getMessage()
+        match = HOST_PATTERN.search(message)
+        if not match:
+            return True
+        host = match.group(1).lower()
+        now = time.monotonic()
+
+        window = self._windows.get(host)
+        if window is None or now - window[0] >= self.interval:
+            suppressed = window[2] if window else 0
+            self._windows[host] = [now, {message}, 0]
+            if suppressed:
+                record.msg = f"{message} ({suppressed} similar warnings suppressed)"
+                record.args = None
+            return True
+
+        if message in window[1] or len(window[1]) >= self.per_host:
+            window[2] += 1
+            return False
+
+        window[1].add(message)
+        return True
+
+
+def setup_logging(
+    filename: str = "opml_manager.log",
+    json_lines: bool = False,
+    max_bytes: int = 5 * 1024 * 1024,
+    backup_count: int = 3,
+    rate_limit_interval: float = 60.0,
+    warnings_per_host: int = 5,
+) -> logging.handlers.QueueListener:
+    """Set up logging configuration.
+
+    Records are handed to a queue and written by a background thread, so
+    logging from the event loop never waits on the disk.
+
+    Args:
+        filename (str): Log file, rotated once it reaches ``max_bytes``
+        json_lines (bool): Write one JSON object per line instead of text
+        max_bytes (int): Size in bytes at which the log file is rotated
+        backup_count (int): Number of rotated files to keep
+        rate_limit_interval (float): Window in seconds for warning rate limits
+        warnings_per_host (int): Distinct warnings logged per host per window
+
+    Returns:
+        logging.handlers.QueueListener: The running listener thread
+    """
+    global _listener, _queue_handler
+    stop_logging()
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+    )
+    file_handler.setFormatter(
+        JsonFormatter() if json_lines else logging.Formatter(LOG_FORMAT)
     )
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _queue_handler = logging.handlers.QueueHandler(log_queue)
+    _queue_handler.addFilter(
+        HostRateLimitFilter(interval=rate_limit_interval, per_host=warnings_per_host)
+    )
+
+    root = logging.getLogger()
+    root.addHandler(_queue_handler)
+    root.setLevel(logging.INFO)
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, file_handler, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging() -> None:
+    """Flush queued records to disk and stop the background writer."""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
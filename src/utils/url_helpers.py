@@ -0,0 +1,13 @@
+from urllib.parse import urlparse
+
+
+def host_of(url: str) -> str:
+    """Return the lowercased host of a URL, or "" if it has none.
+
+    Malformed URLs such as ``http://[abc]/feed`` make ``urlparse`` raise;
+    they count as having no host, so one bad feed can't break a whole run.
+    """
+    try:
+        return (urlparse(url).hostname or "").lower()
+    except ValueError:
+        return ""
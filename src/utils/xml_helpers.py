@@ -1,12 +1,32 @@
-import xml.etree.ElementTree as ET
 from datetime import datetime
 from typing import Dict, List
 from ..models.feed import Feed
+from .lazy_import import lazy_import
+
+ET = lazy_import("xml.etree.ElementTree")
+
+
+def outline_attributes(text: str) -> Dict[str, Dict[str, str]]:
+    """Return the attributes of every feed outline, keyed by feed URL.
+
+    listparser drops attributes it doesn't know, such as ``description``
+    and ``originalUrl``; this reads them back. A document ElementTree can't
+    parse gives nothing here and is left to listparser's lenient reading.
+    """
+    try:
+        root = ET.fromstring(text)
+    except ET.ParseError:
+        return {}
+    return {
+        outline.get("xmlUrl"): dict(outline.attrib)
+        for outline in root.iter("outline")
+        if outline.get("xmlUrl")
+    }
 
 
 def create_opml_tree(
     feeds_by_genre: Dict[str, List[Feed]], title: str = "RSS Feeds"
-) -> ET.Element:
+) -> "ET.Element":
     """Create an OPML XML tree from feeds grouped by genre."""
     root = ET.Element("opml", version="1.0")
     head = ET.SubElement(root, "head")
@@ -31,6 +51,8 @@ def create_opml_tree(
             }
             if feed.deleted_at:
                 feed_attrs["deletedAt"] = feed.deleted_at.isoformat()
+            if feed.original_url:
+                feed_attrs["originalUrl"] = feed.original_url
 
             ET.SubElement(genre_outline, "outline", **feed_attrs)
 
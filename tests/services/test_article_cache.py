@@ -0,0 +1,87 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from src.services.article_cache import ArticleCache
+from src.services.parse_pool import ParsePool
+
+RSS = """<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Test</title>
+<item><title>First</title><link>http://example.com/1</link></item>
+<item><title>Second</title><link>http://example.com/2</link></item>
+</channel></rss>"""
+
+
+class FakeFetcher:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.parse_pool = ParsePool(workers=0)
+
+    async def fetch_text(self, url):
+        self.calls.append(url)
+        await asyncio.sleep(self.delay)
+        return RSS
+
+
+@pytest.mark.asyncio
+async def test_get_caches_articles():
+    fetcher = FakeFetcher()
+    cache = ArticleCache(fetcher)
+    articles = await cache.get("http://example.com/feed")
+    assert [a["title"] for a in articles] == ["First", "Second"]
+    assert await cache.get("http://example.com/feed") == articles
+    assert fetcher.calls == ["http://example.com/feed"]
+
+
+@pytest.mark.asyncio
+async def test_expired_articles_are_refetched():
+    fetcher = FakeFetcher()
+    cache = ArticleCache(fetcher, ttl=60)
+    with patch("src.services.article_cache.time.monotonic", return_value=1000.0):
+        await cache.get("http://example.com/feed")
+    with patch("src.services.article_cache.time.monotonic", return_value=1061.0):
+        await cache.get("http://example.com/feed")
+    assert len(fetcher.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_feed_is_evicted():
+    fetcher = FakeFetcher()
+    cache = ArticleCache(fetcher, max_feeds=2)
+    await cache.get("http://a.example.com/feed")
+    await cache.get("http://b.example.com/feed")
+    await cache.get("http://a.example.com/feed")
+    await cache.get("http://c.example.com/feed")
+    await cache.get("http://a.example.com/feed")
+    await cache.get("http://b.example.com/feed")
+    assert fetcher.calls == [
+        "http://a.example.com/feed",
+        "http://b.example.com/feed",
+        "http://c.example.com/feed",
+        "http://b.example.com/feed",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_awaits_prefetch_in_flight():
+    fetcher = FakeFetcher(delay=0.05)
+    cache = ArticleCache(fetcher)
+    cache.prefetch(["http://a.example.com/feed", "http://b.example.com/feed"])
+    articles = await cache.get("http://b.example.com/feed")
+    assert len(articles) == 2
+    assert sorted(fetcher.calls) == [
+        "http://a.example.com/feed",
+        "http://b.example.com/feed",
+    ]
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_fetch_error_returns_no_articles():
+    class FailingFetcher:
+        async def fetch_text(self, url):
+            raise ConnectionError("boom")
+
+    cache = ArticleCache(FailingFetcher())
+    assert await cache.get("http://example.com/feed") == []
+    assert cache._lookup("http://example.com/feed") is None
@@ -0,0 +1,149 @@
+import asyncio
+import socket
+import aiohttp
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+from unittest.mock import AsyncMock, patch
+from src.models.feed import Feed
+from src.services.daemon import FeedDaemon, serve
+from src.services.feed_manager import FeedManager
+
+GOOD = Feed(title="TechCrunch", url="https://techcrunch.com/feed/", genre="Technology")
+BAD = Feed(title="Gone", url="https://gone.example.com/rss", genre="News")
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    # FeedManager writes its working files to the current directory
+    monkeypatch.chdir(tmp_path)
+    manager = FeedManager("feeds.opml")
+    manager.feeds.update({GOOD.hash: GOOD, BAD.hash: BAD})
+    manager.validation_results.update(
+        {GOOD.url: (True, None), BAD.url: (False, "HTTP 404")}
+    )
+    return FeedDaemon(manager, interval=3600)
+
+
+def api(daemon):
+    return TestClient(TestServer(daemon.create_app()))
+
+
+@pytest.mark.asyncio
+async def test_status_and_feed_health(daemon):
+    async with api(daemon) as client:
+        status = await (await client.get("/status")).json()
+        assert status["feeds"] == 2
+        assert status["genres"] == {"Technology": 1, "News": 1}
+        assert status["revalidating"] is False
+
+        invalid = await (await client.get("/feeds?invalid=1")).json()
+        assert [(f["url"], f["error"]) for f in invalid] == [(BAD.url, "HTTP 404")]
+
+        feed = await (await client.get(f"/feeds/{GOOD.hash}")).json()
+        assert feed["valid"] is True
+        assert (await client.get("/feeds/unknown")).status == 404
+
+
+@pytest.mark.asyncio
+async def test_search(daemon):
+    async with api(daemon) as client:
+        found = await (await client.get("/search", params={"q": "tehcrunch"})).json()
+        assert [f["url"] for f in found["results"]] == [GOOD.url]
+        assert (await client.get("/search?q=x&limit=lots")).status == 400
+
+
+@pytest.mark.asyncio
+async def test_change_genre(daemon):
+    async with api(daemon) as client:
+        response = await client.post(
+            f"/feeds/{BAD.hash}/genre", json={"genre": "Science"}
+        )
+        assert (await response.json())["genre"] == "Science"
+        assert daemon.manager.feeds[BAD.hash].genre == "Science"
+        assert daemon.changed
+
+        bad = await client.post(f"/feeds/{BAD.hash}/genre", json={"genre": "Cooking"})
+        assert bad.status == 400
+        assert (
+            await client.post(f"/feeds/{BAD.hash}/genre", data="nope")
+        ).status == 400
+
+
+@pytest.mark.asyncio
+async def test_revalidate_runs_in_background(daemon):
+    async with api(daemon) as client:
+        release = asyncio.Event()
+
+        async def slow_revalidate():
+            await release.wait()
+            return {}
+
+        with patch.object(
+            daemon.manager, "revalidate", AsyncMock(side_effect=slow_revalidate)
+        ):
+            assert (await client.post("/revalidate")).status == 202
+            # A second request while the first pass runs is refused
+            assert (await client.post("/revalidate")).status == 409
+            assert (await (await client.get("/status")).json())["revalidating"]
+            release.set()
+            await daemon._revalidation
+        assert daemon.last_validated is not None
+
+
+@pytest.mark.asyncio
+async def test_manager_revalidate_keeps_invalid_feeds(daemon):
+    manager = daemon.manager
+    with patch.object(
+        manager.feed_validator,
+        "validate_feeds",
+        AsyncMock(
+            return_value={GOOD.url: (False, "HTTP 500"), BAD.url: RuntimeError("x")}
+        ),
+    ):
+        await manager.revalidate()
+    assert len(manager.feeds) == 2
+    assert manager.validation_results[BAD.url] == (False, "Unexpected error: x")
+    assert manager.run_stats["invalid"] == 2
+
+
+@pytest.mark.asyncio
+async def test_serve_validates_in_the_background_once_up(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = FeedManager("feeds.opml")
+    manager.feeds.update({GOOD.hash: GOOD, BAD.hash: BAD})
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    base = f"http://127.0.0.1:{port}"
+    release = asyncio.Event()
+
+    async def validate_feeds(urls, on_result=None):
+        await release.wait()
+        return {GOOD.url: (True, None), BAD.url: (False, "HTTP 404")}
+
+    with patch.object(manager.feed_validator, "validate_feeds", validate_feeds):
+        serving = asyncio.create_task(serve(manager, "127.0.0.1", port))
+        async with aiohttp.ClientSession() as session:
+            for _ in range(100):
+                try:
+                    async with session.get(f"{base}/status") as response:
+                        status = await response.json()
+                    break
+                except aiohttp.ClientConnectionError:
+                    await asyncio.sleep(0.02)
+            # The API answers while the first validation is still running
+            assert status["revalidating"] is True
+            assert status["feeds"] == 2
+
+            release.set()
+            for _ in range(100):
+                async with session.get(f"{base}/feeds?invalid=1") as response:
+                    invalid = await response.json()
+                if invalid:
+                    break
+                await asyncio.sleep(0.02)
+        serving.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await serving
+    assert [(f["url"], f["error"]) for f in invalid] == [(BAD.url, "HTTP 404")]
+    assert len(manager.feeds) == 2
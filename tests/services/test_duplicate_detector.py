@@ -0,0 +1,73 @@
+import pytest
+from unittest.mock import patch
+from src.services.duplicate_detector import DuplicateDetector, entry_keys
+
+
+def make_entries(prefix, count, start=0):
+    return [
+        {
+            "id": f"tag:{prefix},2024:{i}",
+            "link": f"https://{prefix}/posts/{i}/",
+            "title": f"Post number {i}",
+        }
+        for i in range(start, start + count)
+    ]
+
+
+def test_entry_keys_normalize_links():
+    keys = entry_keys(
+        [{"link": "http://www.example.com/post/", "title": "  Hello   World "}]
+    )
+    assert keys == ["link:example.com/post", "title:hello world"]
+    assert entry_keys([{"link": "https://example.com/post"}]) == [
+        "link:example.com/post"
+    ]
+
+
+def test_entry_keys_limit():
+    assert len(entry_keys(make_entries("blog.example", 50), limit=5)) == 15
+
+
+def test_signature_of_empty_set():
+    assert DuplicateDetector().signature([]) is None
+
+
+def test_identical_sets_have_identical_signatures():
+    detector = DuplicateDetector()
+    keys = entry_keys(make_entries("blog.example", 10))
+    assert detector.signature(keys) == detector.signature(reversed(keys))
+
+
+def test_bands_must_divide_permutations():
+    with pytest.raises(ValueError):
+        DuplicateDetector(num_perm=64, bands=10)
+
+
+def test_find_clusters_groups_mirrors():
+    detector = DuplicateDetector()
+    original = entry_keys(make_entries("blog.example", 20))
+    # A mirror that lags one post behind the original
+    mirror = entry_keys(make_entries("blog.example", 20, start=1))
+    unrelated = entry_keys(make_entries("news.example", 20))
+    for i, key in enumerate(unrelated):
+        unrelated[i] = key.replace("Post number", "headline")
+
+    clusters = detector.find_clusters(
+        {"a": original, "b": unrelated, "c": mirror, "d": []}
+    )
+    assert clusters == [["a", "c"]]
+
+
+def test_find_clusters_respects_threshold():
+    detector = DuplicateDetector()
+    first = entry_keys(make_entries("blog.example", 20))
+    half_overlap = entry_keys(make_entries("blog.example", 20, start=10))
+    assert detector.find_clusters({"a": first, "b": half_overlap}, 0.9) == []
+
+
+def test_find_clusters_pairs_any_members_of_a_bucket():
+    detector = DuplicateDetector(num_perm=4, bands=2)
+    # All three share the first band, but only b and c are alike
+    signatures = {"a": (1, 1, 0, 0), "b": (1, 1, 2, 2), "c": (1, 1, 2, 3)}
+    with patch.object(detector, "signature", tuple):
+        assert detector.find_clusters(signatures, threshold=0.7) == [["b", "c"]]
@@ -0,0 +1,69 @@
+import gzip
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from src.services.feed_archive import ArchivedResponse, FeedArchive
+from src.services.feed_validator import FeedValidator
+
+RSS = """<?xml version="1.0"?><rss version="2.0"><channel><title>Physics</title>
+<item><title>New physics research</title><description>A space discovery</description>
+<link>http://example.com/1</link></item></channel></rss>"""
+
+
+def test_store_and_replay_as_of(tmp_path):
+    archive = FeedArchive(tmp_path, compression="gzip")
+    url = "http://example.com/feed"
+    for fetched_at, text in ((100.0, "first"), (200.0, "second")):
+        archive.store(
+            ArchivedResponse(url=url, fetched_at=fetched_at, status=200, text=text)
+        )
+
+    paths = archive.fetches(url)
+    assert [path.suffix for path in paths] == [".gz", ".gz"]
+    assert gzip.decompress(paths[0].read_bytes()).endswith(b"\nfirst")
+    assert archive.latest(url).text == "second"
+    assert archive.latest(url, as_of=150.0).text == "first"
+    assert archive.latest(url, as_of=50.0) is None
+    assert archive.latest("http://example.com/other") is None
+
+
+def test_unknown_compression_is_refused(tmp_path):
+    with pytest.raises(ValueError):
+        FeedArchive(tmp_path, compression="lz4")
+
+
+@pytest.mark.asyncio
+async def test_replay_validates_without_network(tmp_path):
+    async def feed(request):
+        return web.Response(text=RSS, content_type="application/rss+xml")
+
+    async def moved(request):
+        raise web.HTTPMovedPermanently("/feed")
+
+    async def gone(request):
+        raise web.HTTPNotFound()
+
+    app = web.Application()
+    app.add_routes(
+        [web.get("/feed", feed), web.get("/old", moved), web.get("/gone", gone)]
+    )
+    archive = FeedArchive(tmp_path)
+    async with TestServer(app) as server:
+        urls = [str(server.make_url(path)) for path in ("/old", "/gone")]
+        recorder = FeedValidator(retry_delay=0, archive=archive)
+        recorded = await recorder.validate_feeds(urls)
+        await recorder.close()
+    assert recorded[urls[0]] == (True, None)
+    assert recorded[urls[1]][0] is False
+    assert recorder.redirects
+
+    # The server is gone; everything comes from the archive
+    replayer = FeedValidator(retry_delay=0, archive=archive, replay=True)
+    missing = "http://not-archived.example.com/feed"
+    replayed = await replayer.validate_feeds(urls + [missing])
+    assert {url: replayed[url] for url in urls} == recorded
+    assert replayed[missing][0] is False
+    assert replayer.redirects == recorder.redirects
+    assert replayer.entries[urls[0]][0]["title"] == "New physics research"
+    assert await replayer.fetch_text(urls[0]) == RSS
+    await replayer.close()
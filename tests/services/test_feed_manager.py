@@ -1,8 +1,13 @@
+import asyncio
+import gzip
+import threading
 import pytest
 from unittest.mock import patch, mock_open
 from pathlib import Path
 from src.services.feed_manager import FeedManager
 from src.models.feed import Feed
+from src.services.genre_rules import GenreRules
+from src.services.search_index import SearchIndex
 
 
 @pytest.fixture
@@ -94,3 +99,346 @@ def test_move_to_deleted(feed_manager, valid_opml_content):
             content = f.read()
             assert "TechCrunch" in content
             assert "deletedAt" in content
+
+
+def test_apply_redirects(feed_manager):
+    feed = Feed(title="Moved", url="http://old.example.com/feed", genre="News")
+    feed_manager.feeds[feed.hash] = feed
+    feed_manager.feed_validator.redirects[feed.url] = [
+        (301, "https://old.example.com/feed"),
+        (308, "https://new.example.com/feed"),
+    ]
+
+    assert feed_manager.pending_redirects() == {
+        feed.hash: "https://new.example.com/feed"
+    }
+    assert feed_manager.apply_redirects() == 1
+
+    (moved,) = feed_manager.feeds.values()
+    assert moved.url == "https://new.example.com/feed"
+    assert moved.original_url == "http://old.example.com/feed"
+    assert moved.hash in feed_manager.feeds
+
+
+def test_apply_redirects_onto_existing_feed(feed_manager):
+    old = Feed(title="Old", url="http://example.com/feed", genre="News")
+    new = Feed(title="New", url="https://example.com/feed", genre="News")
+    feed_manager.feeds[old.hash] = old
+    feed_manager.feeds[new.hash] = new
+    feed_manager.feed_validator.redirects[old.url] = [(301, new.url)]
+
+    assert feed_manager.apply_redirects() == 1
+    assert list(feed_manager.feeds) == [new.hash]
+
+
+def test_merge_near_duplicates(feed_manager):
+    entries = [f"id:post-{i}" for i in range(20)]
+    original = Feed(title="Blog", url="https://blog.example.com/feed", genre="News")
+    mirror = Feed(title="Blog", url="http://feeds.example.net/blog", genre="News")
+    other = Feed(title="Other", url="https://other.example.com/feed", genre="News")
+    for feed in (original, mirror, other):
+        feed_manager.feeds[feed.hash] = feed
+    feed_manager.feed_validator.entry_keys[original.url] = entries
+    feed_manager.feed_validator.entry_keys[mirror.url] = entries
+    feed_manager.feed_validator.entry_keys[other.url] = ["id:something-else"]
+
+    clusters = feed_manager.find_near_duplicates()
+    assert clusters == [[original.hash, mirror.hash]]
+    assert feed_manager.merge_near_duplicates(clusters) == 1
+    assert set(feed_manager.feeds) == {original.hash, other.hash}
+
+
+def test_export_and_import_catalog(feed_manager, tmp_path):
+    feeds = [
+        Feed(title=f"Feed {i}", url=f"https://example.com/{i}", genre="News")
+        for i in range(5)
+    ]
+    for feed in feeds:
+        feed_manager.feeds[feed.hash] = feed
+    feed_manager.validation_results[feeds[0].url] = (True, None)
+    feed_manager.feed_validator.redirects[feeds[0].url] = [(301, "https://x.com/0")]
+
+    path = tmp_path / "catalog.ndjson"
+    assert feed_manager.export_catalog(path) == 5
+
+    imported = FeedManager("feeds.opml")
+    assert imported.import_catalog(path, batch_size=2) == 5
+    assert list(imported.feeds.values()) == feeds
+    assert imported.validation_results == {feeds[0].url: (True, None)}
+
+
+@pytest.mark.asyncio
+async def test_guess_genre_reuses_validated_entries(feed_manager):
+    url = "https://example.com/feed"
+    feed_manager.feed_validator.entries[url] = [
+        {"title": "New physics research", "description": "A space discovery"}
+    ]
+    with patch(
+        "src.services.feed_validator.FeedValidator.fetch_text",
+        side_effect=AssertionError("fetched again"),
+    ):
+        assert await feed_manager.guess_genre(url) == "Science"
+    assert feed_manager.run_summary()["parse_workers"] == 0
+
+
+def test_run_summary_reports_completion_curves(feed_manager):
+    feed_manager.feed_validator.completion = {
+        "expected": [1.0, 2.0, 4.0],
+        "actual": [0.5, 1.0, 3.0],
+    }
+    summary = feed_manager.run_summary()
+    assert summary["completion_p50_seconds"] == "2.00 expected, 1.00 actual"
+    assert summary["completion_max_seconds"] == "4.00 expected, 3.00 actual"
+
+
+def test_search_index_follows_catalog_changes(feed_manager, tmp_path):
+    feed_manager.deleted_file = tmp_path / "deleted_feeds.opml"
+    kottke = Feed(title="Kottke", url="https://kottke.org/feed", genre="Other")
+    daring = Feed(
+        title="Daring Fireball", url="https://daringfireball.net/feeds", genre="News"
+    )
+    feed_manager.feeds.update({kottke.hash: kottke, daring.hash: daring})
+
+    assert feed_manager.search("kotke") == [kottke.hash]
+
+    feed_manager.set_genre(kottke.hash, "Entertainment")
+    assert feed_manager.search("entertainment") == [kottke.hash]
+
+    feed_manager.feed_validator.redirects[daring.url] = [
+        (301, "https://daringfireball.net/feeds/main")
+    ]
+    feed_manager.apply_redirects()
+    (moved,) = feed_manager.search("daring fireball")
+    assert feed_manager.feeds[moved].url == "https://daringfireball.net/feeds/main"
+
+    feed_manager.move_to_deleted(kottke.hash)
+    assert feed_manager.search("kottke") == []
+
+
+@pytest.mark.asyncio
+async def test_search_index_is_built_off_the_event_loop(feed_manager, tmp_path):
+    feed_manager.deleted_file = tmp_path / "deleted_feeds.opml"
+    kottke = Feed(title="Kottke", url="https://kottke.org/feed", genre="Other")
+    daring = Feed(
+        title="Daring Fireball", url="https://daringfireball.net/feeds", genre="News"
+    )
+    feed_manager.feeds.update({kottke.hash: kottke, daring.hash: daring})
+    started = threading.Event()
+    release = threading.Event()
+    build = SearchIndex.build
+
+    def slow_build(feeds):
+        started.set()
+        release.wait(5)
+        return build(feeds)
+
+    with patch.object(SearchIndex, "build", slow_build):
+        preparing = asyncio.create_task(feed_manager.prepare_search())
+        await asyncio.to_thread(started.wait, 5)
+        # The event loop runs meanwhile, and edits made now reach the index
+        feed_manager.set_genre(kottke.hash, "Entertainment")
+        feed_manager.move_to_deleted(daring.hash)
+        release.set()
+        await preparing
+    assert feed_manager.search("entertainment") == [kottke.hash]
+    assert feed_manager.search("daring fireball") == []
+
+
+def test_apply_genre_rules_in_one_pass(feed_manager, tmp_path):
+    rules_file = tmp_path / "rules.toml"
+    rules_file.write_text('[[rule]]\ngenre = "Newsletters"\nhosts = "*.substack.com"\n')
+    letter = Feed(title="Letter", url="https://a.substack.com/feed", genre="Other")
+    other = Feed(title="Other", url="https://example.com/feed", genre="Other")
+    feed_manager.feeds.update({letter.hash: letter, other.hash: other})
+
+    assert feed_manager.apply_genre_rules(GenreRules.from_file(rules_file)) == 1
+    assert feed_manager.feeds[letter.hash].genre == "Newsletters"
+    assert feed_manager.feeds[other.hash].genre == "Other"
+    assert "Newsletters" in feed_manager.genre_detector.genres
+
+
+@pytest.mark.asyncio
+async def test_start_loading_makes_feeds_usable_before_checking(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    good = "https://good.example.com/feed"
+    bad = "https://bad.example.com/feed"
+    (tmp_path / "feeds.opml").write_text(
+        '<?xml version="1.0"?><opml version="1.0"><head><title>T</title></head>'
+        '<body><outline text="Other">'
+        f'<outline text="Good" type="rss" xmlUrl="{good}" />'
+        f'<outline text="Bad" type="rss" xmlUrl="{bad}" />'
+        "</outline></body></opml>"
+    )
+    manager = FeedManager("feeds.opml")
+    first_checked = asyncio.Event()
+    release = asyncio.Event()
+
+    async def validate_feeds(urls, on_result=None):
+        manager.feed_validator.entries[good] = [
+            {"title": "New physics research", "description": "A space discovery"}
+        ]
+        on_result(good, (True, None))
+        first_checked.set()
+        await release.wait()
+        on_result(bad, (False, "HTTP 404"))
+        return {good: (True, None), bad: (False, "HTTP 404")}
+
+    with patch.object(manager.feed_validator, "validate_feeds", validate_feeds):
+        loading = manager.start_loading()
+        # Both feeds are in the catalog before anything has been checked
+        assert len(manager.feeds) == 2
+        assert manager.pending == {good, bad}
+
+        await first_checked.wait()
+        good_hash = Feed(title="", url=good, genre="").hash
+        assert manager.pending == {bad}
+        assert manager.feeds[good_hash].genre == "Science"
+
+        release.set()
+        loaded, invalid_feeds = await loading
+    assert loaded == 1
+    assert invalid_feeds == {bad: "HTTP 404"}
+    assert list(manager.feeds) == [good_hash]
+    assert manager.search("bad") == []
+    assert not manager.pending
+
+
+@pytest.mark.asyncio
+async def test_start_loading_keeps_feeds_deleted_while_checking_out(
+    tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    url = "https://gone.example.com/feed"
+    (tmp_path / "feeds.opml").write_text(
+        '<?xml version="1.0"?><opml version="1.0"><head><title>T</title></head>'
+        f'<body><outline text="News"><outline text="Gone" type="rss" xmlUrl="{url}" />'
+        "</outline></body></opml>"
+    )
+    manager = FeedManager("feeds.opml")
+    manager.deleted_file = tmp_path / "deleted_feeds.opml"
+    feed_hash = Feed(title="", url=url, genre="").hash
+
+    async def validate_feeds(urls, on_result=None):
+        # The user deletes the feed before its check comes back
+        manager.move_to_deleted(feed_hash)
+        on_result(url, (True, None))
+        return {url: (True, None)}
+
+    with patch.object(manager.feed_validator, "validate_feeds", validate_feeds):
+        loaded, invalid_feeds = await manager.start_loading()
+    assert loaded == 0
+    assert feed_hash not in manager.feeds
+    assert url in manager.deleted_file.read_text()
+
+
+@pytest.mark.asyncio
+async def test_start_loading_survives_deletes_while_guessing(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    url = "https://quiet.example.com/feed"
+    (tmp_path / "feeds.opml").write_text(
+        '<?xml version="1.0"?><opml version="1.0"><head><title>T</title></head>'
+        f'<body><outline text="Other"><outline text="Quiet" type="rss" xmlUrl="{url}" />'
+        "</outline></body></opml>"
+    )
+    manager = FeedManager("feeds.opml")
+    manager.deleted_file = tmp_path / "deleted_feeds.opml"
+    feed_hash = Feed(title="", url=url, genre="").hash
+
+    async def validate_feeds(urls, on_result=None):
+        on_result(url, (True, None))
+        return {url: (True, None)}
+
+    async def guess_genre(feed_url):
+        # The user deletes the feed while its genre is being guessed
+        manager.move_to_deleted(feed_hash)
+        return "Science"
+
+    with patch.object(manager.feed_validator, "validate_feeds", validate_feeds):
+        with patch.object(manager, "guess_genre", guess_genre):
+            loaded, invalid_feeds = await manager.start_loading()
+    assert loaded == 0
+    assert invalid_feeds == {}
+    assert feed_hash not in manager.feeds
+
+
+@pytest.mark.asyncio
+async def test_autosave_coalesces_edits(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = FeedManager("feeds.opml")
+    feeds = [
+        Feed(title=f"Feed {i}", url=f"https://example.com/{i}", genre="Other")
+        for i in range(3)
+    ]
+    manager.feeds.update({feed.hash: feed for feed in feeds})
+    writes = []
+    write_opml = manager._write_opml
+
+    def counting_write(filename, feeds, atomic=False):
+        writes.append(atomic)
+        write_opml(filename, feeds, atomic)
+
+    monkeypatch.setattr(manager, "_write_opml", counting_write)
+    manager.enable_autosave(0.05)
+    for feed in feeds:
+        manager.set_genre(feed.hash, "Technology")
+    assert manager.dirty
+    assert writes == []
+
+    await asyncio.sleep(0.2)
+    # The burst of edits was saved once, atomically
+    assert writes == [True]
+    assert not manager.dirty
+    assert (tmp_path / "feeds.opml").read_text().count('text="Technology"') == 1
+    assert not (tmp_path / "feeds.opml.tmp").exists()
+
+    # Closing saves edits the quiet period hasn't passed for yet
+    manager.enable_autosave(60)
+    manager.move_to_deleted(feeds[0].hash)
+    await manager.close()
+    assert writes == [True, True]
+    assert "Feed 0" not in (tmp_path / "feeds.opml").read_text()
+
+
+def test_compressed_opml_round_trip(tmp_path, monkeypatch, valid_opml_content):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "feeds.opml.gz").write_bytes(
+        gzip.compress(valid_opml_content.encode("utf-8"))
+    )
+    manager = FeedManager("feeds.opml.gz")
+    feeds = manager.read_opml()
+    assert [feed.title for feed in feeds] == ["TechCrunch"]
+
+    manager.feeds.update({feed.hash: feed for feed in feeds})
+    manager.save_opml(manager.opml_file)
+    saved = gzip.decompress((tmp_path / "feeds.opml.gz").read_bytes()).decode()
+    assert "TechCrunch" in saved
+    assert [feed.title for feed in FeedManager("feeds.opml.gz").read_opml()] == [
+        "TechCrunch"
+    ]
+
+
+def test_saved_attributes_survive_save_load_save(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = FeedManager("feeds.opml")
+    moved = Feed(
+        title="Moved",
+        url="https://new.example.com/feed",
+        genre="Science",
+        description="Space & more",
+        original_url="https://old.example.com/rss",
+    )
+    manager.feeds[moved.hash] = moved
+    manager.save_opml(manager.opml_file)
+
+    reloaded = FeedManager("feeds.opml")
+    (feed,) = reloaded.read_opml()
+    assert feed == moved
+    reloaded.feeds[feed.hash] = feed
+    reloaded.save_opml(reloaded.opml_file)
+    text = (tmp_path / "feeds.opml").read_text()
+    assert 'originalUrl="https://old.example.com/rss"' in text
+
+    # A later move still records the URL first subscribed under
+    reloaded.snapshot.discard()
+    (feed,) = FeedManager("feeds.opml").read_opml()
+    assert feed.original_url == "https://old.example.com/rss"
@@ -0,0 +1,100 @@
+import pytest
+from datetime import datetime
+from src.models.feed import Feed
+from src.services.feed_manager import FeedManager
+from src.services.feed_store import SQLiteFeedStore
+
+
+def make_feed(i, genre="News"):
+    return Feed(
+        title=f"Feed {i}", url=f"https://host{i % 3}.example.com/{i}", genre=genre
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteFeedStore(str(tmp_path / "catalog.db"))
+    yield store
+    store.close()
+
+
+def test_mapping_roundtrip(store):
+    feed = Feed(
+        title="Moved",
+        url="https://example.com/feed",
+        genre="Science",
+        description="desc",
+        deleted_at=datetime(2024, 1, 2, 3, 4, 5),
+        original_url="http://example.com/feed",
+    )
+    store[feed.hash] = feed
+    assert store[feed.hash] == feed
+    assert feed.hash in store
+    assert len(store) == 1
+
+    del store[feed.hash]
+    assert feed.hash not in store
+    with pytest.raises(KeyError):
+        store[feed.hash]
+    with pytest.raises(KeyError):
+        del store[feed.hash]
+
+
+def test_iteration_keeps_insertion_order(store):
+    feeds = [make_feed(i) for i in range(5)]
+    store.update({feed.hash: feed for feed in feeds})
+    # Replacing a feed keeps its position
+    store[feeds[0].hash] = Feed(title="Renamed", url=feeds[0].url, genre="News")
+
+    assert list(store) == [feed.hash for feed in feeds]
+    assert [feed.title for feed in store.values()][:2] == ["Renamed", "Feed 1"]
+    assert dict(store.items())[feeds[1].hash] == feeds[1]
+
+
+def test_batch_rolls_back_on_error(store):
+    feed = make_feed(1)
+    with pytest.raises(RuntimeError):
+        with store.batch():
+            store[feed.hash] = feed
+            raise RuntimeError("boom")
+    assert len(store) == 0
+
+
+def test_indexed_queries(store):
+    feeds = [make_feed(i, genre="Science" if i % 2 else "News") for i in range(6)]
+    store.update({feed.hash: feed for feed in feeds})
+    assert store.genre_counts() == {"News": 3, "Science": 3}
+    assert set(store.feeds_on_host("HOST1.example.com")) == {
+        feeds[1].hash,
+        feeds[4].hash,
+    }
+
+
+def test_wal_journal_and_persistence(tmp_path):
+    path = str(tmp_path / "catalog.db")
+    store = SQLiteFeedStore(path)
+    assert store.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    feed = make_feed(7)
+    store[feed.hash] = feed
+    store.close()
+
+    reopened = SQLiteFeedStore(path)
+    assert reopened[feed.hash] == feed
+    reopened.close()
+
+
+def test_feed_manager_with_database(tmp_path):
+    manager = FeedManager("feeds.opml", db_file=str(tmp_path / "catalog.db"))
+    feed = make_feed(1, genre="Other")
+    manager.feeds[feed.hash] = feed
+    manager.set_genre(feed.hash, "Technology")
+    assert manager.feeds[feed.hash].genre == "Technology"
+    assert manager.genre_counts() == {"Technology": 1}
+    manager.feeds.close()
+
+
+def test_malformed_url_is_stored(store):
+    feed = Feed(title="Broken", url="http://[abc]/feed", genre="News")
+    store[feed.hash] = feed
+    assert store[feed.hash].url == "http://[abc]/feed"
+    assert store.feeds_on_host("") == {feed.hash: feed}
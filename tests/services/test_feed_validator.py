@@ -1,7 +1,8 @@
 import asyncio
 import aiohttp
 import pytest
-from unittest.mock import patch, AsyncMock
+from types import SimpleNamespace
+from unittest.mock import patch, AsyncMock, MagicMock
 from src.services.feed_validator import FeedValidator
 
 
@@ -208,3 +209,147 @@ async def test_delay_timing_accuracy():
         is_valid, error = await validator.validate_feed(url)
         assert is_valid
         assert error is None
+
+
+def test_record_permanent_redirect_chain():
+    validator = FeedValidator()
+    url = "http://example.com/feed"
+    response = SimpleNamespace(
+        url="https://www.example.com/feed",
+        history=(
+            SimpleNamespace(status=301, url=url),
+            SimpleNamespace(status=308, url="https://example.com/feed"),
+        ),
+    )
+    validator._record_redirects(url, response)
+    assert validator.redirects[url] == [
+        (301, "https://example.com/feed"),
+        (308, "https://www.example.com/feed"),
+    ]
+    assert validator.permanent_location(url) == "https://www.example.com/feed"
+
+
+def test_temporary_redirect_stops_chain():
+    validator = FeedValidator()
+    url = "http://example.com/feed"
+    response = SimpleNamespace(
+        url="https://cdn.example.com/feed?token=abc",
+        history=(
+            SimpleNamespace(status=301, url=url),
+            SimpleNamespace(status=302, url="https://example.com/feed"),
+        ),
+    )
+    validator._record_redirects(url, response)
+    assert validator.permanent_location(url) == "https://example.com/feed"
+
+    temporary_only = SimpleNamespace(
+        url="https://example.com/feed",
+        history=(SimpleNamespace(status=307, url=url),),
+    )
+    validator._record_redirects(url, temporary_only)
+    assert validator.permanent_location(url) is None
+
+
+def test_redirect_cleared_when_feed_answers_directly():
+    validator = FeedValidator()
+    url = "http://example.com/feed"
+    validator.redirects[url] = [(301, "https://example.com/feed")]
+    validator._record_redirects(url, SimpleNamespace(url=url, history=()))
+    assert validator.permanent_location(url) is None
+
+
+@pytest.mark.asyncio
+async def test_valid_feed_keeps_latest_entries():
+    validator = FeedValidator()
+    url = "http://example.com/feed"
+    items = "".join(
+        f"<item><title>Post {i}</title><link>http://example.com/{i}</link></item>"
+        for i in range(8)
+    )
+    with patch("aiohttp.ClientSession.get", new_callable=MagicMock) as mock_get:
+        mock_get.return_value.__aenter__.return_value.status = 200
+        mock_get.return_value.__aenter__.return_value.history = ()
+        mock_get.return_value.__aenter__.return_value.text = AsyncMock(
+            return_value=f'<?xml version="1.0"?><rss version="2.0"><channel>'
+            f"<title>T</title>{items}</channel></rss>"
+        )
+        assert await validator.validate_feed(url) == (True, None)
+    assert [entry["title"] for entry in validator.entries[url]] == [
+        f"Post {i}" for i in range(5)
+    ]
+    assert len(validator.entry_keys[url]) == 16  # link and title of each entry
+    assert validator.parse_pool.parsed == 1
+    await validator.close()
+
+
+@pytest.mark.asyncio
+async def test_validate_feeds_starts_slowest_feeds_first():
+    validator = FeedValidator(concurrency=1, dns_prepass=False)
+    validator.latency_tracker.record("http://fast.example.com/feed", 0.1)
+    validator.latency_tracker.record("http://slow.example.com/feed", 5.0)
+    urls = [
+        "http://fast.example.com/feed",
+        "http://slow.example.com/feed",
+        "http://new.example.com/feed",
+    ]
+    started = []
+
+    async def fake_validate(url):
+        started.append(url)
+        if url == "http://new.example.com/feed":
+            raise RuntimeError("boom")
+        return True, None
+
+    reported = []
+    with patch.object(validator, "validate_feed", side_effect=fake_validate):
+        results = await validator.validate_feeds(
+            urls, on_result=lambda url, result: reported.append(url)
+        )
+
+    # Each result is reported as soon as it is known
+    assert reported == started
+    # Never-seen feeds are assumed slow, known-fast ones go last
+    assert started == [
+        "http://new.example.com/feed",
+        "http://slow.example.com/feed",
+        "http://fast.example.com/feed",
+    ]
+    assert list(results) == urls
+    assert isinstance(results["http://new.example.com/feed"], RuntimeError)
+    assert set(validator.latency_tracker.durations) == set(urls)
+    assert validator.completion["expected"] == [10.0, 15.0, 15.1]
+    assert len(validator.completion["actual"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_learned_host_timeout_is_used_and_timeouts_are_recorded():
+    validator = FeedValidator(retry_delay=0, timeout_bounds=(0.5, 30.0))
+    url = "http://fast.example.com/feed"
+    for _ in range(5):
+        validator.latency_tracker.record_latency(url, 0.1)
+    assert validator.host_timeout(url) == pytest.approx(0.5)
+
+    with patch("aiohttp.ClientSession.get", new_callable=MagicMock) as mock_get:
+        mock_get.return_value.__aenter__.side_effect = asyncio.TimeoutError
+        is_valid, _ = await validator.validate_feed(url)
+
+    assert not is_valid
+    timeouts = [call.kwargs["timeout"].total for call in mock_get.call_args_list]
+    # The first timeout counts as a sample, so the retry gets more room
+    assert timeouts == [pytest.approx(0.5), pytest.approx(1.5)]
+    assert validator.latency_tracker.host_latencies["fast.example.com"][-2:] == (
+        timeouts
+    )
+    await validator.close()
+
+
+@pytest.mark.asyncio
+async def test_validate_feeds_reports_malformed_urls():
+    validator = FeedValidator(dns_prepass=False)
+    results = await validator.validate_feeds(
+        ["http://[abc]/feed"], on_result=lambda url, result: None
+    )
+    is_valid, error = results["http://[abc]/feed"]
+    assert not is_valid
+    assert error.startswith("URL parsing error")
+    await validator.close()
@@ -1,4 +1,7 @@
+import json
+import tempfile
 import unittest
+from pathlib import Path
 from unittest.mock import patch
 from src.services.genre_detector import GenreDetector
 
@@ -81,6 +84,74 @@ class TestGenreDetector(unittest.TestCase):
         genre = self.detector.guess_genre("http://example.com/feed")
         self.assertEqual(genre, "Other")
 
+    def test_classify_entries_without_fetching(self):
+        entries = [
+            {"title": "Match report", "description": None},
+            {"title": "Team news", "description": "The player scored"},
+        ]
+        self.assertEqual(self.detector.classify_entries(entries), "Sports")
+        self.assertEqual(self.detector.classify_entries([]), "Other")
+
+    def test_unchanged_feed_is_not_rescored(self):
+        entries = [{"title": "New physics research", "description": ""}]
+        url = "http://example.com/feed"
+        self.assertEqual(self.detector.classify_entries(entries, url=url), "Science")
+        self.assertEqual(self.detector.classify_entries(entries, url=url), "Science")
+        self.assertEqual((self.detector.memo_misses, self.detector.memo_hits), (1, 1))
+
+        changed = [{"title": "Breaking news", "description": ""}]
+        self.assertEqual(self.detector.classify_entries(changed, url=url), "News")
+        self.assertEqual(self.detector.memo_misses, 2)
+
+    def test_keyword_edit_rescores_only_that_genre(self):
+        entries = [{"title": "Recipes for the season", "description": ""}]
+        url = "http://example.com/food"
+        self.assertEqual(self.detector.classify_entries(entries, url=url), "Other")
+        scores_before = dict(self.detector.memo[url]["scores"])
+
+        self.detector.genre_keywords["Entertainment"].append("recipes")
+        self.assertEqual(
+            self.detector.classify_entries(entries, url=url), "Entertainment"
+        )
+        scores_after = self.detector.memo[url]["scores"]
+        changed = {g for g in scores_after if scores_after[g] != scores_before[g]}
+        self.assertEqual(changed, {"Entertainment"})
+
+    def test_memo_persists_between_runs(self):
+        entries = [{"title": "Team wins the match", "description": ""}]
+        url = "http://example.com/sports"
+        with tempfile.TemporaryDirectory() as tmp:
+            memo_file = Path(tmp) / "genre_memo.json"
+            first = GenreDetector(memo_file=memo_file)
+            first.classify_entries(entries, url=url)
+            first.save_memo()
+
+            second = GenreDetector(memo_file=memo_file)
+            self.assertEqual(second.classify_entries(entries, url=url), "Sports")
+            self.assertEqual((second.memo_hits, second.memo_misses), (1, 0))
+
+    def test_unreadable_memo_is_ignored(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            memo_file = Path(tmp) / "genre_memo.json"
+            memo_file.write_text("{not json")
+            self.assertEqual(GenreDetector(memo_file=memo_file).memo, {})
+
+    def test_memo_of_the_wrong_shape_is_ignored(self):
+        entries = [{"title": "Team wins the match", "description": ""}]
+        url = "http://example.com/sports"
+        shapes = [
+            [],
+            {url: {"entries": "abc"}},
+            {url: {"entries": "abc", "scores": {"Sports": 3}}},
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            memo_file = Path(tmp) / "genre_memo.json"
+            for memo in shapes:
+                memo_file.write_text(json.dumps(memo))
+                detector = GenreDetector(memo_file=memo_file)
+                self.assertEqual(detector.memo, {})
+                self.assertEqual(detector.classify_entries(entries, url=url), "Sports")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,91 @@
+import pytest
+from src.models.feed import Feed
+from src.services.genre_rules import GenreRules
+
+RULES = """
+[[rule]]
+genre = "Technology"
+hosts = ["*.substack.com"]
+title = "\\\\bai\\\\b"
+
+[[rule]]
+genre = "Science"
+hosts = "www.nasa.gov"
+
+[[rule]]
+genre = "Entertainment"
+hosts = ["*blog*.example.org"]
+
+[[rule]]
+genre = "Technology"
+category = ["Programming", "Dev"]
+
+[[rule]]
+genre = "News"
+url = "/news/"
+description = "daily"
+"""
+
+
+@pytest.fixture
+def rules(tmp_path):
+    path = tmp_path / "rules.toml"
+    path.write_text(RULES)
+    return GenreRules.from_file(path)
+
+
+def feed(url, title="", genre="Other", description=""):
+    return Feed(title=title, url=url, genre=genre, description=description)
+
+
+def test_host_glob_with_title_pattern(rules):
+    assert rules.match(feed("https://x.substack.com/feed", "All about AI")) == (
+        "Technology"
+    )
+    assert rules.match(feed("https://x.substack.com/feed", "Painting")) is None
+    # "*.substack.com" covers subdomains only
+    assert rules.match(feed("https://substack.com/feed", "AI")) is None
+
+
+def test_exact_and_wildcard_hosts(rules):
+    assert rules.match(feed("https://WWW.NASA.gov/rss")) == "Science"
+    assert rules.match(feed("https://myblog2.example.org/rss")) == "Entertainment"
+
+
+def test_category_and_combined_patterns(rules):
+    assert rules.match(feed("https://a.com/rss", genre="programming")) == "Technology"
+    assert (
+        rules.match(feed("https://b.com/news/rss", description="Daily briefing"))
+        == "News"
+    )
+    assert rules.match(feed("https://b.com/news/rss", description="Weekly")) is None
+
+
+def test_first_matching_rule_wins(tmp_path):
+    path = tmp_path / "rules.toml"
+    path.write_text(
+        '[[rule]]\ngenre = "Sports"\nhosts = "espn.com"\n\n'
+        '[[rule]]\ngenre = "News"\nurl = "espn"\n'
+    )
+    assert GenreRules.from_file(path).match(feed("https://espn.com/rss")) == "Sports"
+
+
+@pytest.mark.parametrize(
+    "text, message",
+    [
+        ('[[rule]]\nhosts = "a.com"\n', "genre is required"),
+        ('[[rule]]\ngenre = "News"\ntitel = "x"\n', "unknown keys titel"),
+        ('[[rule]]\ngenre = "News"\ntitle = "("\n', "bad title pattern"),
+        ("[[rule]\n", "Invalid rules file"),
+    ],
+)
+def test_malformed_rules_are_reported(tmp_path, text, message):
+    path = tmp_path / "rules.toml"
+    path.write_text(text)
+    with pytest.raises(ValueError, match=message):
+        GenreRules.from_file(path)
+
+
+def test_malformed_url_matches_rules_without_hosts(rules):
+    assert rules.match(feed("http://[abc]/feed", genre="Dev")) == "Technology"
+    assert rules.match(feed("http://[abc]/feed")) is None
@@ -0,0 +1,91 @@
+import asyncio
+import socket
+import pytest
+from unittest.mock import patch
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from src.services.feed_validator import FeedValidator
+from src.services.host_resolver import HostResolver
+
+RSS = """<?xml version="1.0"?><rss version="2.0"><channel><title>T</title>
+<item><title>Hello</title><link>http://feeds.test/1</link></item></channel></rss>"""
+
+
+def fake_dns(lookups):
+    """Resolve feeds.test to localhost; dead.test doesn't exist."""
+
+    async def getaddrinfo(host, port, **kwargs):
+        lookups.append(host)
+        if host == "dead.test":
+            raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+        if host == "flaky.test":
+            raise socket.gaierror(socket.EAI_AGAIN, "Temporary failure")
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", 0))]
+
+    return patch.object(asyncio.get_running_loop(), "getaddrinfo", getaddrinfo)
+
+
+@pytest.mark.asyncio
+async def test_resolve_all_caches_and_spots_missing_hosts():
+    resolver = HostResolver(concurrency=2)
+    lookups = []
+    with fake_dns(lookups):
+        hosts = ["feeds.test", "dead.test", "flaky.test", "127.0.0.1"]
+        missing = await resolver.resolve_all(hosts)
+        assert list(missing) == ["dead.test"]
+        assert "does not resolve" in missing["dead.test"]
+        assert await resolver.resolve_all(hosts) == missing
+
+        (address,) = await resolver.resolve("feeds.test", 8080, family=0)
+    assert address["host"] == "127.0.0.1" and address["port"] == 8080
+    # Each host is looked up once; failed lookups are tried again later
+    assert sorted(lookups) == ["dead.test", "feeds.test", "flaky.test", "flaky.test"]
+
+
+@pytest.mark.asyncio
+async def test_resolve_leaves_link_local_ipv6_addresses_out():
+    async def getaddrinfo(host, port, **kwargs):
+        return [
+            (socket.AF_INET6, socket.SOCK_STREAM, 6, "", ("fe80::1", 0, 0, 2)),
+            (socket.AF_INET6, socket.SOCK_STREAM, 6, "", ("2001:db8::1", 0, 0, 0)),
+        ]
+
+    resolver = HostResolver()
+    with patch.object(asyncio.get_running_loop(), "getaddrinfo", getaddrinfo):
+        await resolver.resolve_all(["v6.test"])
+        addresses = await resolver.resolve("v6.test", 443, family=0)
+    assert [address["host"] for address in addresses] == ["2001:db8::1"]
+
+
+@pytest.mark.asyncio
+async def test_feeds_on_missing_hosts_fail_without_a_request():
+    async def feed(request):
+        return web.Response(text=RSS, content_type="application/rss+xml")
+
+    app = web.Application()
+    app.add_routes([web.get("/feed", feed)])
+    validator = FeedValidator(retry_delay=0)
+    lookups = []
+    async with TestServer(app) as server:
+        live = f"http://feeds.test:{server.port}/feed"
+        dead = [f"http://dead.test/feed{i}" for i in range(3)]
+        reported = []
+        with (
+            fake_dns(lookups),
+            patch.object(
+                validator, "validate_feed", wraps=validator.validate_feed
+            ) as validate_feed,
+        ):
+            results = await validator.validate_feeds(
+                [live] + dead, on_result=lambda url, result: reported.append(url)
+            )
+        await validator.close()
+
+    # The live feed was fetched through the addresses resolved up front
+    assert results[live] == (True, None)
+    assert [call.args[0] for call in validate_feed.call_args_list] == [live]
+    for url in dead:
+        assert results[url][0] is False
+        assert "dead.test" in results[url][1]
+    assert sorted(reported) == sorted([live] + dead)
+    assert sorted(lookups) == ["dead.test", "feeds.test"]
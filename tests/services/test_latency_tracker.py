@@ -0,0 +1,107 @@
+import pytest
+from src.services.latency_tracker import (
+    LatencyTracker,
+    percentile,
+    simulate_completion,
+)
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile(values, 100) == 100.0
+    assert percentile([], 90) == 0.0
+
+
+def test_simulate_completion_fills_free_slots():
+    # Two slots: the long job runs alone while the short ones share the other
+    assert simulate_completion([5.0, 1.0, 1.0, 1.0], workers=2) == [
+        5.0,
+        1.0,
+        2.0,
+        3.0,
+    ]
+
+
+def test_longest_first_shortens_makespan():
+    durations = [1.0, 1.0, 1.0, 1.0, 4.0]
+    in_order = max(simulate_completion(durations, workers=2))
+    longest_first = max(simulate_completion(sorted(durations, reverse=True), 2))
+    assert longest_first < in_order
+
+
+def test_expected_durations_fall_back_to_host_then_default():
+    tracker = LatencyTracker()
+    tracker.record("https://slow.example.com/a", 8.0)
+    tracker.record("https://slow.example.com/b", 6.0)
+    expected = tracker.expected_durations(
+        [
+            "https://slow.example.com/a",
+            "https://slow.example.com/new",
+            "https://unknown.example.org/feed",
+        ],
+        default=10.0,
+    )
+    assert expected == {
+        "https://slow.example.com/a": 8.0,
+        "https://slow.example.com/new": 7.0,
+        "https://unknown.example.org/feed": 10.0,
+    }
+
+
+def test_durations_persist(tmp_path):
+    path = tmp_path / "feed_latency.json"
+    tracker = LatencyTracker(path)
+    tracker.record("https://example.com/feed", 1.5)
+    tracker.save()
+    assert LatencyTracker(path).durations == {"https://example.com/feed": 1.5}
+
+
+def test_unreadable_file_is_ignored(tmp_path):
+    path = tmp_path / "feed_latency.json"
+    path.write_text("[]")
+    assert LatencyTracker(path).durations == {}
+
+
+def test_host_timeout_from_p99_clamped_to_bounds():
+    tracker = LatencyTracker(min_samples=5)
+    url = "https://cdn.example.com/feed"
+    for seconds in (0.1, 0.1, 0.2, 0.1, 0.2):
+        tracker.record_latency(url, seconds)
+    assert tracker.host_timeout(url, default=10.0, bounds=(0.1, 30.0)) == pytest.approx(
+        0.6
+    )
+    assert tracker.host_timeout(url, default=10.0, bounds=(1.0, 30.0)) == 1.0
+
+    slow = "https://slow.example.org/feed"
+    for _ in range(5):
+        tracker.record_latency(slow, 15.0)
+    assert tracker.host_timeout(slow, default=10.0, bounds=(1.0, 30.0)) == 30.0
+    assert tracker.learned_hosts() == 2
+
+
+def test_host_without_history_gets_default_timeout():
+    tracker = LatencyTracker(min_samples=5)
+    tracker.record_latency("https://new.example.com/feed", 0.1)
+    assert tracker.host_timeout("https://new.example.com/feed", default=10.0) == 10.0
+    assert tracker.learned_hosts() == 0
+
+
+def test_host_latencies_keep_a_window_and_persist(tmp_path):
+    path = tmp_path / "feed_latency.json"
+    tracker = LatencyTracker(path, window=3)
+    for seconds in (1.0, 2.0, 3.0, 4.0):
+        tracker.record_latency("https://example.com/feed", seconds)
+    assert tracker.host_latencies == {"example.com": [2.0, 3.0, 4.0]}
+    tracker.save()
+    assert LatencyTracker(path).host_latencies == {"example.com": [2.0, 3.0, 4.0]}
+
+
+def test_malformed_urls_have_no_host():
+    tracker = LatencyTracker()
+    tracker.record("http://[abc]/feed", 2.0)
+    assert tracker.expected_durations(["http://[abc]/feed", "http://[x/"], 10.0) == {
+        "http://[abc]/feed": 2.0,
+        "http://[x/": 2.0,
+    }
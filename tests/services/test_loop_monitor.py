@@ -0,0 +1,34 @@
+import asyncio
+import time
+import pytest
+from src.services.loop_monitor import LoopLagMonitor
+
+
+def blocking_work():
+    time.sleep(0.3)
+
+
+@pytest.mark.asyncio
+async def test_stall_is_measured_and_attributed():
+    monitor = LoopLagMonitor(threshold=0.1, interval=0.01)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        blocking_work()
+        await asyncio.sleep(0.05)
+    finally:
+        monitor.stop()
+
+    (stall,) = monitor.stalls
+    assert stall.lag >= 0.2
+    assert stall.culprit.startswith("blocking_work ")
+    assert "time.sleep(0.3)" in stall.stack
+    # asyncio's debug mode named the slow step as well
+    assert any(seconds >= 0.2 for _, seconds in monitor.slow_callbacks)
+    assert monitor.histogram()["<=500ms"] == 1
+
+    summary = monitor.summary()
+    assert summary["loop_stalls"] == 1
+    assert summary["loop_lag_max_ms"] >= 200
+    assert "<=500ms: 1" in summary["loop_lag_histogram"]
+    assert not asyncio.get_running_loop().get_debug()
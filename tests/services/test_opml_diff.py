@@ -0,0 +1,80 @@
+from src.models.feed import Feed
+from src.services.opml_diff import MergeConflict, diff_catalogs, merge_catalogs
+
+
+def catalog(*feeds):
+    return {feed.hash: feed for feed in feeds}
+
+
+def feed(name, genre="News", title=None):
+    return Feed(title=title or name, url=f"https://{name}.example.com/", genre=genre)
+
+
+def test_diff_reports_each_kind_of_change():
+    old = catalog(feed("a"), feed("b"), feed("c"), feed("d"))
+    new = catalog(
+        feed("a"),
+        feed("b", genre="Science"),
+        feed("c", title="C renamed", genre="Sports"),
+        feed("e"),
+    )
+    diff = diff_catalogs(old, new)
+    assert [f.title for f in diff.added] == ["e"]
+    assert [f.title for f in diff.removed] == ["d"]
+    assert [(a.genre, b.genre) for a, b in diff.regenred] == [
+        ("News", "Science"),
+        ("News", "Sports"),
+    ]
+    assert [(a.title, b.title) for a, b in diff.retitled] == [("c", "C renamed")]
+    assert diff.redescribed == []
+    assert not diff_catalogs(old, old)
+
+
+def test_merge_takes_changes_from_both_sides():
+    base = catalog(feed("a"), feed("b"), feed("c"))
+    ours = catalog(feed("a", genre="Science"), feed("b"), feed("mine"))
+    theirs = catalog(feed("a", title="A!"), feed("c"), feed("theirs"))
+
+    merged, conflicts = merge_catalogs(base, ours, theirs)
+    assert conflicts == []
+    # b was deleted by them and c by us, untouched on the other side
+    assert [f.title for f in merged.values()] == ["A!", "mine", "theirs"]
+    assert merged[feed("a").hash].genre == "Science"
+
+
+def test_merge_reports_conflicts_and_keeps_ours():
+    base = catalog(feed("a"), feed("b"), feed("c"))
+    ours = catalog(feed("a", genre="Science"), feed("b", genre="Sports"))
+    theirs = catalog(feed("a", genre="Sports"), feed("c", title="C!"))
+
+    merged, conflicts = merge_catalogs(base, ours, theirs)
+    assert conflicts == [
+        MergeConflict("https://a.example.com/", "genre", "Science", "Sports"),
+        MergeConflict("https://b.example.com/", "deleted", "changed", None),
+        MergeConflict("https://c.example.com/", "deleted", None, "changed"),
+    ]
+    assert merged[feed("a").hash].genre == "Science"
+    assert set(merged) == {feed("a").hash, feed("b").hash, feed("c").hash}
+
+
+def test_merge_feed_added_on_both_sides():
+    ours = catalog(feed("new", genre="Science"))
+    theirs = catalog(feed("new", genre="Sports"))
+    merged, conflicts = merge_catalogs({}, ours, theirs)
+    assert merged[feed("new").hash].genre == "Science"
+    assert [c.field for c in conflicts] == ["genre"]
+
+
+def test_descriptions_are_diffed_and_merged():
+    described = Feed(
+        title="a", url="https://a.example.com/", genre="News", description="New"
+    )
+    base = catalog(feed("a"))
+    diff = diff_catalogs(base, catalog(described))
+    assert [(a.description, b.description) for a, b in diff.redescribed] == [
+        ("", "New")
+    ]
+
+    merged, conflicts = merge_catalogs(base, base, catalog(described))
+    assert conflicts == []
+    assert merged[described.hash].description == "New"
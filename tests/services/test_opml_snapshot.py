@@ -0,0 +1,112 @@
+import json
+import os
+import pickle
+from datetime import datetime
+from unittest.mock import patch
+from src.services.feed_manager import FeedManager
+from src.services.opml_snapshot import OPMLSnapshot, SNAPSHOT_VERSION
+
+OPML = """<?xml version="1.0"?><opml version="1.0"><head><title>T</title></head>
+<body><outline text="News">
+<outline text="A" type="rss" xmlUrl="http://a.example.com/feed" />
+<outline text="B" type="rss" xmlUrl="http://b.example.com/feed" />
+</outline></body></opml>"""
+
+
+def write_opml(tmp_path, text=OPML):
+    path = tmp_path / "feeds.opml"
+    path.write_text(text)
+    return path
+
+
+def test_unchanged_file_is_not_parsed_again(tmp_path):
+    path = write_opml(tmp_path)
+    manager = FeedManager(str(path))
+    feeds = manager.read_opml()
+    titles = [feed.title for feed in feeds]
+    manager.validation_results["http://a.example.com/feed"] = (False, "HTTP 404")
+    manager.snapshot.save(manager.validation_results)
+    # Edits to the catalog's feeds don't leak into the snapshot
+    feeds[0].genre = "Science"
+    manager.snapshot.save(manager.validation_results)
+
+    restarted = FeedManager(str(path))
+    with patch("src.services.feed_manager.listparser.parse") as parse:
+        cached = restarted.read_opml()
+    parse.assert_not_called()
+    assert [feed.title for feed in cached] == titles
+    assert [feed.genre for feed in cached] == ["News", "News"]
+    assert restarted.validation_results == {
+        "http://a.example.com/feed": (False, "HTTP 404")
+    }
+
+
+def test_touched_file_is_checked_by_content(tmp_path):
+    path = write_opml(tmp_path)
+    FeedManager(str(path)).read_opml()
+    os.utime(path, ns=(0, 0))
+
+    snapshot = OPMLSnapshot(path)
+    assert snapshot.load() is not None
+
+    # Same size, different content
+    path.write_text(OPML.replace("http://a.", "http://c."))
+    os.utime(path, ns=(0, 0))
+    assert snapshot.load() is None
+    assert not snapshot.path.exists()
+
+
+def test_changed_file_is_parsed_again(tmp_path):
+    path = write_opml(tmp_path)
+    FeedManager(str(path)).read_opml()
+    path.write_text(OPML.replace('text="B"', 'text="Bee"'))
+
+    feeds = FeedManager(str(path)).read_opml()
+    assert [feed.title for feed in feeds] == ["A", "Bee"]
+
+
+def test_other_version_is_discarded(tmp_path):
+    path = write_opml(tmp_path)
+    snapshot = OPMLSnapshot(path)
+    snapshot.path.write_text(json.dumps({"version": SNAPSHOT_VERSION + 1}))
+    assert snapshot.load() is None
+    assert not snapshot.path.exists()
+
+    snapshot.path.write_bytes(b"not json")
+    assert snapshot.load() is None
+    assert not snapshot.path.exists()
+
+    snapshot.path.write_text(
+        json.dumps({"version": SNAPSHOT_VERSION, "key": [1, 2, "x"], "feeds": [[1]]})
+    )
+    assert snapshot.load() is None
+    assert not snapshot.path.exists()
+
+
+class Payload:
+    def __init__(self, marker):
+        self.marker = marker
+
+    def __reduce__(self):
+        return (os.makedirs, (self.marker,))
+
+
+def test_snapshot_never_runs_code(tmp_path):
+    path = write_opml(tmp_path)
+    snapshot = OPMLSnapshot(path)
+    marker = tmp_path / "ran"
+    snapshot.path.write_bytes(pickle.dumps({"version": Payload(str(marker))}))
+    assert FeedManager(str(path)).read_opml()
+    assert not marker.exists()
+
+
+def test_deleted_at_and_original_url_round_trip(tmp_path):
+    path = write_opml(tmp_path)
+    manager = FeedManager(str(path))
+    feeds = manager.read_opml()
+    feeds[0].deleted_at = datetime(2024, 5, 1, 12, 30)
+    feeds[0].original_url = "http://old.example.com/feed"
+    manager.snapshot.stamp(os.stat(path), path.read_text(), feeds)
+    manager.snapshot.save({})
+
+    assert OPMLSnapshot(path).load() == (feeds, {})
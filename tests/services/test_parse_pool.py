@@ -0,0 +1,55 @@
+import asyncio
+import pickle
+import pytest
+from src.services.parse_pool import ParsePool, parse_feed_content
+
+RSS = """<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Test</title>
+<item><title>First</title><link>http://example.com/1</link>
+<description>About code</description></item>
+<item><title>Second</title><link>http://example.com/2</link></item>
+</channel></rss>"""
+
+
+def test_parse_feed_content_keeps_small_picklable_summary():
+    parsed = parse_feed_content(RSS)
+    assert not parsed.bozo
+    assert parsed.error is None
+    assert [entry["title"] for entry in parsed.entries] == ["First", "Second"]
+    assert parsed.entries[0]["description"] == "About code"
+    assert pickle.loads(pickle.dumps(parsed)) == parsed
+
+
+def test_parse_feed_content_flags_broken_documents():
+    parsed = parse_feed_content("<rss><channel><title>Broken")
+    assert parsed.bozo
+    assert parsed.error
+
+
+def test_parse_feed_content_limits_entries():
+    assert len(parse_feed_content(RSS, max_entries=1).entries) == 1
+
+
+@pytest.mark.asyncio
+async def test_inline_pool_parses_in_this_thread():
+    pool = ParsePool(workers=0)
+    parsed = await pool.parse(RSS)
+    assert parsed.entries[1]["link"] == "http://example.com/2"
+    assert pool.stats() == {"workers": 0, "parsed": 1, "peak_queue_depth": 0}
+    pool.close()
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_reports_queue_depth():
+    pool = ParsePool(workers=1)
+    try:
+        results = await asyncio.gather(*(pool.parse(RSS) for _ in range(3)))
+    finally:
+        pool.close()
+    assert all(result == results[0] for result in results)
+    # One document is being parsed while the other two wait for the worker
+    assert pool.stats() == {"workers": 1, "parsed": 3, "peak_queue_depth": 2}
+
+
+def test_default_pool_uses_every_cpu():
+    assert ParsePool().workers >= 1
@@ -0,0 +1,83 @@
+from src.models.feed import Feed
+from src.services.search_index import SearchIndex, trigrams
+
+
+def make_feed(title, url, genre="Other", description=""):
+    return Feed(title=title, url=url, genre=genre, description=description)
+
+
+def build_index(feeds):
+    index = SearchIndex()
+    for feed in feeds:
+        index.add(feed.hash, feed)
+    return index
+
+
+def test_trigrams_pad_word_starts():
+    assert trigrams("Ab") == {"  a", " ab", "ab "}
+    assert trigrams("   ") == set()
+
+
+def test_search_ranks_and_tolerates_typos():
+    crunch = make_feed("TechCrunch", "https://techcrunch.com/feed/")
+    verge = make_feed("The Verge", "https://www.theverge.com/rss/index.xml")
+    nasa = make_feed("NASA Breaking News", "https://www.nasa.gov/rss/breaking_news.rss")
+    index = build_index([crunch, verge, nasa])
+
+    assert index.search("techcrunch")[0][0] == crunch.hash
+    assert index.search("tehcrunch")[0][0] == crunch.hash  # typo
+    assert index.search("nasa.gov")[0][0] == nasa.hash  # host
+    assert index.search("zzzz") == []
+
+
+def test_title_matches_rank_first_among_equal_scores():
+    in_url = make_feed("Daily", "https://example.com/python")
+    in_title = make_feed("python", "https://example.com/daily")
+    index = build_index([in_url, in_title])
+    assert [key for key, _ in index.search("python")] == [in_title.hash, in_url.hash]
+
+
+def test_description_and_genre_are_searchable():
+    feed = make_feed(
+        "Blog", "https://blog.example.com/", "Science", "Notes on astrophysics"
+    )
+    index = build_index([feed, make_feed("Other", "https://other.example.com/")])
+    assert index.search("astrophysics")[0][0] == feed.hash
+    assert index.search("science")[0][0] == feed.hash
+
+
+def test_remove_and_readd_update_results():
+    feed = make_feed("Kottke", "https://kottke.org/feed")
+    index = build_index([feed])
+    index.remove(feed.hash)
+    assert index.search("kottke") == []
+    assert feed.hash not in index
+
+    feed.genre = "Entertainment"
+    index.add(feed.hash, feed)
+    index.add(feed.hash, feed)  # Replaces rather than duplicates
+    assert len(index) == 1
+    assert index.search("entertainment")[0][0] == feed.hash
+
+
+def test_compaction_keeps_live_feeds():
+    index = SearchIndex()
+    feeds = [
+        make_feed(f"Feed {i}", f"https://host{i}.example.com/") for i in range(1500)
+    ]
+    for feed in feeds:
+        index.add(feed.hash, feed)
+    indexed = sum(len(postings) for postings in index._postings.values())
+    for feed in feeds[:1200]:
+        index.remove(feed.hash)
+
+    assert len(index) == 300
+    assert index.search("host1400.example.com")[0][0] == feeds[1400].hash
+    # Forgotten feeds were dropped from the postings along the way
+    assert sum(len(postings) for postings in index._postings.values()) < indexed / 2
+
+
+def test_malformed_url_is_indexed():
+    broken = make_feed("Broken Link", "http://[abc]/feed")
+    index = build_index([broken])
+    assert index.search("broken")[0][0] == broken.hash
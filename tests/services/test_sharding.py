@@ -0,0 +1,168 @@
+import asyncio
+import time
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from unittest.mock import AsyncMock, patch
+from src.models.feed import Feed
+from src.services.feed_manager import FeedManager
+from src.services.sharding import (
+    ShardResult,
+    load_shard_files,
+    shard_of,
+    split_shards,
+    validate_sharded,
+    validate_urls,
+)
+
+
+def test_shard_of_groups_by_host():
+    assert shard_of("http://example.com/a", 8) == shard_of("https://EXAMPLE.com/b", 8)
+    assert 0 <= shard_of("http://example.com/a", 8) < 8
+    assert shard_of("http://example.com/a", 1) == 0
+    # Malformed URLs have no host and all land in one shard
+    assert shard_of("http://[abc]/feed", 8) == shard_of("http://[x/", 8)
+
+
+def test_split_shards_covers_every_url_once():
+    urls = [f"https://host{i}.example.com/feed" for i in range(100)]
+    parts = split_shards(urls, 4)
+    assert len(parts) == 4
+    assert sorted(url for part in parts for url in part) == sorted(urls)
+    assert all(parts)  # 100 hosts spread over every shard
+
+
+def test_shard_result_roundtrip(tmp_path):
+    shard = ShardResult(
+        results={"http://a.com/": (True, None), "http://b.com/": (False, "HTTP 500")},
+        redirects={"http://a.com/": [(301, "https://a.com/")]},
+        entry_keys={"http://a.com/": ["id:1", "title:hello"]},
+        entries={"http://a.com/": [{"title": "hello", "description": ""}]},
+    )
+    path = tmp_path / "part.ndjson"
+    shard.save(path)
+    assert ShardResult.load(path) == shard
+
+
+@pytest.mark.asyncio
+async def test_validate_urls_collects_validator_state():
+    results = {"http://a.com/": (True, None), "http://b.com/": RuntimeError("boom")}
+
+    async def validate_feeds(self, urls):
+        self.entries["http://a.com/"] = [
+            {"title": "Hello", "description": "World", "link": "http://a.com/1"}
+        ]
+        return results
+
+    with patch(
+        "src.services.feed_validator.FeedValidator.validate_feeds", validate_feeds
+    ):
+        shard = await validate_urls(list(results))
+    assert shard.results["http://a.com/"] == (True, None)
+    assert shard.results["http://b.com/"] == (False, "Unexpected error: boom")
+    # Only what genres are guessed from comes back from the worker
+    assert shard.entries == {
+        "http://a.com/": [{"title": "Hello", "description": "World"}]
+    }
+
+
+@pytest.mark.asyncio
+async def test_validate_sharded_runs_in_worker_processes():
+    urls = ["not-a-url", "also-not-a-url"]
+    shard = await validate_sharded(urls, 2)
+    assert shard.results == {url: (False, "Invalid URL format") for url in urls}
+
+
+@pytest.mark.asyncio
+async def test_cancelling_validate_sharded_stops_the_workers():
+    reached = asyncio.Event()
+
+    async def hang(request):
+        reached.set()
+        await asyncio.sleep(60)
+        return web.Response(text="")
+
+    app = web.Application()
+    app.router.add_get("/feed", hang)
+    async with TestServer(app) as server:
+        url = str(server.make_url("/feed"))
+        validating = asyncio.create_task(validate_sharded([url], 1, timeout=60))
+        await asyncio.wait_for(reached.wait(), 30)
+
+        started = time.perf_counter()
+        validating.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await validating
+        # The worker is stopped rather than waited for
+        assert time.perf_counter() - started < 10
+
+
+@pytest.mark.asyncio
+async def test_merge_shard_results(tmp_path):
+    opml_file = tmp_path / "feeds.opml"
+    opml_file.write_text("""<?xml version="1.0"?>
+        <opml version="1.0"><body><outline text="News">
+            <outline text="A" type="rss" xmlUrl="http://a.example.com/feed" />
+            <outline text="B" type="rss" xmlUrl="http://b.example.com/feed" />
+        </outline></body></opml>""")
+    ShardResult(
+        results={"http://a.example.com/feed": (True, None)},
+        redirects={"http://a.example.com/feed": [(301, "https://a.example.com/")]},
+    ).save(tmp_path / "part0.ndjson")
+    ShardResult(results={"http://b.example.com/feed": (False, "HTTP 404")}).save(
+        tmp_path / "part1.ndjson"
+    )
+
+    manager = FeedManager(str(opml_file))
+    manager.invalid_file = tmp_path / "invalid.opml"
+    with pytest.raises(ValueError):
+        await manager.merge_shard_results([tmp_path / "part0.ndjson"])
+
+    valid_count, invalid_feeds = await manager.merge_shard_results(
+        [tmp_path / "part0.ndjson", tmp_path / "part1.ndjson"]
+    )
+    assert valid_count == 1
+    assert invalid_feeds == {"http://b.example.com/feed": "HTTP 404"}
+    feed = Feed(title="A", url="http://a.example.com/feed", genre="News")
+    assert manager.feeds[feed.hash].genre == "News"
+    assert manager.pending_redirects() == {feed.hash: "https://a.example.com/"}
+
+
+def test_load_shard_files_merges(tmp_path):
+    ShardResult(results={"a": (True, None)}).save(tmp_path / "0.ndjson")
+    ShardResult(results={"b": (False, "x")}).save(tmp_path / "1.ndjson")
+    merged = load_shard_files([tmp_path / "0.ndjson", tmp_path / "1.ndjson"])
+    assert merged.results == {"a": (True, None), "b": (False, "x")}
+
+
+@pytest.mark.asyncio
+async def test_sharded_load_guesses_genres_without_fetching_again(
+    tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    url = "http://a.example.com/feed"
+    (tmp_path / "feeds.opml").write_text(
+        '<?xml version="1.0"?><opml version="1.0"><body><outline text="Other">'
+        f'<outline text="A" type="rss" xmlUrl="{url}" />'
+        "</outline></body></opml>"
+    )
+    shard = ShardResult(
+        results={url: (True, None)},
+        entries={
+            url: [{"title": "New physics research", "description": "A space probe"}]
+        },
+    )
+    manager = FeedManager("feeds.opml", shards=2)
+    with (
+        patch(
+            "src.services.sharding.validate_sharded",
+            new_callable=AsyncMock,
+            return_value=shard,
+        ),
+        patch.object(
+            manager.feed_validator, "fetch_text", side_effect=AssertionError("fetched")
+        ),
+    ):
+        await manager.start_loading()
+    feed = Feed(title="A", url=url, genre="")
+    assert manager.feeds[feed.hash].genre == "Science"
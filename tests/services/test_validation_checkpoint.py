@@ -0,0 +1,120 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from src.services.feed_manager import FeedManager
+
+URLS = [f"http://host{i}.example.com/feed" for i in range(4)]
+
+
+def write_opml(tmp_path):
+    outlines = "".join(
+        f'<outline text="Feed {i}" type="rss" xmlUrl="{url}" />'
+        for i, url in enumerate(URLS)
+    )
+    (tmp_path / "feeds.opml").write_text(
+        '<?xml version="1.0"?><opml version="1.0"><head><title>T</title></head>'
+        f'<body><outline text="Other">{outlines}</outline></body></opml>'
+    )
+
+
+def fake_validator(manager, checked, stop_after=None):
+    validator = manager.feed_validator
+    validator.concurrency = 1
+    # The made-up hosts don't resolve
+    validator.dns_prepass = False
+
+    async def validate_feed(url):
+        if stop_after is not None and len(checked) == stop_after:
+            # Stands in for Ctrl-C or a crash halfway through the run
+            raise asyncio.CancelledError
+        checked.append(url)
+        if url == URLS[1]:
+            return False, "HTTP 404"
+        validator.entries[url] = [
+            {"title": "New physics research", "description": "Space", "link": url}
+        ]
+        validator.entry_keys[url] = [url]
+        return True, None
+
+    return patch.object(validator, "validate_feed", side_effect=validate_feed)
+
+
+@pytest.mark.asyncio
+async def test_interrupted_run_resumes_where_it_stopped(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_opml(tmp_path)
+
+    uninterrupted = FeedManager("feeds.opml")
+    with fake_validator(uninterrupted, []):
+        expected = await uninterrupted.load_opml()
+    assert not uninterrupted.checkpoint.path.exists()
+
+    first = FeedManager("feeds.opml")
+    first_checked = []
+    with fake_validator(first, first_checked, stop_after=2):
+        with pytest.raises(asyncio.CancelledError):
+            await first.load_opml()
+    assert first.checkpoint.path.exists()
+
+    second = FeedManager("feeds.opml")
+    second_checked = []
+    with fake_validator(second, second_checked):
+        assert await second.load_opml() == expected
+    # Only the feeds left are checked again
+    assert sorted(first_checked + second_checked) == sorted(URLS)
+    assert not set(first_checked) & set(second_checked)
+    assert list(second.feeds) == list(uninterrupted.feeds)
+    assert second.validation_results == uninterrupted.validation_results
+    assert second.feed_validator.entry_keys == uninterrupted.feed_validator.entry_keys
+    # Feeds checked before the interruption are classified the same way
+    for url in first_checked:
+        if url != URLS[1]:
+            assert await second.guess_genre(url) == "Science"
+    assert not second.checkpoint.path.exists()
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_of_another_file_is_discarded(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_opml(tmp_path)
+    manager = FeedManager("feeds.opml")
+    manager.read_opml()
+    manager.checkpoint.resume("some other file")
+    manager.checkpoint.append(URLS[0], (False, "stale"), manager.feed_validator)
+    # Torn line left by a crash mid-write
+    manager.checkpoint._file.write('{"url": ')
+    manager.checkpoint.close()
+
+    done = manager.checkpoint.resume("some other file")
+    assert done.results == {URLS[0]: (False, "stale")}
+    manager.checkpoint.close()
+
+    checked = []
+    with fake_validator(manager, checked):
+        await manager.load_opml()
+    assert sorted(checked) == sorted(URLS)
+
+
+@pytest.mark.asyncio
+async def test_run_resumes_after_autosave_rewrote_the_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_opml(tmp_path)
+    original = (tmp_path / "feeds.opml").read_text()
+
+    first = FeedManager("feeds.opml")
+    first.enable_autosave(0)
+    first_checked = []
+    with fake_validator(first, first_checked, stop_after=2):
+        with pytest.raises(asyncio.CancelledError):
+            await first.start_loading()
+    # Flushes the genres guessed so far into the OPML file
+    await first.close()
+    assert (tmp_path / "feeds.opml").read_text() != original
+
+    second = FeedManager("feeds.opml")
+    second_checked = []
+    with fake_validator(second, second_checked):
+        await second.start_loading()
+    assert sorted(first_checked + second_checked) == sorted(URLS)
+    assert not set(first_checked) & set(second_checked)
+    await second.close()
@@ -0,0 +1,238 @@
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import aiohttp
+import pytest
+from src.main import (
+    build_parser,
+    diff_opml,
+    export_catalog,
+    import_catalog,
+    list_genres,
+    merge_opml,
+    serve_catalog,
+)
+from src.services.feed_manager import FeedManager
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Third-party and heavy stdlib modules, and our modules behind options and
+# commands, that only the code paths needing them should import
+DEFERRED_MODULES = {
+    "aiohttp",
+    "feedparser",
+    "listparser",
+    "rich",
+    "xml.dom.minidom",
+    "src.services.feed_archive",
+    "src.services.feed_store",
+    "src.services.loop_monitor",
+    "src.services.search_index",
+    "src.services.sharding",
+    "src.services.validation_checkpoint",
+    "src.utils.catalog_io",
+}
+
+# Short commands should start in well under 100 ms, so the import of
+# src.main must fit in that
+IMPORT_BUDGET_US = 100_000
+
+# Fresh interpreters to time the import in; the fastest is the least
+# disturbed by whatever else the machine is doing
+IMPORT_RUNS = 5
+
+
+def import_times(module):
+    """Import a module in a fresh interpreter and return its -X importtime log."""
+    # Compiled modules are cached as they are once installed, rather than
+    # compiled again by every run
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_main_defers_heavy_imports():
+    times = import_times("src.main")
+    imported = {
+        name
+        for name in times
+        if any(name == m or name.startswith(m + ".") for m in DEFERRED_MODULES)
+    }
+    assert imported == set()
+
+    fastest = min(
+        [times["src.main"]]
+        + [import_times("src.main")["src.main"] for _ in range(IMPORT_RUNS - 1)]
+    )
+    assert fastest < IMPORT_BUDGET_US
+
+
+def test_list_genres(tmp_path, capsys):
+    opml_file = tmp_path / "feeds.opml"
+    opml_file.write_text("""<?xml version="1.0"?>
+        <opml version="1.0">
+            <head><title>Test</title></head>
+            <body>
+                <outline text="News">
+                    <outline text="A" type="rss" xmlUrl="http://a.example.com/feed" />
+                    <outline text="B" type="rss" xmlUrl="http://b.example.com/feed" />
+                </outline>
+                <outline text="Science">
+                    <outline text="C" type="rss" xmlUrl="http://c.example.com/feed" />
+                </outline>
+            </body>
+        </opml>""")
+    list_genres(str(opml_file))
+    assert capsys.readouterr().out == "News\t2\nScience\t1\n"
+    assert not list(tmp_path.glob("*.snapshot"))
+
+
+def write_opml(path, outlines):
+    path.write_text(
+        '<?xml version="1.0"?><opml version="1.0"><head><title>T</title></head>'
+        f"<body>{outlines}</body></opml>"
+    )
+    return str(path)
+
+
+def test_catalog_commands_close_the_database(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    opml = write_opml(
+        tmp_path / "feeds.opml",
+        '<outline text="News">'
+        '<outline text="A" type="rss" xmlUrl="http://a.example.com/feed" />'
+        "</outline>",
+    )
+    db = str(tmp_path / "catalog.db")
+    export_catalog(str(tmp_path / "catalog.ndjson"), opml, None)
+    import_catalog(str(tmp_path / "catalog.ndjson"), None, db)
+    export_catalog(str(tmp_path / "again.csv"), None, db)
+    list_genres(None, db)
+    assert capsys.readouterr().out.endswith("News\t1\n")
+    # Closing the last connection checkpoints the WAL and removes its files
+    assert sorted(path.name for path in tmp_path.glob("catalog.db*")) == ["catalog.db"]
+
+
+def test_diff_and_merge_commands(tmp_path, capsys):
+    a = '<outline text="A" type="rss" xmlUrl="http://a.example.com/feed" />'
+    b = '<outline text="B" type="rss" xmlUrl="http://b.example.com/feed" />'
+    c = '<outline text="C" type="rss" xmlUrl="http://c.example.com/feed" />'
+    base = write_opml(tmp_path / "base.opml", f'<outline text="News">{a}{b}</outline>')
+    ours = write_opml(
+        tmp_path / "ours.opml",
+        f'<outline text="News">{a}</outline><outline text="Science">{b}</outline>',
+    )
+    theirs = write_opml(
+        tmp_path / "theirs.opml", f'<outline text="News">{a}{b}{c}</outline>'
+    )
+
+    diff_opml(base, ours)
+    assert capsys.readouterr().out == (
+        "~ http://b.example.com/feed genre: News -> Science\n"
+        "0 added, 0 removed, 1 re-genred, 0 retitled, 0 redescribed\n"
+    )
+
+    output = tmp_path / "merged.opml"
+    merge_opml(base, ours, theirs, str(output))
+    assert "3 feeds" in capsys.readouterr().out
+    merged = {feed.url: feed.genre for feed in FeedManager(str(output)).read_opml()}
+    assert merged == {
+        "http://a.example.com/feed": "News",
+        "http://b.example.com/feed": "Science",
+        "http://c.example.com/feed": "News",
+    }
+
+
+def test_merge_keeps_descriptions_and_original_urls(tmp_path, capsys):
+    a = (
+        '<outline text="A" type="rss" xmlUrl="http://a.example.com/feed" '
+        'description="About A" originalUrl="http://old.example.com/a" />'
+    )
+    b = '<outline text="B" type="rss" xmlUrl="http://b.example.com/feed" '
+    base = write_opml(
+        tmp_path / "base.opml",
+        f'<outline text="News">{a}{b}description="Old" /></outline>',
+    )
+    ours = write_opml(
+        tmp_path / "ours.opml",
+        f'<outline text="News">{a}{b}description="Old" /></outline>',
+    )
+    theirs = write_opml(
+        tmp_path / "theirs.opml",
+        f'<outline text="News">{a}{b}description="New" /></outline>',
+    )
+
+    diff_opml(base, theirs)
+    assert capsys.readouterr().out == (
+        "~ http://b.example.com/feed description changed\n"
+        "0 added, 0 removed, 0 re-genred, 0 retitled, 1 redescribed\n"
+    )
+
+    output = tmp_path / "merged.opml"
+    merge_opml(base, ours, theirs, str(output))
+    merged = {feed.url: feed for feed in FeedManager(str(output)).read_opml()}
+    assert merged["http://a.example.com/feed"].description == "About A"
+    assert (
+        merged["http://a.example.com/feed"].original_url == "http://old.example.com/a"
+    )
+    assert merged["http://b.example.com/feed"].description == "New"
+    # Only the output was read back through a FeedManager that snapshots
+    assert sorted(path.name for path in tmp_path.glob("*.snapshot")) == [
+        "merged.opml.snapshot"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_serve_saves_genre_changes_on_sigterm(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    opml = write_opml(
+        tmp_path / "feeds.opml",
+        '<outline text="News">'
+        '<outline text="A" type="rss" xmlUrl="http://a.example.com/feed" />'
+        "</outline>",
+    )
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    options = build_parser().parse_args(["serve", opml])
+    with patch.object(FeedManager, "revalidate", AsyncMock(return_value={})):
+        serving = asyncio.create_task(
+            serve_catalog(opml, options, "127.0.0.1", port, 3600)
+        )
+        feed_hash = FeedManager(opml).read_opml()[0].hash
+        async with aiohttp.ClientSession() as session:
+            for _ in range(100):
+                try:
+                    async with session.get(f"http://127.0.0.1:{port}/status"):
+                        break
+                except aiohttp.ClientConnectionError:
+                    await asyncio.sleep(0.02)
+            url = f"http://127.0.0.1:{port}/feeds/{feed_hash}/genre"
+            async with session.post(url, json={"genre": "Science"}) as response:
+                assert response.status == 200
+
+        os.kill(os.getpid(), signal.SIGTERM)
+        with pytest.raises(asyncio.CancelledError):
+            await serving
+    assert 'text="Science"' in Path(opml).read_text()
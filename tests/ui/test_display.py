@@ -3,7 +3,11 @@ from unittest.mock import patch, MagicMock
 from rich.table import Table
 from rich.panel import Panel
 from datetime import datetime
-from src.ui.display import display_feeds, display_latest_articles
+from src.ui.display import (
+    display_feeds,
+    display_latest_articles,
+    display_run_summary,
+)
 from src.models.feed import Feed
 
 
@@ -32,6 +36,15 @@ class TestDisplay(unittest.TestCase):
         self.assertEqual(printed_table.rows[1].cells[1], "Feed 2")
         self.assertEqual(printed_table.rows[2].cells[1], "Feed 3")
 
+    @patch("src.ui.display.console")
+    def test_display_feeds_with_statuses(self, mock_console):
+        feed = Feed(title="Feed 1", url="http://example.com/feed1", genre="News")
+        display_feeds({feed.hash: feed}, {feed.hash: "checking"})
+
+        printed_table = mock_console.print.call_args[0][0]
+        self.assertEqual(printed_table.columns[-1].header, "Status")
+        self.assertEqual(list(printed_table.columns[-1].cells), ["checking"])
+
     @patch("src.ui.display.console")
     @patch("src.ui.display.feedparser.parse")
     def test_display_latest_articles(self, mock_parse, mock_console):
@@ -110,6 +123,25 @@ class TestDisplay(unittest.TestCase):
         # Check table content for long text truncation
         self.assertTrue(len(printed_table.rows[0].cells[1]) < len(long_title))
 
+    @patch("src.ui.display.console")
+    def test_display_run_summary(self, mock_console):
+        display_run_summary(
+            {
+                "validation_seconds": 1.23456,
+                "parse_workers": 4,
+                "peak_parse_queue_depth": 7,
+            }
+        )
+
+        printed_panel = mock_console.print.call_args[0][0]
+        self.assertIsInstance(printed_panel, Panel)
+        table = printed_panel.renderable
+        self.assertEqual(
+            list(table.columns[0].cells),
+            ["Validation seconds", "Parse workers", "Peak parse queue depth"],
+        )
+        self.assertEqual(list(table.columns[1].cells), ["1.23", "4", "7"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,89 @@
+import io
+import unittest
+from datetime import datetime
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from src.models.feed import Feed
+from src.utils.catalog_io import (
+    export_records,
+    feed_record,
+    import_records,
+    read_csv,
+    read_ndjson,
+    record_health,
+    record_to_feed,
+    write_csv,
+    write_ndjson,
+)
+
+
+class TestCatalogIO(unittest.TestCase):
+    def setUp(self):
+        self.feeds = [
+            Feed(
+                title="Moved, with a comma",
+                url="https://new.example.com/feed",
+                genre="Technology",
+                description='Line one\nLine "two"',
+                original_url="http://old.example.com/feed",
+            ),
+            Feed(
+                title="Deleted",
+                url="http://gone.example.com/feed",
+                genre="News",
+                deleted_at=datetime(2024, 5, 6, 7, 8, 9),
+            ),
+        ]
+        self.records = [
+            feed_record(self.feeds[0], (True, None), "https://newer.example.com/feed"),
+            feed_record(self.feeds[1], (False, "HTTP 404")),
+        ]
+
+    def test_feed_record(self):
+        record = self.records[0]
+        self.assertEqual(record["hash"], self.feeds[0].hash)
+        self.assertTrue(record["valid"])
+        self.assertEqual(record["redirects_to"], "https://newer.example.com/feed")
+        self.assertIsNone(feed_record(self.feeds[1])["valid"])
+
+    def test_ndjson_roundtrip(self):
+        buffer = io.StringIO()
+        self.assertEqual(write_ndjson(iter(self.records), buffer), 2)
+        self.assertEqual(len(buffer.getvalue().splitlines()), 2)
+
+        buffer.seek(0)
+        records = list(read_ndjson(buffer))
+        self.assertEqual([record_to_feed(r) for r in records], self.feeds)
+        self.assertEqual(record_health(records[1]), (False, "HTTP 404"))
+
+    def test_csv_roundtrip(self):
+        buffer = io.StringIO()
+        self.assertEqual(write_csv(iter(self.records), buffer), 2)
+
+        buffer.seek(0)
+        records = list(read_csv(buffer))
+        self.assertEqual([record_to_feed(r) for r in records], self.feeds)
+        self.assertEqual(record_health(records[0]), (True, None))
+        self.assertEqual(record_health(records[1]), (False, "HTTP 404"))
+
+    def test_record_without_health(self):
+        self.assertIsNone(record_health({"valid": ""}))
+        self.assertIsNone(record_health({"valid": None}))
+
+    def test_export_and_import_by_extension(self):
+        with TemporaryDirectory() as tmp:
+            for name in ("catalog.ndjson", "catalog.jsonl", "catalog.csv"):
+                path = Path(tmp) / name
+                self.assertEqual(export_records(path, iter(self.records)), 2)
+                feeds = [record_to_feed(r) for r in import_records(path)]
+                self.assertEqual(feeds, self.feeds)
+
+    def test_unsupported_extension(self):
+        with self.assertRaises(ValueError):
+            export_records(Path("catalog.xml"), iter(self.records))
+        with self.assertRaises(ValueError):
+            import_records(Path("catalog.xml"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import gzip
+import unittest
+from importlib.util import find_spec
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from src.utils.compressed_io import compression_of, open_text
+
+
+class TestCompressedIO(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_compression_of(self):
+        self.assertEqual(compression_of("feeds.opml.gz"), "gzip")
+        self.assertEqual(compression_of("feeds.opml.ZST"), "zstd")
+        self.assertIsNone(compression_of("feeds.opml"))
+
+    def test_gzip_round_trip(self):
+        path = self.dir / "feeds.opml.gz"
+        with open_text(path, "w") as f:
+            f.write("<opml>Café</opml>")
+        self.assertEqual(
+            gzip.decompress(path.read_bytes()).decode("utf-8"), "<opml>Café</opml>"
+        )
+        with open_text(path) as f:
+            self.assertEqual(f.read(), "<opml>Café</opml>")
+
+    @unittest.skipUnless(find_spec("zstandard"), "zstandard is not installed")
+    def test_zstd_round_trip(self):
+        import zstandard
+
+        path = self.dir / "feeds.opml.zst"
+        with open_text(path, "w") as f:
+            f.write("<opml/>")
+        reader = zstandard.ZstdDecompressor().stream_reader(path.read_bytes())
+        self.assertEqual(reader.read(), b"<opml/>")
+        with open_text(path) as f:
+            self.assertEqual(f.read(), "<opml/>")
+
+    def test_compression_overrides_extension(self):
+        path = self.dir / "feeds.opml.gz.tmp"
+        with open_text(path, "w", compression="gzip") as f:
+            f.write("<opml/>")
+        self.assertEqual(gzip.decompress(path.read_bytes()), b"<opml/>")
+
+    def test_plain_files_are_left_alone(self):
+        path = self.dir / "feeds.opml"
+        with open_text(path, "w") as f:
+            f.write("<opml/>")
+        self.assertEqual(path.read_text(encoding="utf-8"), "<opml/>")
+
+
+if __name__ == "__main__":
+    unittest.main()
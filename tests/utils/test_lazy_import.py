@@ -0,0 +1,35 @@
+import sys
+import unittest
+from src.utils.lazy_import import lazy_import
+
+
+class TestLazyImport(unittest.TestCase):
+    def setUp(self):
+        import xmlrpc
+
+        self.package = xmlrpc
+        self.saved = sys.modules.pop("xmlrpc.client", None)
+        self.package.__dict__.pop("client", None)
+
+    def tearDown(self):
+        sys.modules.pop("xmlrpc.client", None)
+        self.package.__dict__.pop("client", None)
+        if self.saved is not None:
+            sys.modules["xmlrpc.client"] = self.saved
+            self.package.client = self.saved
+
+    def test_submodule_is_bound_on_its_package(self):
+        module = lazy_import("xmlrpc.client")
+        self.assertIs(self.package.client, module)
+        self.assertIs(sys.modules["xmlrpc.client"], module)
+
+    def test_already_imported_modules_are_returned(self):
+        self.assertIs(lazy_import("sys"), sys)
+
+    def test_missing_modules_raise(self):
+        with self.assertRaises(ModuleNotFoundError):
+            lazy_import("no_such_module_here")
+
+
+if __name__ == "__main__":
+    unittest.main()
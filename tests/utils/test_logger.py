@@ -0,0 +1,101 @@
+import json
+import logging
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+from src.utils.logger import (
+    HostRateLimitFilter,
+    JsonFormatter,
+    setup_logging,
+    stop_logging,
+)
+
+
+def make_record(message, level=logging.WARNING):
+    return logging.LogRecord("test", level, __file__, 1, message, None, None)
+
+
+class TestHostRateLimitFilter(unittest.TestCase):
+    def setUp(self):
+        self.filter = HostRateLimitFilter(interval=60, per_host=2)
+
+    def test_duplicate_warnings_are_dropped(self):
+        message = "First attempt timeout for http://example.com/feed"
+        self.assertTrue(self.filter.filter(make_record(message)))
+        self.assertFalse(self.filter.filter(make_record(message)))
+
+    def test_warnings_are_capped_per_host(self):
+        allowed = [
+            self.filter.filter(make_record(f"Failed http://slow.example.com/{i}"))
+            for i in range(4)
+        ]
+        self.assertEqual(allowed, [True, True, False, False])
+        # Other hosts have their own budget
+        self.assertTrue(self.filter.filter(make_record("Failed http://other.com/")))
+
+    def test_warnings_without_a_host_are_not_limited(self):
+        for i in range(5):
+            message = f"Event loop stalled for {i} ms"
+            self.assertTrue(self.filter.filter(make_record(message)))
+        message = "Could not write snapshot feeds.opml.snapshot: disk full"
+        self.assertTrue(self.filter.filter(make_record(message)))
+        self.assertTrue(self.filter.filter(make_record(message)))
+
+    def test_other_levels_pass_through(self):
+        message = "Loaded http://example.com/feed"
+        for _ in range(5):
+            self.assertTrue(self.filter.filter(make_record(message, logging.INFO)))
+            self.assertTrue(self.filter.filter(make_record(message, logging.ERROR)))
+
+    def test_suppressed_count_reported_in_next_window(self):
+        message = "First attempt timeout for http://example.com/feed"
+        with patch("src.utils.logger.time.monotonic", return_value=0.0):
+            self.filter.filter(make_record(message))
+            self.filter.filter(make_record(message))
+            self.filter.filter(make_record(message))
+        with patch("src.utils.logger.time.monotonic", return_value=61.0):
+            record = make_record(message)
+            self.assertTrue(self.filter.filter(record))
+        self.assertIn("2 similar warnings suppressed", record.getMessage())
+
+
+class TestJsonFormatter(unittest.TestCase):
+    def test_format(self):
+        record = make_record("HTTP 404 for https://Example.com/feed")
+        entry = json.loads(JsonFormatter().format(record))
+        self.assertEqual(entry["level"], "WARNING")
+        self.assertEqual(entry["message"], "HTTP 404 for https://Example.com/feed")
+        self.assertEqual(entry["host"], "example.com")
+
+
+class TestSetupLogging(unittest.TestCase):
+    def tearDown(self):
+        stop_logging()
+
+    def test_records_reach_file_through_queue(self):
+        with TemporaryDirectory() as tmp:
+            log_file = Path(tmp) / "test.log"
+            listener = setup_logging(str(log_file), json_lines=True, max_bytes=1024)
+            self.assertEqual(listener.handlers[0].maxBytes, 1024)
+
+            logging.info("Loaded 3 valid feeds from OPML file")
+            stop_logging()
+
+            lines = log_file.read_text().splitlines()
+            self.assertEqual(len(lines), 1)
+            self.assertEqual(
+                json.loads(lines[0])["message"], "Loaded 3 valid feeds from OPML file"
+            )
+
+    def test_setup_is_idempotent(self):
+        with TemporaryDirectory() as tmp:
+            root = logging.getLogger()
+            before = len(root.handlers)
+            setup_logging(str(Path(tmp) / "a.log"))
+            setup_logging(str(Path(tmp) / "b.log"))
+            self.assertEqual(len(root.handlers), before + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,16 @@
+import unittest
+from src.utils.url_helpers import host_of
+
+
+class TestURLHelpers(unittest.TestCase):
+    def test_host_is_lowercased(self):
+        self.assertEqual(host_of("https://Example.COM:8080/feed"), "example.com")
+
+    def test_malformed_urls_have_no_host(self):
+        self.assertEqual(host_of("http://[abc]/feed"), "")
+        self.assertEqual(host_of("http://[::1/feed"), "")
+        self.assertEqual(host_of("not a url"), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
-from src.utils.xml_helpers import create_opml_tree
+import xml.etree.ElementTree as ET
+from src.utils.xml_helpers import create_opml_tree, outline_attributes
 from src.models.feed import Feed
 
 
@@ -81,6 +82,35 @@ class TestXMLHelpers(unittest.TestCase):
         self.assertIsNotNone(tech_outline)
         self.assertEqual(len(tech_outline.findall("outline")), 2)
 
+    def test_create_opml_tree_original_url(self):
+        moved = Feed(
+            title="Moved",
+            url="https://new.example.com/feed",
+            genre="News",
+            original_url="http://old.example.com/feed",
+        )
+        root = create_opml_tree({"News": [moved]})
+        outline = root.find("body/outline/outline")
+        self.assertEqual(outline.attrib["xmlUrl"], "https://new.example.com/feed")
+        self.assertEqual(outline.attrib["originalUrl"], "http://old.example.com/feed")
+
+        root = create_opml_tree(self.feeds_by_genre)
+        self.assertNotIn("originalUrl", root.find("body/outline/outline").attrib)
+
+    def test_outline_attributes_round_trip(self):
+        feed = self.feeds_by_genre["Science"][0]
+        feed.original_url = "http://old.sciencedaily.com/rss"
+        root = create_opml_tree(self.feeds_by_genre)
+        attributes = outline_attributes(ET.tostring(root, encoding="unicode"))
+        self.assertEqual(len(attributes), 3)
+        self.assertEqual(
+            attributes[feed.url]["originalUrl"], "http://old.sciencedaily.com/rss"
+        )
+        self.assertEqual(attributes[feed.url]["description"], "Science news")
+
+    def test_outline_attributes_of_malformed_document(self):
+        self.assertEqual(outline_attributes("<opml><body><outline"), {})
+
 
 if __name__ == "__main__":
     unittest.main()